@@ -0,0 +1,82 @@
+"""
+Recall@k and query throughput of the approximate retrieval backends against exact search.
+
+Examples:
+    python -m benchmarks.ann_recall --n 200000 --dim 1536 --nlist 1024 --nprobe 4 8 16 32 64
+    python -m benchmarks.ann_recall --corpus path/to/corpus --nlist 256 --nprobe 8 16
+"""
+import argparse
+import time
+import numpy as np
+
+from ragalchemy.retrieval.ann import IVFIndex, HNSWLibIndex, recall_at_k
+from ragalchemy.retrieval.index import l2_normalize, top_k
+
+
+def synthetic_vectors(n, dim, n_topics=200, seed=0):
+    """
+    Clustered unit vectors, closer to real slide embeddings than uniform noise.
+    """
+    rng = np.random.default_rng(seed)
+    topics = rng.standard_normal((n_topics, dim)).astype(np.float32)
+    vectors = topics[rng.integers(0, n_topics, n)] + 1.5 * rng.standard_normal((n, dim)).astype(np.float32)
+    return l2_normalize(vectors)
+
+
+def queries_per_second(search, queries, k):
+    start = time.perf_counter()
+    for query in queries:
+        search(query, k)
+    return len(queries) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="Benchmark the embeddings of a SlideCorpus directory instead of synthetic vectors.")
+    parser.add_argument("--n", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=1024)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32, 64])
+    parser.add_argument("--hnsw-ef", type=int, nargs="*", default=[], help="Also benchmark hnswlib with these ef values.")
+    args = parser.parse_args()
+
+    if args.corpus:
+        from ragalchemy.retrieval.corpus import SlideCorpus
+        vectors = np.asarray(SlideCorpus(args.corpus).embeddings)
+    else:
+        vectors = synthetic_vectors(args.n, args.dim)
+    rng = np.random.default_rng(1)
+    # Queries are perturbed corpus vectors, so every query has meaningful neighbours.
+    queries = l2_normalize(vectors[rng.integers(0, len(vectors), args.queries)] + 0.1 * rng.standard_normal((args.queries, vectors.shape[1])).astype(np.float32))
+
+    exact_qps = queries_per_second(lambda query, k: top_k(vectors @ query, k), queries, args.k)
+    print(f"vectors={len(vectors)} dim={vectors.shape[1]} k={args.k}")
+    print(f"{'backend':<24}{'recall@k':>10}{'qps':>12}{'build s':>10}")
+    print(f"{'exact':<24}{1.0:>10.3f}{exact_qps:>12.1f}{0.0:>10.2f}")
+
+    start = time.perf_counter()
+    ivf = IVFIndex(nlist=args.nlist)
+    ivf.add(vectors)
+    build = time.perf_counter() - start
+    for nprobe in args.nprobe:
+        ivf.nprobe = nprobe
+        recall = recall_at_k(ivf, vectors, queries, args.k)
+        qps = queries_per_second(ivf.search, queries, args.k)
+        print(f"{f'ivf nprobe={nprobe}':<24}{recall:>10.3f}{qps:>12.1f}{build:>10.2f}")
+
+    if args.hnsw_ef:
+        start = time.perf_counter()
+        hnsw = HNSWLibIndex()
+        hnsw.add(vectors)
+        build = time.perf_counter() - start
+        for ef in args.hnsw_ef:
+            hnsw.ef = ef
+            recall = recall_at_k(hnsw, vectors, queries, args.k)
+            qps = queries_per_second(hnsw.search, queries, args.k)
+            print(f"{f'hnsw ef={ef}':<24}{recall:>10.3f}{qps:>12.1f}{build:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Compares two benchmarks.pipeline result files and reports regressions.
+
+A stage regresses when its time grows by more than --threshold (relative) and by more than
+--min-seconds (absolute, so that millisecond stages do not flap), or when its peak RSS
+grows by more than --rss-threshold. The exit status is non-zero on a regression, so the
+script can gate CI against a stored baseline.
+
+Examples:
+    python -m benchmarks.compare baseline.json results.json
+    python -m benchmarks.compare baseline.json results.json --threshold 0.10 --rss-threshold 0.20
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path) as f:
+        report = json.load(f)
+    return report["meta"], {
+        (result["kind"], result["slides"], name): stage
+        for result in report["results"] for name, stage in result["stages"].items()
+    }
+
+
+def compare(baseline, candidate, threshold, rss_threshold, min_seconds):
+    """
+    Returns the rows of the stages present in both results, as (kind, slides, stage,
+    baseline seconds, candidate seconds, time ratio, rss ratio, regression flags).
+    """
+    rows = []
+    for key in sorted(baseline.keys() & candidate.keys()):
+        before, after = baseline[key], candidate[key]
+        time_ratio = after["seconds"] / before["seconds"] if before["seconds"] > 0 else float("inf")
+        rss_ratio = after["peak_rss_mb"] / before["peak_rss_mb"] if before["peak_rss_mb"] > 0 else 1.0
+        flags = []
+        if time_ratio > 1 + threshold and after["seconds"] - before["seconds"] > min_seconds:
+            flags.append("TIME")
+        if rss_ratio > 1 + rss_threshold:
+            flags.append("RSS")
+        rows.append((*key, before["seconds"], after["seconds"], time_ratio, rss_ratio, flags))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.15, help="The tolerated relative time increase.")
+    parser.add_argument("--rss-threshold", type=float, default=0.25, help="The tolerated relative peak RSS increase.")
+    parser.add_argument("--min-seconds", type=float, default=0.01, help="Time increases below this are never regressions.")
+    args = parser.parse_args()
+
+    baseline_meta, baseline = load(args.baseline)
+    candidate_meta, candidate = load(args.candidate)
+    for name in ("embedder", "tokenizer", "cpu_count", "python"):
+        if baseline_meta.get(name) != candidate_meta.get(name):
+            print(f"warning: {name} differs ({baseline_meta.get(name)} vs {candidate_meta.get(name)})", file=sys.stderr)
+    missing = sorted(baseline.keys() - candidate.keys())
+    if missing:
+        print(f"warning: {len(missing)} baseline stages missing from the candidate, e.g. {missing[0]}", file=sys.stderr)
+
+    rows = compare(baseline, candidate, args.threshold, args.rss_threshold, args.min_seconds)
+    print(f"{'kind':<8}{'slides':>7}  {'stage':<18}{'base s':>10}{'new s':>10}{'time':>8}{'rss':>8}")
+    for kind, slides, stage, before, after, time_ratio, rss_ratio, flags in rows:
+        print(f"{kind:<8}{slides:>7}  {stage:<18}{before:>10.3f}{after:>10.3f}{time_ratio:>7.2f}x{rss_ratio:>7.2f}x  {' '.join(flags)}")
+    regressions = [row for row in rows if row[-1]]
+    print(f"{len(regressions)} regression(s) in {len(rows)} stages")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Import-time budget of the ragalchemy entry points.
+
+Every module is imported in a fresh interpreter, several times, and the best wall time is
+compared with the budget. The heavy dependencies that must stay lazy are also checked: the
+run fails if importing an entry point pulls in any of them. The exit status is non-zero on
+a failure, so the script can gate CI.
+
+tests/test_import_time.py asserts the same budget as part of the test suite.
+
+Examples:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --budget-ms 400 --repeat 5 --modules ragalchemy.agents.pptx
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+DEFAULT_MODULES = [
+    "ragalchemy",
+    "ragalchemy.extractors.pptx",
+    "ragalchemy.agents.pptx",
+    "ragalchemy.retrieval.corpus",
+    "ragalchemy.pipeline.ingest",
+]
+
+BUDGET_MS = 500.0
+
+# Imported on first use only; loading one at import time is a regression.
+LAZY_MODULES = ["pandas", "openai", "aiohttp", "prettytable", "torch", "transformers", "pyarrow"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [name for name in {lazy!r} if name in sys.modules]}}))
+"""
+
+
+def measure(module, repeat, lazy=LAZY_MODULES):
+    """
+    Returns the best import time of a module over `repeat` fresh interpreters, and the lazy
+    modules it loaded.
+    """
+    best, loaded = None, []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, lazy=list(lazy))],
+            check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        best = result["seconds"] if best is None else min(best, result["seconds"])
+        loaded = result["loaded"]
+    return best, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS, help="The maximum import time of each module.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'module':<32}{'import ms':>12}  lazy modules loaded")
+    for module in args.modules:
+        seconds, loaded = measure(module, args.repeat)
+        over = seconds * 1000 > args.budget_ms
+        failed = failed or over or bool(loaded)
+        flag = "  OVER BUDGET" if over else ""
+        print(f"{module:<32}{seconds * 1000:>12.1f}  {', '.join(loaded) or '-'}{flag}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
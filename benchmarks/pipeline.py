@@ -0,0 +1,225 @@
+"""
+End-to-end wall time, peak memory and throughput of the extraction and QnA pipeline on
+synthetic decks (see benchmarks.synthetic).
+
+Every (kind, slides) case runs in a fresh interpreter, so the peak RSS of a case is not
+inflated by the cases before it. Embeddings come from a local backend (hashing by
+default) and completions from a ReplayChatBackend, so no network is used and the numbers
+measure ragalchemy itself. Stages:
+
+    extract       PPTExtractor.extract(embedding=False), with OCR (extract_from_image) for "image" decks
+    embed         PPTExtractor.embed_slides()
+    to_dataframe  PPTExtractor.to_dataframe()
+    combine       PPTExtractor.combine()
+    qna_setup     PPTQnA(...): extraction, embedding and the vector and BM25 indexes
+    qna_<method>  PPTQnA.run() over the benchmark queries, for each --methods
+    summarize     PPTSummarizer.summarize("slide", concurrency=8)
+
+Each stage reports seconds (the best of --repeat), slides per second (queries per second
+for QnA) and the peak RSS of the process while it ran. A case that fails is reported and
+recorded with its error. Results are written as JSON, to be compared with benchmarks.compare.
+Offline, token counts are estimated (see embedding.openai.EstimatedEncoding); the tokenizer
+used is recorded in the metadata.
+
+Examples:
+    python -m benchmarks.pipeline --kinds text table chart image mixed --slides 50 200 --output results.json
+    python -m benchmarks.pipeline --kinds mixed --slides 500 --embedder sentence-transformers --repeat 3 --output st.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+from benchmarks.synthetic import KINDS, generate_deck
+
+STAGES = ["extract", "embed", "to_dataframe", "combine", "qna_setup", "qna", "summarize"]
+
+QUERIES = [
+    "What was the revenue growth last quarter?",
+    "Which region has the highest churn?",
+    "Summarize the pricing and margin forecast.",
+    "What are the main risks on the roadmap?",
+    "How many units did SKU-01234 sell?",
+    "What is the headcount and hiring budget?",
+    "Which product launch drove market share?",
+    "What is the platform migration latency target?",
+]
+
+
+class PeakRSS:
+    """
+    Tracks the peak resident set size of the process while a block runs, by sampling
+    /proc/self/statm. Where /proc is not available, the process-wide ru_maxrss is used.
+    """
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._statm = "/proc/self/statm" if os.path.exists("/proc/self/statm") else None
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if self._statm else 0
+
+    def _rss(self) -> int:
+        if self._statm is None:
+            # Kilobytes on Linux, bytes on macOS.
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return maxrss if sys.platform == "darwin" else maxrss * 1024
+        with open(self._statm) as f:
+            return int(f.read().split()[1]) * self._page_size
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self._rss())
+
+    def __enter__(self):
+        self.peak = self._rss()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self._rss())
+
+    @property
+    def peak_mb(self) -> float:
+        return self.peak / 2 ** 20
+
+
+def timed(stages, name, n_items, function, unit="slides"):
+    """
+    Runs a stage, records its time, throughput and peak RSS into stages[name], keeping the
+    best time and the highest peak over repeats, and returns the stage's result.
+    """
+    with PeakRSS() as rss:
+        start = time.perf_counter()
+        result = function()
+        seconds = time.perf_counter() - start
+    previous = stages.get(name)
+    if previous is None or seconds < previous["seconds"]:
+        stages[name] = {"seconds": seconds, f"{unit}_per_sec": n_items / seconds if seconds > 0 else None, "items": n_items}
+    stages[name]["peak_rss_mb"] = max(rss.peak_mb, previous["peak_rss_mb"] if previous else 0)
+    return result
+
+
+def run_case(path, n_slides, stages, embedder_spec, methods, repeat, n_queries, extract_from_image=False):
+    from ragalchemy.agents.pptx import PPTQnA
+    from ragalchemy.chat_model.backends import ReplayChatBackend
+    from ragalchemy.embedding.backends import get_backend
+    from ragalchemy.extractors.pptx import PPTExtractor
+    from ragalchemy.utils.lazy import prewarm
+
+    # Import time is benchmarks.import_time's concern; the stages measure the work itself.
+    prewarm(openai=False)
+    embedder = get_backend(embedder_spec)
+    queries = (QUERIES * (n_queries // len(QUERIES) + 1))[:n_queries]
+    results = {}
+    for _ in range(repeat):
+        extractor = PPTExtractor(path, embedder=embedder, extract_from_image=extract_from_image)
+        if "extract" in stages or "embed" in stages or "to_dataframe" in stages or "combine" in stages:
+            timed(results, "extract", n_slides, lambda: extractor.extract(embedding=False))
+            if n_slides and not extractor.slides:
+                raise Exception(f"No slide of {path} could be extracted" + (" (is tesseract installed?)" if extract_from_image else ""))
+        if "embed" in stages:
+            timed(results, "embed", n_slides, extractor.embed_slides)
+        if "to_dataframe" in stages:
+            timed(results, "to_dataframe", n_slides, extractor.to_dataframe)
+        if "combine" in stages:
+            timed(results, "combine", n_slides, extractor.combine)
+        del extractor
+        if not {"qna_setup", "qna", "summarize"} & set(stages):
+            continue
+        chat_backend = ReplayChatBackend()
+        qna = timed(results, "qna_setup", n_slides, lambda: PPTQnA(path, embedder=embedder, chat_backend=chat_backend, extract_from_image=extract_from_image))
+        if "qna" in stages:
+            for method in methods:
+                timed(results, f"qna_{method}", len(queries), lambda: [qna.run(query, method=method) for query in queries], unit="queries")
+        if "summarize" in stages:
+            timed(results, "summarize", n_slides, lambda: qna.summarize("slide", concurrency=8))
+    return results
+
+
+def metadata():
+    from ragalchemy.embedding.openai import get_encoding
+
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], check=True, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_revision": revision,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "tokenizer": get_encoding().name,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=KINDS)
+    parser.add_argument("--slides", nargs="+", type=int, default=[20, 100])
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--methods", nargs="+", default=["similarity", "lexical", "hybrid"], help="The PPTQnA.run methods of the qna stage.")
+    parser.add_argument("--queries", type=int, default=16, help="The number of questions per QnA method.")
+    parser.add_argument("--embedder", default="hashing", help="An embedding backend spec, see ragalchemy.embedding.backends.get_backend.")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--deck-dir", help="Where to keep the generated decks, reused across runs. Defaults to a temporary directory.")
+    parser.add_argument("--output", help="The JSON results file. Printed to stdout if omitted.")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    parser.add_argument("--kind", choices=KINDS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        # A single case, run by the parent process in a fresh interpreter.
+        path, n_slides = args.case.rsplit(":", 1)
+        stages = run_case(path, int(n_slides), args.stages, args.embedder, args.methods, args.repeat, args.queries, extract_from_image=args.kind == "image")
+        print(json.dumps(stages))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        deck_dir = args.deck_dir or tmp
+        os.makedirs(deck_dir, exist_ok=True)
+        results = []
+        print(f"{'kind':<8}{'slides':>7}  {'stage':<18}{'seconds':>10}{'per sec':>10}{'peak MB':>10}", file=sys.stderr)
+        for kind in args.kinds:
+            for n_slides in args.slides:
+                path = os.path.join(deck_dir, f"{kind}-{n_slides}-{args.seed}.pptx")
+                if not os.path.exists(path):
+                    generate_deck(path, kind, n_slides, args.seed)
+                command = [
+                    sys.executable, "-m", "benchmarks.pipeline", "--case", f"{path}:{n_slides}", "--kind", kind,
+                    "--stages", *args.stages, "--methods", *args.methods, "--queries", str(args.queries),
+                    "--embedder", args.embedder, "--repeat", str(args.repeat),
+                ]
+                process = subprocess.run(command, capture_output=True, text=True)
+                if process.returncode != 0:
+                    error = (process.stderr.strip().splitlines() or ["exit status " + str(process.returncode)])[-1]
+                    print(f"{kind:<8}{n_slides:>7}  failed: {error}", file=sys.stderr)
+                    results.append({"kind": kind, "slides": n_slides, "deck_bytes": os.path.getsize(path), "stages": {}, "error": error})
+                    continue
+                stages = json.loads(process.stdout.strip().splitlines()[-1])
+                results.append({"kind": kind, "slides": n_slides, "deck_bytes": os.path.getsize(path), "stages": stages})
+                for name, stage in stages.items():
+                    rate = stage.get("slides_per_sec") or stage.get("queries_per_sec") or 0
+                    print(f"{kind:<8}{n_slides:>7}  {name:<18}{stage['seconds']:>10.3f}{rate:>10.1f}{stage['peak_rss_mb']:>10.1f}", file=sys.stderr)
+
+    report = {"meta": {**metadata(), "embedder": args.embedder, "repeat": args.repeat, "seed": args.seed}, "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Synthetic .pptx decks of controlled size and content for the benchmarks.
+
+Kinds:
+    text    a title and three text boxes of several paragraphs per slide
+    table   a 20 x 6 table per slide, with SKU codes, names and figures
+    chart   two category charts of 24 points and 3 series per slide
+    image   two distinct 480 x 320 PNG images with drawn text per slide
+    mixed   one text box, one table, one chart and one image per slide
+
+Decks are deterministic for a given kind, size and seed.
+
+Examples:
+    python -m benchmarks.synthetic --kind table --slides 200 --output table-200.pptx
+"""
+import argparse
+import io
+import random
+
+from pptx import Presentation
+from pptx.chart.data import CategoryChartData
+from pptx.enum.chart import XL_CHART_TYPE
+from pptx.util import Inches
+
+KINDS = ["text", "table", "chart", "image", "mixed"]
+
+WORDS = (
+    "revenue margin growth quarter forecast pipeline customer churn retention region product launch "
+    "market share pricing cost supply demand inventory headcount hiring budget target variance risk "
+    "strategy roadmap platform migration latency throughput availability incident release partner"
+).split()
+
+
+def _sentence(rng, n_words):
+    return " ".join(rng.choice(WORDS) for _ in range(n_words)).capitalize() + "."
+
+
+def _add_text(slide, rng, left, top, width, height, paragraphs):
+    frame = slide.shapes.add_textbox(left, top, width, height).text_frame
+    frame.text = " ".join(_sentence(rng, 12) for _ in range(3))
+    for _ in range(paragraphs - 1):
+        frame.add_paragraph().text = " ".join(_sentence(rng, 12) for _ in range(3))
+
+
+def _add_table(slide, rng, left, top, width, height, rows=20, cols=6):
+    table = slide.shapes.add_table(rows, cols, left, top, width, height).table
+    for col, name in enumerate(["SKU", "Product", "Region", "Units", "Price", "Revenue"][:cols]):
+        table.cell(0, col).text = name
+    for row in range(1, rows):
+        units, price = rng.randint(10, 5000), round(rng.uniform(1, 500), 2)
+        values = [f"SKU-{rng.randint(0, 99999):05d}", rng.choice(WORDS).title(), rng.choice(["EMEA", "APAC", "AMER"]), str(units), f"{price:.2f}", f"{units * price:.2f}"]
+        for col in range(cols):
+            table.cell(row, col).text = values[col]
+
+
+def _add_chart(slide, rng, left, top, width, height, points=24, series=3):
+    data = CategoryChartData()
+    data.categories = [f"W{week + 1}" for week in range(points)]
+    for index in range(series):
+        data.add_series(f"Series {index + 1}", [round(rng.uniform(0, 1000), 1) for _ in range(points)])
+    slide.shapes.add_chart(XL_CHART_TYPE.COLUMN_CLUSTERED, left, top, width, height, data)
+
+
+def _image_blob(rng, width=480, height=320):
+    from PIL import Image, ImageDraw
+    image = Image.new("RGB", (width, height), tuple(rng.randint(180, 255) for _ in range(3)))
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        x, y = rng.randint(0, width - 40), rng.randint(0, height - 40)
+        draw.rectangle([x, y, x + rng.randint(10, 80), y + rng.randint(10, 60)], fill=tuple(rng.randint(0, 255) for _ in range(3)))
+    for line in range(6):
+        draw.text((16, 16 + line * 40), _sentence(rng, 5), fill=(0, 0, 0))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    buffer.seek(0)
+    return buffer
+
+
+def generate_deck(path, kind, n_slides, seed=0):
+    """
+    Writes a synthetic deck.
+
+    Args:
+        path (str): The .pptx file to write.
+        kind (str): One of KINDS.
+        n_slides (int): The number of slides.
+        seed (int, optional): The random seed. Defaults to 0.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown deck kind {kind!r}, expected one of {KINDS}")
+    rng = random.Random(f"{kind}-{n_slides}-{seed}")
+    presentation = Presentation()
+    layout = presentation.slide_layouts[5]
+    full = (Inches(0.5), Inches(1.5), Inches(9), Inches(5.5))
+    for number in range(n_slides):
+        slide = presentation.slides.add_slide(layout)
+        slide.shapes.title.text = f"{kind.title()} slide {number + 1}: {_sentence(rng, 4)}"
+        if kind == "text":
+            for row in range(3):
+                _add_text(slide, rng, Inches(0.5), Inches(1.5 + row * 1.8), Inches(9), Inches(1.7), paragraphs=3)
+        elif kind == "table":
+            _add_table(slide, rng, *full)
+        elif kind == "chart":
+            _add_chart(slide, rng, Inches(0.5), Inches(1.5), Inches(4.5), Inches(5))
+            _add_chart(slide, rng, Inches(5), Inches(1.5), Inches(4.5), Inches(5))
+        elif kind == "image":
+            slide.shapes.add_picture(_image_blob(rng), Inches(0.5), Inches(1.5), Inches(4.5))
+            slide.shapes.add_picture(_image_blob(rng), Inches(5), Inches(1.5), Inches(4.5))
+        else:
+            _add_text(slide, rng, Inches(0.5), Inches(1.5), Inches(4.5), Inches(2.5), paragraphs=2)
+            _add_table(slide, rng, Inches(5), Inches(1.5), Inches(4.5), Inches(2.5), rows=8, cols=4)
+            _add_chart(slide, rng, Inches(0.5), Inches(4.2), Inches(4.5), Inches(2.8), points=12, series=2)
+            slide.shapes.add_picture(_image_blob(rng), Inches(5), Inches(4.2), Inches(4))
+    presentation.save(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kind", choices=KINDS, default="mixed")
+    parser.add_argument("--slides", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+    generate_deck(args.output, args.kind, args.slides, args.seed)
+
+
+if __name__ == "__main__":
+    main()
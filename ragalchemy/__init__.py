@@ -0,0 +1 @@
+from .utils.lazy import prewarm
@@ -0,0 +1,270 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from ..retrieval.index import l2_normalize
+from ..utils.sqlite_cache import SQLiteCache
+
+# A starting point for semantic matching. Questions that differ only in a number or a name
+# ("Q3 revenue" / "Q4 revenue") often embed above it, so it must be tuned per embedder.
+DEFAULT_SIMILARITY_THRESHOLD = 0.95
+
+
+class _ScopeEmbeddings:
+    """
+    The query embeddings of one answer cache scope, held in memory: a float32 matrix grown
+    by doubling, with the key and creation time of each row.
+    """
+    def __init__(self, dim: int) -> None:
+        self.matrix = np.zeros((16, dim), dtype=np.float32)
+        self.created = np.full(16, np.nan)
+        self.keys: List[Optional[str]] = []
+        self.rows = {}
+
+    def add(self, key: str, created: float, embedding: np.ndarray) -> None:
+        row = self.rows.get(key)
+        if row is None:
+            row = len(self.keys)
+            if row == len(self.matrix):
+                self.matrix = np.concatenate([self.matrix, np.zeros_like(self.matrix)])
+                self.created = np.concatenate([self.created, np.full(len(self.created), np.nan)])
+            self.keys.append(key)
+            self.rows[key] = row
+        self.matrix[row] = embedding
+        self.created[row] = created
+
+    def remove(self, key: str) -> None:
+        row = self.rows.pop(key, None)
+        if row is not None:
+            self.keys[row] = None
+            self.matrix[row] = 0
+            self.created[row] = np.nan
+
+
+class AnswerCache(SQLiteCache):
+    """
+    A persistent cache of question answers, matched exactly or by query embedding similarity.
+
+    Entries live in a scope made of the deck path, the deck content fingerprint, the chat
+    model and the retrieval method, so an answer is only reused for the same content and
+    model. A query first looks up its exact (normalized) text, without any API call. With a
+    similarity_threshold, a miss is then embedded and compared with the cached queries of
+    the scope, and the most similar one above the threshold is returned. Semantic matching
+    is off by default: near-identical questions about different quarters, products or
+    regions embed very close to each other and would get each other's answers. Entries
+    expire after ttl seconds and the least recently used ones are evicted beyond
+    max_entries / max_bytes.
+
+    The query embeddings of a scope are read from the database on its first semantic
+    lookup and then kept in memory and extended by store(), so a lookup is one
+    matrix-vector product and only the matching entry is decoded. Answers stored by other
+    processes after that are only matched exactly.
+
+    Each value is a JSON record (query, answer, sources, creation time) followed by the
+    query embedding as float32 bytes.
+    """
+    def __init__(self, path: str = ":memory:", similarity_threshold: Optional[float] = None, ttl: Optional[float] = 7 * 24 * 3600, max_entries: Optional[int] = 10000, max_bytes: Optional[int] = None) -> None:
+        """
+        Initializes the AnswerCache object.
+
+        Args:
+            path (str, optional): The path of the SQLite file. Defaults to an in-memory database.
+            similarity_threshold (float, optional): The minimum cosine similarity of a semantic match, e.g. DEFAULT_SIMILARITY_THRESHOLD. None, the default, disables semantic matching.
+            ttl (float, optional): The lifetime of an answer, in seconds. Never expires if None. Defaults to one week.
+            max_entries (int, optional): The maximum number of answers kept. Defaults to 10000.
+            max_bytes (int, optional): The maximum total size of the stored answers. Unbounded if None.
+        """
+        super().__init__(path, max_entries=max_entries, max_bytes=max_bytes)
+        self.similarity_threshold = similarity_threshold
+        self.ttl = ttl
+        self.semantic_hits = 0
+
+    def _connect(self) -> None:
+        super()._connect()
+        self._scopes = {}
+        self._scopes_lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        state = super().__getstate__()
+        del state["_scopes"], state["_scopes_lock"]
+        return state
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """
+        Lowercases a query and collapses its whitespace, so trivially different spellings share an entry.
+        """
+        return " ".join(query.lower().split())
+
+    @staticmethod
+    def scope(file_path: str, fingerprint: str, model: str, method: str) -> str:
+        """
+        Returns the scope of the answers about a deck version, for a chat model and retrieval method.
+        """
+        return f"{os.path.abspath(file_path)}|{fingerprint}|{model}|{method}"
+
+    def key(self, scope: str, query: str) -> str:
+        """
+        Returns the cache key of a query within a scope.
+        """
+        return hashlib.sha256((scope + "\x00" + self.normalize_query(query)).encode("utf-8")).hexdigest()
+
+    def _decode(self, value: bytes) -> Tuple[dict, np.ndarray]:
+        record, embedding = value.split(b"\n", 1)
+        return json.loads(record), np.frombuffer(embedding, dtype=np.float32)
+
+    def _expired(self, entry: dict) -> bool:
+        return self.ttl is not None and time.time() - entry["created"] > self.ttl
+
+    def lookup(self, scope: str, query: str, embedder: Optional[Callable[[List[str]], List[List[float]]]] = None) -> Tuple[Optional[dict], Optional[np.ndarray]]:
+        """
+        Finds the cached answer of a query.
+
+        Args:
+            scope (str): The scope returned by scope().
+            query (str): The question.
+            embedder (Callable, optional): Embeds the query for semantic matching. Exact matching only if None.
+
+        Returns:
+            Tuple[Optional[dict], Optional[np.ndarray]]: The entry ("query", "answer", "sources", "created", and "similarity", 1.0 for an exact match) or None, and the query embedding if one was computed, to pass on to store().
+        """
+        key = self.key(scope, query)
+        value = self.get(key)
+        if value is not None:
+            entry, embedding = self._decode(value)
+            if not self._expired(entry):
+                entry["similarity"] = 1.0
+                return entry, None
+            self._delete(scope, [key])
+            with self._lock:
+                # get() counted a hit; an expired answer is a miss.
+                self.hits -= 1
+                self.misses += 1
+        if embedder is None or self.similarity_threshold is None:
+            return None, None
+        query_embedding = l2_normalize(np.asarray(embedder([query])[0], dtype=np.float32))
+        with self._scopes_lock:
+            embeddings = self._scope_embeddings(scope, len(query_embedding))
+            count = len(embeddings.keys)
+            similarities = embeddings.matrix[:count] @ query_embedding
+            created = embeddings.created[:count]
+            if self.ttl is not None:
+                expired = time.time() - created > self.ttl
+                expired_keys = [embeddings.keys[row] for row in np.flatnonzero(expired)]
+                similarities[expired] = -np.inf
+            else:
+                expired_keys = []
+            similarities[np.isnan(created)] = -np.inf
+            candidates = np.flatnonzero(similarities >= self.similarity_threshold)
+            candidates = candidates[np.argsort(-similarities[candidates], kind="stable")]
+            candidate_keys = [(embeddings.keys[row], float(similarities[row])) for row in candidates]
+        if expired_keys:
+            self._delete(scope, expired_keys)
+        for best_key, best_similarity in candidate_keys:
+            with self._lock:
+                row = self._conn.execute("SELECT value FROM cache WHERE key = ?", (best_key,)).fetchone()
+                if row is not None:
+                    self._conn.execute("UPDATE cache SET last_access = ? WHERE key = ?", (time.time(), best_key))
+                    self._conn.commit()
+                    # The exact lookup counted a miss.
+                    self.misses -= 1
+                    self.semantic_hits += 1
+            if row is None:
+                # Evicted or invalidated since the scope was loaded.
+                with self._scopes_lock:
+                    embeddings.remove(best_key)
+                continue
+            best, _ = self._decode(row[0])
+            best["similarity"] = best_similarity
+            return best, query_embedding
+        return None, query_embedding
+
+    def _scope_embeddings(self, scope: str, dim: int) -> _ScopeEmbeddings:
+        """
+        Returns the in-memory query embeddings of a scope, reading them on first use. Entries
+        embedded with another dimension are left out. Called with _scopes_lock held.
+        """
+        embeddings = self._scopes.get(scope)
+        if embeddings is None or embeddings.matrix.shape[1] != dim:
+            embeddings = _ScopeEmbeddings(dim)
+            with self._lock:
+                rows = self._conn.execute("SELECT key, value FROM cache WHERE namespace = ?", (scope,)).fetchall()
+            for row_key, row_value in rows:
+                entry, embedding = self._decode(row_value)
+                if len(embedding) == dim:
+                    embeddings.add(row_key, entry["created"], embedding)
+            self._scopes[scope] = embeddings
+        return embeddings
+
+    def _delete(self, scope: str, keys: List[str]) -> None:
+        self.delete_many(keys)
+        with self._scopes_lock:
+            embeddings = self._scopes.get(scope)
+            if embeddings is not None:
+                for key in keys:
+                    embeddings.remove(key)
+
+    def store(self, scope: str, query: str, answer: str, query_embedding=None, sources: Optional[list] = None) -> None:
+        """
+        Stores the answer of a query.
+
+        Args:
+            scope (str): The scope returned by scope().
+            query (str): The question.
+            answer (str): The answer.
+            query_embedding (List[float], optional): The query embedding returned by lookup(). Without it the entry only matches exactly.
+            sources (list, optional): What the answer was built from, e.g. slide numbers, restored by the caller on a hit.
+        """
+        created = time.time()
+        record = json.dumps({"query": query, "answer": answer, "sources": sources or [], "created": created}).encode("utf-8")
+        key = self.key(scope, query)
+        embedding = l2_normalize(np.asarray(query_embedding, dtype=np.float32)) if query_embedding is not None else None
+        self.set(key, record + b"\n" + (embedding.tobytes() if embedding is not None else b""), namespace=scope)
+        with self._scopes_lock:
+            embeddings = self._scopes.get(scope)
+            if embeddings is not None:
+                if embedding is not None and len(embedding) == embeddings.matrix.shape[1]:
+                    embeddings.add(key, created, embedding)
+                else:
+                    embeddings.remove(key)
+
+    def invalidate_deck(self, file_path: str, fingerprint: Optional[str] = None) -> None:
+        """
+        Removes the answers about a deck, or with a fingerprint, only those about its other
+        versions. Called when a deck is re-ingested.
+        """
+        prefix = os.path.abspath(file_path) + "|"
+        with self._lock:
+            if fingerprint is None:
+                self._conn.execute("DELETE FROM cache WHERE substr(namespace, 1, ?) = ?", (len(prefix), prefix))
+            else:
+                current = prefix + fingerprint + "|"
+                self._conn.execute(
+                    "DELETE FROM cache WHERE substr(namespace, 1, ?) = ? AND substr(namespace, 1, ?) != ?",
+                    (len(prefix), prefix, len(current), current)
+                )
+            self._conn.commit()
+        with self._scopes_lock:
+            for scope in [scope for scope in self._scopes if scope.startswith(prefix) and (fingerprint is None or not scope.startswith(prefix + fingerprint + "|"))]:
+                del self._scopes[scope]
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        super().clear(namespace)
+        with self._scopes_lock:
+            if namespace is None:
+                self._scopes.clear()
+            else:
+                self._scopes.pop(namespace, None)
+
+    def stats(self) -> dict:
+        """
+        Returns the hit/miss counters, with semantic hits counted apart, and the current size of the cache.
+        """
+        stats = super().stats()
+        stats["semantic_hits"] = self.semantic_hits
+        return stats
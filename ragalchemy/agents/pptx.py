@@ -1,141 +1,443 @@
-
-from ..utils.common_functions import cosine_similarity
-from ..extractors.pptx import PPTExtractor
-from ..chat_model.openai import ChatOpenAI
-from ..embedding.openai import get_embedding, count_tokens
-
-class PPTSummarizer(PPTExtractor):
-    def __init__(self, file_path, extraction_method: str = "slide", ocr_engine: str = "tesseract") -> None:
-        super().__init__(file_path, extraction_method, ocr_engine)
-        super().extract()
-        
-    def summarize(self,summarize_method : str = "slide",slide_number : int = 0 ,summarize_model : str = "gpt-3.5-turbo-16k", system_prompt : str = "You are passed PPT Slide Information like text,tables,charts table, image ocr extracted text. You have to generate the summary of the slide. Make sure to site your answer if answering from a table or charts and be accuracte."):
-        if summarize_method == "slide":
-            summarize_response = []
-            for slide in self.slides:
-                slide_text = slide.slide_text
-                openai = ChatOpenAI(summarize_model)
-                openai.add_system_prompt(system_prompt)
-                response = openai.predict(slide_text)
-                summarize_response.append({"Slide Number":slide.slide_number, "Title" : slide.slide_title, "Summary" : response})
-            return summarize_response
-        elif summarize_method == "all":
-            prompt = ""
-            for slide in self.slides:
-                prompt += slide.slide_text + "\n\n"
-            openai = ChatOpenAI(summarize_model)
-            openai.add_system_prompt(system_prompt)
-            response = openai.predict(slide_text)
-            return response
-        elif summarize_method == "single":
-            for slide in self.slides:
-                if (slide_number > len(self.slides)) or (slide_number <= 0):
-                    raise Exception("Enter Slide Number for 'single' mode.")
-                else:
-                    prompt = ""
-                    for slide in self.slides:
-                        if int(slide.slide_number) == int(slide_number):
-                            prompt += slide.slide_text
-                            break
-                    openai = ChatOpenAI(summarize_model)
-                    openai.add_system_prompt(system_prompt)
-                    response = openai.predict(slide_text)
-                    return response
-        else:
-            raise Exception("Slide wise summary supported")
-        
-    def summarize_stream(self,summarize_method : str = "slide",slide_number : int = 0, summarize_model : str ="gpt-3.5-turbo-16k", system_prompt : str = "You are passed PPT Slide Information like text,tables,charts table, image ocr extracted text. You have to generate the summary of the slide. Make sure to site your answer if answering from a table or charts and be accuracte."):
-        if summarize_method == "slide":
-            for slide in self.slides:
-                slide_text = slide.slide_text
-                openai = ChatOpenAI(summarize_model)
-                openai.add_system_prompt(system_prompt)
-                response = openai.predict(slide_text)
-                yield {"Slide Number":slide.slide_number, "Title" : slide.slide_title, "Summary" : response}
-        elif summarize_method == "all":
-            prompt = "Generate a detailed Summary for each slides, explain the charts and tables in detail. \n\n"
-            for slide in self.slides:
-                prompt += " SLIDE NUMBER : " + str(slide.slide_number) + "\n\n"
-                prompt += slide.slide_text + "\n\n"
-            openai = ChatOpenAI(summarize_model)
-            openai.add_system_prompt(system_prompt)
-            response = openai.predict(prompt)
-            yield response
-        elif summarize_method == "single":
-            for slide in self.slides:
-                if (slide_number >= len(self.slides)+1) or (slide_number <= 0):
-                    raise Exception("Enter Slide Number for 'single' mode.")
-                else:
-                    prompt = ""
-                    for slide in self.slides:
-                        if int(slide.slide_number) == int(slide_number):
-                            prompt += slide.slide_text
-                            break
-            openai = ChatOpenAI(summarize_model)
-            openai.add_system_prompt(system_prompt)
-            response = openai.predict(prompt)
-            yield response
-        elif summarize_method == "object":
-            for slide in self.slides:
-                slide_text = ''
-                for entity in slide.entities:
-                    if entity.chart_type == "text":
-                        slide_text += entity.text
-                    else:
-                        openai = ChatOpenAI(summarize_model)
-                        openai.add_system_prompt(system_prompt)
-                        response = openai.predict(entity.text)
-                        yield response
-                if len(slide_text) > 0:
-                    openai = ChatOpenAI(summarize_model)
-                    openai.add_system_prompt(system_prompt)
-                    response = openai.predict(entity.text)
-                    yield response
-        elif summarize_method == "charts":
-            for slide in self.slides:
-                for entity in slide.entities:
-                    if entity.chart_type == "table" or entity.chart_type == "chart":
-                        openai = ChatOpenAI(summarize_model)
-                        openai.add_system_prompt(system_prompt)
-                        response = openai.predict(entity.text)
-                        yield response
-        else:
-            raise Exception("Slide wise summary supported")
-        
-class PPTQnA(PPTSummarizer):
-    
-    def __init__(self, file_path, extraction_method: str = "slide", ocr_engine: str = "tesseract") -> None:
-        super().__init__(file_path, extraction_method, ocr_engine)
-        self.retriever = []
-        self.prompt = ""
-        
-    def run(self, query,method : str = "similarity" ,model : str ="gpt-3.5-turbo-16k", k=10, similarity_score=0.6):
-        if method == "similarity":
-            query_embedding = get_embedding(query)
-            for slide in self.slides:
-                sim = cosine_similarity(query_embedding,slide.embeddings)
-                slide.similarity = sim if sim >= similarity_score else 0
-            
-            self.retriever = sorted(self.slides, key=lambda x: x.similarity, reverse=True)
-            prompt = "You are provided with PPT slide content. Based on the provided Slide Content try to answer the following question. Be clear and answer accurately, if not answer 'I don't know'. While answering cite the slide number as source. Example ( Corrrect cites : [1] [2] [3] , Incorrect [1,2,3]). \n Question : " + query + " Slide Wise Content : \n\n"
-            for slide in self.retriever[0:min(k,len(self.retriever))]:
-                prompt += f"Slide [{slide.slide_number}] :  "+ slide.slide_text +"\n"
-            
-            self.prompt = prompt
-            openai = ChatOpenAI(model)
-            response = openai.predict(prompt)
-            return response
-        elif method == "all":
-            prompt  = "You are provided with PPT slide content. Based on the provided Slide Content try to answer the following question. Be clear and answer accurately, if not answer 'I don't know'. While answering cite the slide number as source. Example ( Corrrect cites : [1] [2] [3] , Incorrect [1,2,3]). \n Question : " + query + " Slide Wise Content : \n\n"
-            for slide in self.slides:
-                prompt += f"Slide [{slide.slide_number}] :  "+ slide.slide_text +"\n"
-            self.prompt = prompt
-            openai = ChatOpenAI(model)
-            response = openai.predict(prompt)
-            return response
-        else:
-            raise Exception("Method",method,"not supported.")
-        
-        
-        
-        
\ No newline at end of file
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from ..extractors.pptx import PPTExtractor
+from ..chat_model.backends import OpenAIChatBackend
+from ..embedding.openai import get_embedding, get_embeddings, count_tokens
+from ..retrieval.index import SlideIndex
+from ..retrieval.context import ContextBuilder, context_budget
+from ..retrieval.lexical import BM25Index, hybrid_search_ids
+from .cache import AnswerCache
+
+ALL_SUMMARY_PROMPT = "Generate a detailed Summary for each slides, explain the charts and tables in detail. \n\n"
+REDUCE_SUMMARY_PROMPT = "You are given summaries of consecutive parts of one presentation. Combine them into a single detailed Summary for each slides, explain the charts and tables in detail and keep the slide numbers. \n\n"
+
+class PPTSummarizer(PPTExtractor):
+    def __init__(self, file_path, extraction_method: str = "slide", ocr_engine: str = "tesseract", client = None, chat_backend = None, **kwargs) -> None:
+        """
+        Extracts the presentation for summarization.
+
+        Args:
+            client (AsyncOpenAIClient, optional): The client of the default OpenAI chat backend.
+            chat_backend (Callable, optional): Creates the chat model of every completion from a model name, e.g. an OpenAIChatBackend pointed at a local server or a ReplayChatBackend (see chat_model.backends). Defaults to OpenAIChatBackend(client).
+        """
+        super().__init__(file_path, extraction_method, ocr_engine, **kwargs)
+        self.client = client
+        self.chat_backend = chat_backend or OpenAIChatBackend(client)
+        super().extract()
+
+    def _summary_tasks(self, summarize_method : str):
+        """
+        Lists the independent completions a summarize method needs, as (slide number, title, type, text).
+        """
+        tasks = []
+        for slide in self.slides:
+            if summarize_method == "slide":
+                tasks.append((slide.slide_number, slide.slide_title, "slide", slide.slide_text))
+            elif summarize_method == "object":
+                slide_text = ''
+                for entity in slide.entities:
+                    if entity.chart_type == "text":
+                        slide_text += entity.text
+                    else:
+                        tasks.append((slide.slide_number, slide.slide_title, entity.chart_type, entity.text))
+                if len(slide_text) > 0:
+                    tasks.append((slide.slide_number, slide.slide_title, "text", slide_text))
+            elif summarize_method == "charts":
+                for entity in slide.entities:
+                    if entity.chart_type == "table" or entity.chart_type == "chart":
+                        tasks.append((slide.slide_number, slide.slide_title, entity.chart_type, entity.text))
+            else:
+                raise Exception("Concurrent summary supports 'slide', 'object' and 'charts' methods")
+        return tasks
+
+    def _summarize_task(self, task, summarize_method : str, summarize_model : str, system_prompt : str) -> dict:
+        """
+        Sends the completion of one task of _summary_tasks and returns it as a dict tagged with
+        "Slide Number" and "Title" (and "Type" for the object and charts methods).
+        """
+        slide_number, slide_title, entity_type, text = task
+        openai = self.chat_backend(summarize_model)
+        openai.add_system_prompt(system_prompt)
+        result = {"Slide Number": slide_number, "Title": slide_title, "Summary": openai.predict(text)}
+        if summarize_method != "slide":
+            result["Type"] = entity_type
+        return result
+
+    def _summarize_concurrently(self, summarize_method : str, summarize_model : str, system_prompt : str, concurrency : int, ordered : bool):
+        """
+        Sends the completions of a summarize method in parallel, at most `concurrency` at a time.
+
+        Yields the results of _summarize_task, either as they complete or in slide order.
+        """
+        def summarize_task(task):
+            return self._summarize_task(task, summarize_method, summarize_model, system_prompt)
+
+        tasks = self._summary_tasks(summarize_method)
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        try:
+            if ordered:
+                yield from executor.map(summarize_task, tasks)
+            else:
+                futures = [executor.submit(summarize_task, task) for task in tasks]
+                for future in as_completed(futures):
+                    yield future.result()
+        finally:
+            # Stop queued completions if the caller stops consuming early.
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _all_prompt(self, summarize_model : str, system_prompt : str, concurrency : int = 1, max_context_tokens = None):
+        """
+        Returns the prompt of the "all" summary, packed into the model's context budget.
+
+        When the whole deck fits, the prompt holds every slide. Otherwise the slides are split
+        into consecutive groups that fit and each group is summarized (map, `concurrency`
+        requests at a time); the prompt then combines the group summaries (reduce), repeating
+        the map step on the summaries until they fit.
+        """
+        header = ALL_SUMMARY_PROMPT
+        budget = max_context_tokens or context_budget(summarize_model, system_prompt + header)
+        builder = ContextBuilder(budget, overflow="trim", separator="\n\n")
+        entries = [(" SLIDE NUMBER : " + str(slide.slide_number) + "\n\n", slide.slide_text, slide.tokens) for slide in self.slides]
+        spans = [(slide.slide_number, slide.slide_number) for slide in self.slides]
+
+        def summarize_group(text):
+            openai = self.chat_backend(summarize_model)
+            openai.add_system_prompt(system_prompt)
+            return openai.predict(header + text)
+
+        while True:
+            groups = builder.groups(entries)
+            if len(groups) <= 1:
+                return header + (groups[0][0] if groups else "")
+            if header is REDUCE_SUMMARY_PROMPT and len(groups) == len(entries):
+                # Summaries too long to pair up would never converge; keep what fits.
+                return header + builder.pack(entries)[0]
+            with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+                summaries = list(executor.map(summarize_group, [text for text, _ in groups]))
+            spans = [(spans[indices[0]][0], spans[indices[-1]][1]) for _, indices in groups]
+            entries = [(f" SUMMARY OF SLIDES {first} TO {last} :\n\n", summary, None) for (first, last), summary in zip(spans, summaries)]
+            header = REDUCE_SUMMARY_PROMPT
+        
+    def summarize(self,summarize_method : str = "slide",slide_number : int = 0 ,summarize_model : str = "gpt-3.5-turbo-16k", system_prompt : str = "You are passed PPT Slide Information like text,tables,charts table, image ocr extracted text. You have to generate the summary of the slide. Make sure to site your answer if answering from a table or charts and be accuracte.", concurrency : int = 1, max_context_tokens = None):
+        """
+        Summarizes the presentation.
+
+        With summarize_method "slide", "object" or "charts" and concurrency > 1, the
+        completions are sent in parallel with at most `concurrency` requests in flight; the
+        result keeps slide order. "object" and "charts" return one dict per text group, table,
+        chart or image, tagged with "Slide Number", "Title" and "Type".
+
+        With summarize_method "all", a deck larger than the model context (or than
+        max_context_tokens) is summarized map-reduce style, see _all_prompt.
+        """
+        if summarize_method in ("slide", "object", "charts") and concurrency > 1:
+            return list(self._summarize_concurrently(summarize_method, summarize_model, system_prompt, concurrency, ordered=True))
+        if summarize_method in ("object", "charts"):
+            return [self._summarize_task(task, summarize_method, summarize_model, system_prompt) for task in self._summary_tasks(summarize_method)]
+        if summarize_method == "slide":
+            summarize_response = []
+            for slide in self.slides:
+                slide_text = slide.slide_text
+                openai = self.chat_backend(summarize_model)
+                openai.add_system_prompt(system_prompt)
+                response = openai.predict(slide_text)
+                summarize_response.append({"Slide Number":slide.slide_number, "Title" : slide.slide_title, "Summary" : response})
+            return summarize_response
+        elif summarize_method == "all":
+            prompt = self._all_prompt(summarize_model, system_prompt, concurrency, max_context_tokens)
+            openai = self.chat_backend(summarize_model)
+            openai.add_system_prompt(system_prompt)
+            response = openai.predict(prompt)
+            return response
+        elif summarize_method == "single":
+            for slide in self.slides:
+                if (slide_number > len(self.slides)) or (slide_number <= 0):
+                    raise Exception("Enter Slide Number for 'single' mode.")
+                else:
+                    prompt = ""
+                    for slide in self.slides:
+                        if int(slide.slide_number) == int(slide_number):
+                            prompt += slide.slide_text
+                            break
+                    openai = self.chat_backend(summarize_model)
+                    openai.add_system_prompt(system_prompt)
+                    response = openai.predict(prompt)
+                    return response
+        else:
+            raise Exception("Slide wise summary supported")
+        
+    def summarize_stream(self,summarize_method : str = "slide",slide_number : int = 0, summarize_model : str ="gpt-3.5-turbo-16k", system_prompt : str = "You are passed PPT Slide Information like text,tables,charts table, image ocr extracted text. You have to generate the summary of the slide. Make sure to site your answer if answering from a table or charts and be accuracte.", concurrency : int = 1, ordered : bool = False, max_context_tokens = None):
+        """
+        Yields summaries of the presentation.
+
+        The "slide", "object" and "charts" methods yield dicts tagged with "Slide Number" and
+        "Title" ("Type" for object and charts). With concurrency > 1 their completions are sent
+        in parallel and yielded as soon as each completes, or in slide order if `ordered` is True.
+        """
+        if concurrency > 1 and summarize_method in ("slide", "object", "charts"):
+            yield from self._summarize_concurrently(summarize_method, summarize_model, system_prompt, concurrency, ordered)
+            return
+        if summarize_method == "slide":
+            for slide in self.slides:
+                slide_text = slide.slide_text
+                openai = self.chat_backend(summarize_model)
+                openai.add_system_prompt(system_prompt)
+                response = openai.predict(slide_text)
+                yield {"Slide Number":slide.slide_number, "Title" : slide.slide_title, "Summary" : response}
+        elif summarize_method == "all":
+            prompt = self._all_prompt(summarize_model, system_prompt, concurrency, max_context_tokens)
+            openai = self.chat_backend(summarize_model)
+            openai.add_system_prompt(system_prompt)
+            response = openai.predict(prompt)
+            yield response
+        elif summarize_method == "single":
+            for slide in self.slides:
+                if (slide_number >= len(self.slides)+1) or (slide_number <= 0):
+                    raise Exception("Enter Slide Number for 'single' mode.")
+                else:
+                    prompt = ""
+                    for slide in self.slides:
+                        if int(slide.slide_number) == int(slide_number):
+                            prompt += slide.slide_text
+                            break
+            openai = self.chat_backend(summarize_model)
+            openai.add_system_prompt(system_prompt)
+            response = openai.predict(prompt)
+            yield response
+        elif summarize_method in ("object", "charts"):
+            for task in self._summary_tasks(summarize_method):
+                yield self._summarize_task(task, summarize_method, summarize_model, system_prompt)
+        else:
+            raise Exception("Slide wise summary supported")
+        
+    def summarize_token_stream(self,summarize_method : str = "slide",slide_number : int = 0, summarize_model : str ="gpt-3.5-turbo-16k", system_prompt : str = "You are passed PPT Slide Information like text,tables,charts table, image ocr extracted text. You have to generate the summary of the slide. Make sure to site your answer if answering from a table or charts and be accuracte.", cancel_event = None, max_context_tokens = None):
+        """
+        Yields summaries token by token instead of one whole slide at a time.
+
+        Each item is a dict with "Slide Number" (None for the "all" method), "Title" and the
+        "Delta" text. The usage record of every completion is appended to self.usage.
+
+        Args:
+            summarize_method (str, optional): "slide", "single" or "all". Defaults to "slide".
+            slide_number (int, optional): The slide to summarize with the "single" method.
+            cancel_event (threading.Event, optional): Stops the stream when set.
+            max_context_tokens (int, optional): The context budget of the "all" method. Defaults to what the model window leaves.
+        """
+        if summarize_method == "slide":
+            prompts = [(slide.slide_number, slide.slide_title, slide.slide_text) for slide in self.slides]
+        elif summarize_method == "single":
+            prompts = [(slide.slide_number, slide.slide_title, slide.slide_text) for slide in self.slides if int(slide.slide_number) == int(slide_number)]
+            if not prompts:
+                raise Exception("Enter Slide Number for 'single' mode.")
+        elif summarize_method == "all":
+            # Map steps of an oversized deck run before the first token; the final summary streams.
+            prompts = [(None, self.title, self._all_prompt(summarize_model, system_prompt, max_context_tokens=max_context_tokens))]
+        else:
+            raise Exception("Token streaming supports 'slide', 'single' and 'all' methods")
+        self.usage = []
+        for number, title, prompt in prompts:
+            openai = self.chat_backend(summarize_model)
+            openai.add_system_prompt(system_prompt)
+            try:
+                for delta in openai.stream(prompt, cancel_event):
+                    yield {"Slide Number": number, "Title": title, "Delta": delta}
+            finally:
+                self.usage.append(openai.last_usage)
+            if cancel_event is not None and cancel_event.is_set():
+                return
+
+class PPTQnA(PPTSummarizer):
+    
+    def __init__(self, file_path, extraction_method: str = "slide", ocr_engine: str = "tesseract", index_backend = None, chunk_tokens = None, fusion : str = "rrf", lexical_margin = 1.5, answer_cache : AnswerCache = None, **kwargs) -> None:
+        super().__init__(file_path, extraction_method, ocr_engine, **kwargs)
+        self.retriever = []
+        self.prompt = ""
+        self.last_usage = None
+        self.index = SlideIndex(self.slides, backend=index_backend, embedder=self.embedder)
+        # Built over the indexed slides so that lexical and vector ids line up for fusion.
+        self.lexical_index = BM25Index(self.index.slides)
+        self.fusion = fusion
+        self.lexical_margin = lexical_margin
+        self.query_embedded = False
+        self.answer_cache = answer_cache
+        self.cache_hit = None
+        self._answer_fingerprint = None
+        self.chunk_tokens = chunk_tokens
+        self._chunk_index = None
+
+    @property
+    def chunk_index(self) -> SlideIndex:
+        """
+        An index over the slide chunks used by the "chunks" method, built and embedded on first use.
+        """
+        if self._chunk_index is None:
+            self._chunk_index = SlideIndex(self.build_chunks(self.chunk_tokens), embedder=self.embedder)
+        return self._chunk_index
+        
+    def _answer_scope(self, model : str, method : str) -> str:
+        """
+        Returns the answer cache scope of the current deck content. Answers about previous
+        versions of the deck are dropped the first time a new fingerprint is seen.
+        """
+        fingerprint = self.fingerprint()
+        if fingerprint != self._answer_fingerprint:
+            self.answer_cache.invalidate_deck(self.file_path, fingerprint)
+            self._answer_fingerprint = fingerprint
+        if method == "chunks" and self.chunk_tokens:
+            # The cached sources are chunks, which depend on the chunk size.
+            method = f"chunks:{self.chunk_tokens}"
+        return AnswerCache.scope(self.file_path, fingerprint, model, method)
+
+    def _cached_answer(self, query, method : str, model : str):
+        """
+        Looks the query up in the answer cache. On a hit self.retriever is restored from the
+        cached sources, the slides or with the "chunks" method the chunks the answer was built
+        from, and self.cache_hit holds the entry. Semantic matching only runs for
+        the methods that embed the query anyway ("similarity" and "chunks"), so a cache miss
+        never adds an embedding call to the other methods.
+
+        Returns:
+            (answer or None, query embedding or None)
+        """
+        self.cache_hit = None
+        if self.answer_cache is None:
+            return None, None
+        embedder = self.embedder if method in ("similarity", "chunks") else None
+        entry, query_embedding = self.answer_cache.lookup(self._answer_scope(model, method), query, embedder)
+        if entry is None:
+            return None, query_embedding
+        self.cache_hit = entry
+        if method == "chunks":
+            chunks = {(chunk.slide_number, chunk.chunk_number): chunk for chunk in self._source_chunks()}
+            self.retriever = [chunks[tuple(source)] for source in entry["sources"] if tuple(source) in chunks]
+        else:
+            slides = {slide.slide_number: slide for slide in self.slides}
+            self.retriever = [slides[number] for number in entry["sources"] if number in slides]
+        self.prompt = ""
+        return entry["answer"], query_embedding
+
+    def _source_chunks(self) -> list:
+        """
+        The chunks cached "chunks" answers cite: those of the chunk index if it is built,
+        else the same chunks rebuilt without embedding them.
+        """
+        if self._chunk_index is not None:
+            return self._chunk_index.slides
+        return self.build_chunks(self.chunk_tokens, embedding=False)
+
+    def _cache_answer(self, query, method : str, model : str, answer, query_embedding) -> None:
+        if self.answer_cache is not None:
+            if method == "chunks":
+                sources = [[chunk.slide_number, chunk.chunk_number] for chunk in self.retriever]
+            else:
+                sources = list(dict.fromkeys(slide.slide_number for slide in self.retriever))
+            self.answer_cache.store(self._answer_scope(model, method), query, answer, query_embedding, sources)
+
+    def _build_prompt(self, query, method : str = "similarity", k=10, similarity_score=0.6, model : str = "gpt-3.5-turbo-16k", max_context_tokens = None, query_embedding = None):
+        """
+        Builds the answer prompt, packing the slides into the context budget: the most similar
+        slides first with the "similarity" method, the best BM25 matches with "lexical", both
+        rankings fused with "hybrid", the most similar slide chunks (text, table row groups,
+        chart data, image text) with "chunks", the deck in order with "all". A slide or chunk
+        that does not fit is trimmed to the remaining budget and the rest are left out;
+        self.retriever holds the slides or chunks that made it into the prompt.
+
+        The "hybrid" method only embeds the query when the lexical result is not confident
+        (see retrieval.lexical.is_confident); self.query_embedded records whether it did.
+        A query_embedding already computed (by the answer cache) is reused.
+        """
+        prompt = "You are provided with PPT slide content. Based on the provided Slide Content try to answer the following question. Be clear and answer accurately, if not answer 'I don't know'. While answering cite the slide number as source. Example ( Corrrect cites : [1] [2] [3] , Incorrect [1,2,3]). \n Question : " + query + " Slide Wise Content : \n\n"
+        self.query_embedded = method in ("similarity", "chunks")
+        def embed_query(text):
+            return query_embedding if query_embedding is not None else self.embedder([text])[0]
+        if method == "similarity":
+            query_embedding = embed_query(query)
+            slides = [slide for slide, score in self.index.search(query_embedding, k=k, threshold=similarity_score)]
+        elif method == "lexical":
+            slides = [slide for slide, score in self.lexical_index.search(query, k=k)]
+        elif method == "hybrid":
+            def dense_search_ids(text):
+                return self.index.search_ids(embed_query(text), k=k, threshold=similarity_score)
+            ids, scores, self.query_embedded = hybrid_search_ids(query, self.lexical_index, dense_search_ids, k, self.fusion, min_margin=self.lexical_margin)
+            slides = [self.index.slides[i] for i in ids]
+        elif method == "chunks":
+            query_embedding = embed_query(query)
+            slides = [chunk for chunk, score in self.chunk_index.search(query_embedding, k=k, threshold=similarity_score)]
+        elif method == "all":
+            slides = self.slides
+        else:
+            raise Exception("Method",method,"not supported.")
+        builder = ContextBuilder(max_context_tokens or context_budget(model, prompt))
+        context, included = builder.pack([(f"Slide [{slide.slide_number}] :  ", slide.slide_text, slide.tokens) for slide in slides])
+        self.retriever = [slides[i] for i in included]
+        prompt += context
+        self.prompt = prompt
+        return prompt
+
+    def run(self, query,method : str = "similarity" ,model : str ="gpt-3.5-turbo-16k", k=10, similarity_score=0.6, max_context_tokens = None):
+        answer, query_embedding = self._cached_answer(query, method, model)
+        if answer is not None:
+            return answer
+        prompt = self._build_prompt(query, method, k, similarity_score, model, max_context_tokens, query_embedding)
+        openai = self.chat_backend(model)
+        response = openai.predict(prompt)
+        self._cache_answer(query, method, model, response, query_embedding)
+        return response
+
+    def run_stream(self, query,method : str = "similarity" ,model : str ="gpt-3.5-turbo-16k", k=10, similarity_score=0.6, cancel_event = None, max_context_tokens = None):
+        """
+        Answers a question like run(), yielding the answer token by token.
+
+        The usage record of the answer, with its time to first token, is stored in
+        self.last_usage once the stream ends or is cancelled. A cached answer is yielded whole;
+        a streamed answer is only cached if the stream was not cancelled.
+        """
+        answer, query_embedding = self._cached_answer(query, method, model)
+        if answer is not None:
+            self.last_usage = None
+            yield answer
+            return
+        prompt = self._build_prompt(query, method, k, similarity_score, model, max_context_tokens, query_embedding)
+        openai = self.chat_backend(model)
+        tokens = []
+        try:
+            for token in openai.stream(prompt, cancel_event):
+                tokens.append(token)
+                yield token
+        finally:
+            self.last_usage = openai.last_usage
+        if cancel_event is None or not cancel_event.is_set():
+            self._cache_answer(query, method, model, "".join(tokens), query_embedding)
+
+
+class CorpusQnA:
+    """
+    Answers questions over every deck stored in a SlideCorpus, without re-extracting any file.
+    """
+    def __init__(self, corpus, chat_backend = None) -> None:
+        self.corpus = corpus
+        self.chat_backend = chat_backend or OpenAIChatBackend()
+        self.embedder = corpus.embedder if corpus.embedder is not None else get_embeddings
+        if corpus.embedding_cache is not None:
+            self.embedder = corpus.embedding_cache.wrap(self.embedder)
+        self.retriever = []
+        self.prompt = ""
+
+    def run(self, query, model : str ="gpt-3.5-turbo-16k", k=10, similarity_score=0.6, max_context_tokens = None, method : str = "similarity"):
+        if method == "similarity":
+            query_embedding = self.embedder([query])[0]
+            results = self.corpus.search(query_embedding, k=k, threshold=similarity_score)
+        elif method == "hybrid":
+            results, embedded = self.corpus.hybrid_search(query, k=k, threshold=similarity_score, embedder=self.embedder)
+        else:
+            raise Exception("Method",method,"not supported.")
+        prompt = "You are provided with slide content from several PPT decks. Based on the provided Slide Content try to answer the following question. Be clear and answer accurately, if not answer 'I don't know'. While answering cite the deck and slide number as source. Example ( Corrrect cites : [Deck A.pptx, 1] [Deck B.pptx, 3] ). \n Question : " + query + " Slide Wise Content : \n\n"
+        builder = ContextBuilder(max_context_tokens or context_budget(model, prompt))
+        context, included = builder.pack([(f"[{os.path.basename(deck['file_path'])}, {slide.slide_number}] :  ", slide.slide_text, slide.tokens) for deck, slide, score in results])
+        self.retriever = [results[i] for i in included]
+        prompt += context
+        self.prompt = prompt
+        openai = self.chat_backend(model)
+        response = openai.predict(prompt)
+        return response
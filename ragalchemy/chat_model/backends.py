@@ -0,0 +1,232 @@
+"""
+Chat backends.
+
+A chat backend is a callable mapping a model name to a fresh ChatModel for one
+conversation. PPTSummarizer, PPTQnA and CorpusQnA take one as `chat_backend` and ask it for
+every completion they send:
+
+    OpenAIChatBackend    ChatOpenAI over the OpenAI API or any OpenAI-compatible server (vLLM, llama.cpp, ...)
+    ReplayChatBackend    deterministic answers replayed from a recording or generated, with simulated latency; no network
+    RecordingChatBackend wraps another backend and records its answers for ReplayChatBackend
+"""
+import asyncio
+import hashlib
+import json
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Union
+
+from .base import ChatModel
+from .openai import ChatOpenAI
+
+
+def messages_key(messages: List[dict]) -> str:
+    """
+    Returns the key a conversation's answer is recorded and replayed under.
+    """
+    return hashlib.sha256(json.dumps([[m["role"], m["content"]] for m in messages]).encode("utf-8")).hexdigest()
+
+
+class OpenAIChatBackend:
+    """
+    Creates ChatOpenAI models, optionally through an AsyncOpenAIClient pointed at an
+    OpenAI-compatible server.
+    """
+    def __init__(self, client = None, base_url: Optional[str] = None, api_key: Optional[str] = None, model_name: Optional[str] = None, **client_kwargs) -> None:
+        """
+        Initializes the OpenAIChatBackend object.
+
+        Args:
+            client (AsyncOpenAIClient, optional): The client to send requests with. The blocking openai SDK is used if neither client nor base_url is given.
+            base_url (str, optional): The API root of an OpenAI-compatible server, e.g. "http://localhost:8000/v1". A client is created for it.
+            api_key (str, optional): The API key of the server at base_url. Local servers usually accept any value.
+            model_name (str, optional): The model to use whatever the caller asks for, e.g. the model a local server serves.
+            **client_kwargs: Passed to AsyncOpenAIClient with base_url, e.g. max_concurrency.
+        """
+        if client is None and base_url is not None:
+            from ..utils.async_client import AsyncOpenAIClient
+            client = AsyncOpenAIClient(api_key=api_key or "EMPTY", base_url=base_url, **client_kwargs)
+        self.client = client
+        self.model_name = model_name
+
+    def __call__(self, model_name: str) -> ChatOpenAI:
+        return ChatOpenAI(self.model_name or model_name, client=self.client)
+
+
+class ReplayChat(ChatModel):
+    """
+    A chat model answering from a ReplayChatBackend.
+    """
+    def __init__(self, model_name: str, backend: "ReplayChatBackend") -> None:
+        super().__init__(model_name)
+        self.backend = backend
+
+    def _respond(self, prompt: str) -> str:
+        self.messages.append({"role": "user", "content": prompt})
+        return self.backend.response(self.messages)
+
+    def predict(self, prompt : str) -> str:
+        response = self._respond(prompt)
+        time.sleep(self.backend.latency + self.backend.token_delay * len(_deltas(response)))
+        return response
+
+    async def apredict(self, prompt : str) -> str:
+        response = self._respond(prompt)
+        await asyncio.sleep(self.backend.latency + self.backend.token_delay * len(_deltas(response)))
+        return response
+
+    def stream(self, prompt : str, cancel_event = None):
+        start = time.perf_counter()
+        first_token = None
+        completion = []
+        cancelled = False
+        response = self._respond(prompt)
+        try:
+            time.sleep(self.backend.latency)
+            for delta in _deltas(response):
+                if cancel_event is not None and cancel_event.is_set():
+                    cancelled = True
+                    break
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                completion.append(delta)
+                yield delta
+                time.sleep(self.backend.token_delay)
+        except GeneratorExit:
+            cancelled = True
+            raise
+        finally:
+            self.last_usage = self.usage_record("".join(completion), start, first_token, cancelled)
+
+    async def astream(self, prompt : str):
+        start = time.perf_counter()
+        first_token = None
+        completion = []
+        cancelled = False
+        response = self._respond(prompt)
+        try:
+            await asyncio.sleep(self.backend.latency)
+            for delta in _deltas(response):
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                completion.append(delta)
+                yield delta
+                await asyncio.sleep(self.backend.token_delay)
+        except (GeneratorExit, asyncio.CancelledError):
+            cancelled = True
+            raise
+        finally:
+            self.last_usage = self.usage_record("".join(completion), start, first_token, cancelled)
+
+
+def _deltas(text: str) -> List[str]:
+    return re.findall(r"\s*\S+", text) or [text]
+
+
+class ReplayChatBackend:
+    """
+    Answers deterministically without any network: from recorded responses keyed by the
+    conversation (see RecordingChatBackend), else from a default.
+
+    latency and token_delay simulate a server's time to first token and per-token time, so
+    summarization and QnA throughput can be load-tested end to end on machines with no
+    network. The number of completions served is counted in self.calls.
+    """
+    def __init__(
+            self,
+            responses: Optional[Dict[str, str]] = None,
+            path: Optional[str] = None,
+            default: Union[str, Callable[[List[dict]], str], None] = None,
+            latency: float = 0.0,
+            token_delay: float = 0.0
+        ) -> None:
+        """
+        Initializes the ReplayChatBackend object.
+
+        Args:
+            responses (Dict[str, str], optional): Responses by messages_key of the conversation.
+            path (str, optional): A JSONL file written by RecordingChatBackend to load responses from.
+            default (str or Callable, optional): The response to unrecorded conversations, or a function of the messages returning it. Defaults to a stub naming the prompt size and digest. Pass "" to raise on unrecorded conversations instead.
+            latency (float, optional): The simulated time to first token, in seconds. Defaults to 0.
+            token_delay (float, optional): The simulated time per output token, in seconds. Defaults to 0.
+        """
+        self.responses = dict(responses or {})
+        if path is not None:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    record = json.loads(line)
+                    self.responses[record["key"]] = record["response"]
+        self.default = default
+        self.latency = latency
+        self.token_delay = token_delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def response(self, messages: List[dict]) -> str:
+        """
+        Returns the response to a conversation.
+        """
+        with self._lock:
+            self.calls += 1
+        key = messages_key(messages)
+        if key in self.responses:
+            return self.responses[key]
+        if self.default == "":
+            raise Exception("No recorded response for conversation", key)
+        if callable(self.default):
+            return self.default(messages)
+        if self.default is not None:
+            return self.default
+        prompt = messages[-1]["content"]
+        return f"Stub response to a {len(prompt.split())} word prompt ({key[:12]})."
+
+    def __call__(self, model_name: str) -> ReplayChat:
+        return ReplayChat(model_name, self)
+
+
+class RecordingChat(ChatModel):
+    """
+    A chat model that forwards to another one and records its predictions.
+    """
+    def __init__(self, model: ChatModel, backend: "RecordingChatBackend") -> None:
+        super().__init__(model.model_name)
+        self.model = model
+        self.messages = model.messages
+        self.backend = backend
+
+    def predict(self, prompt : str) -> str:
+        response = self.model.predict(prompt)
+        self.backend.record(self.messages, response)
+        return response
+
+    def stream(self, prompt : str, cancel_event = None):
+        completion = []
+        try:
+            for delta in self.model.stream(prompt, cancel_event):
+                completion.append(delta)
+                yield delta
+        finally:
+            self.last_usage = self.model.last_usage
+        if not (self.last_usage or {}).get("cancelled"):
+            self.backend.record(self.messages, "".join(completion))
+
+
+class RecordingChatBackend:
+    """
+    Wraps a chat backend and appends every answer it gives to a JSONL file, keyed by the
+    conversation, for ReplayChatBackend(path=...).
+    """
+    def __init__(self, backend: Callable[[str], ChatModel], path: str) -> None:
+        self.backend = backend
+        self.path = path
+        self._lock = threading.Lock()
+
+    def record(self, messages: List[dict], response: str) -> None:
+        line = json.dumps({"key": messages_key(messages), "response": response})
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def __call__(self, model_name: str) -> RecordingChat:
+        return RecordingChat(self.backend(model_name), self)
@@ -0,0 +1,137 @@
+import asyncio
+import time
+from typing import Optional
+
+
+class ChatModel:
+    """
+    The interface of a chat model: one conversation with a model, held in self.messages.
+
+    Subclasses implement predict(), and override apredict(), stream() and astream() when the
+    model supports them natively; the defaults here run predict() in a thread and deliver its
+    answer as a single delta. stream() leaves a usage record in self.last_usage.
+
+    The summarizer and QnA classes do not build chat models themselves but ask a chat
+    backend for one: any callable mapping a model name to a ChatModel (see chat_model.backends).
+    """
+    def __init__(self, model_name: str) -> None:
+        """
+        Initializes the ChatModel object.
+
+        Parameters:
+            model_name (str): The chat model name.
+        """
+        self.model_name = model_name
+        self.messages = []
+        self.last_usage = None
+
+    def add_system_prompt(
+            self, 
+            system_prompt:str
+        ) -> None:
+        """
+        Adds a system prompt to the list of messages.
+
+        Parameters:
+            system_prompt (str): The system prompt to be added.
+
+        Returns:
+            None
+        """
+        message = {
+            "role": "system",
+            "content": system_prompt
+        }
+        self.messages.append(message)
+    
+    def add_history(
+            self,
+            user: str,
+            assistant: str
+        ) -> None:
+        """
+        Add a user and assistant message to the chat history.
+
+        Parameters:
+            user (str): The user message to be added.
+            assistant (str): The assistant message to be added.
+
+        Returns:
+            None
+        """
+        # Create a dictionary representing the user message
+        user_message = {"role": "user", "content": user}
+        # Create a dictionary representing the assistant message
+        assistant_message = {"role": "assistant", "content": assistant}
+        # Append the user message to the chat history
+        self.messages.append(user_message)
+        # Append the assistant message to the chat history.
+        self.messages.append(assistant_message)
+
+    def predict(self, prompt : str) -> str:
+        """
+        Predicts the response to a prompt.
+
+        Parameters:
+            prompt (str): The user prompt.
+
+        Returns:
+            str: The assistant response.
+        """
+        raise NotImplementedError
+
+    async def apredict(self, prompt : str) -> str:
+        """
+        Asynchronously predicts the response to a prompt.
+        """
+        return await asyncio.to_thread(self.predict, prompt)
+
+    def stream(self, prompt : str, cancel_event = None):
+        """
+        Predicts the response to a prompt, yielding content deltas. By default the whole
+        response is one delta.
+
+        Yields:
+            str: The content deltas.
+        """
+        start = time.perf_counter()
+        response = ""
+        cancelled = cancel_event is not None and cancel_event.is_set()
+        try:
+            if not cancelled:
+                response = self.predict(prompt)
+                yield response
+        finally:
+            self.last_usage = self.usage_record(response, start, time.perf_counter() - start if response else None, cancelled)
+
+    async def astream(self, prompt : str):
+        """
+        Asynchronously predicts the response to a prompt, yielding content deltas. Leaves a
+        usage record in self.last_usage like stream().
+        """
+        start = time.perf_counter()
+        response = ""
+        try:
+            response = await self.apredict(prompt)
+            yield response
+        finally:
+            self.last_usage = self.usage_record(response, start, time.perf_counter() - start if response else None, False)
+
+    def usage_record(self, completion : str, start : float, first_token : Optional[float], cancelled : bool) -> dict:
+        """
+        Returns the usage record of a completion of the current messages: token counts
+        (measured with count_tokens), the time to first token, the total time since start and
+        whether the completion was cancelled.
+        """
+        from ..embedding.openai import count_tokens
+        prompt_tokens = sum(count_tokens(m["content"]) for m in self.messages)
+        completion_tokens = count_tokens(completion)
+        return {
+            "model": self.model_name,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "time_to_first_token": first_token,
+            "total_time": time.perf_counter() - start,
+            "cancelled": cancelled
+        }
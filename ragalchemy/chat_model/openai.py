@@ -1,63 +1,139 @@
-import openai
-openai.api_key = "OPENAIKEY"
-
-class ChatOpenAI:
-    def __init__(self, model_name):
-        self.model_name = model_name
-        self.messages = []
-        
-    def add_system_prompt(
-            self, 
-            system_prompt:str
-        ) -> None:
-        """
-        Adds a system prompt to the list of messages.
-
-        Parameters:
-            system_prompt (str): The system prompt to be added.
-
-        Returns:
-            None
-        """
-        message = {
-            "role": "system",
-            "content": system_prompt
-        }
-        self.messages.append(message)
-    
-    def add_history(
-            self,
-            user: str,
-            assistant: str
-        ) -> None:
-        """
-        Add a user and assistant message to the chat history.
-
-        Parameters:
-            user (str): The user message to be added.
-            assistant (str): The assistant message to be added.
-
-        Returns:
-            None
-        """
-        # Create a dictionary representing the user message
-        user_message = {"role": "user", "content": user}
-        # Create a dictionary representing the assistant message
-        assistant_message = {"role": "assistant", "content": assistant}
-        # Append the user message to the chat history
-        self.messages.append(user_message)
-        # Append the assistant message to the chat history.
-        self.messages.append(assistant_message)
-
-    
-    def predict(self, prompt : str):
-        message = {"role": "user", "content": prompt}
-        self.messages.append(message)
-        response = openai.ChatCompletion.create(
-                model=self.model_name,
-                messages=self.messages,
-                temperature=0.0,
-                max_tokens=1500,
-                stream=False
-            )
-        return response.choices[0]["message"]["content"].strip()
+import asyncio
+import time
+
+from ..embedding.openai import openai
+from .base import ChatModel
+
+class ChatOpenAI(ChatModel):
+    def __init__(self, model_name, client = None):
+        """
+        Initializes the ChatOpenAI object.
+
+        Parameters:
+            model_name (str): The chat model name.
+            client (AsyncOpenAIClient, optional): A pooled, rate-limited client used instead of the blocking openai SDK call. Point its base_url at any OpenAI-compatible server (vLLM, llama.cpp, ...) to use a local model.
+        """
+        super().__init__(model_name)
+        self.client = client
+
+    def predict(self, prompt : str):
+        message = {"role": "user", "content": prompt}
+        self.messages.append(message)
+        if self.client is not None:
+            response = self.client.chat_completion_sync(self.messages, self.model_name, temperature=0.0, max_tokens=1500)
+            return response["choices"][0]["message"]["content"].strip()
+        response = openai.ChatCompletion.create(
+                model=self.model_name,
+                messages=self.messages,
+                temperature=0.0,
+                max_tokens=1500,
+                stream=False
+            )
+        return response.choices[0]["message"]["content"].strip()
+
+    async def apredict(self, prompt : str):
+        """
+        Asynchronously predicts the response to a prompt.
+
+        Parameters:
+            prompt (str): The user prompt.
+
+        Returns:
+            str: The assistant response.
+        """
+        from ..utils.async_client import get_default_client
+        client = self.client if self.client is not None else get_default_client()
+        message = {"role": "user", "content": prompt}
+        self.messages.append(message)
+        response = await client.chat_completion(self.messages, self.model_name, temperature=0.0, max_tokens=1500)
+        return response["choices"][0]["message"]["content"].strip()
+
+    def stream(self, prompt : str, cancel_event = None):
+        """
+        Predicts the response to a prompt, yielding content deltas as the model produces them.
+
+        When the stream ends, is cancelled or the generator is closed, self.last_usage holds a
+        usage record with the time to first token, the total time, token counts (measured with
+        count_tokens, since streamed responses carry no usage) and whether it was cancelled.
+
+        Parameters:
+            prompt (str): The user prompt.
+            cancel_event (threading.Event, optional): Stops the stream when set.
+
+        Yields:
+            str: The content deltas.
+        """
+        message = {"role": "user", "content": prompt}
+        self.messages.append(message)
+        start = time.perf_counter()
+        first_token = None
+        completion = []
+        cancelled = False
+        response = None
+        if self.client is not None:
+            deltas = self.client.chat_completion_stream_sync(self.messages, self.model_name, temperature=0.0, max_tokens=1500)
+        else:
+            response = openai.ChatCompletion.create(
+                    model=self.model_name,
+                    messages=self.messages,
+                    temperature=0.0,
+                    max_tokens=1500,
+                    stream=True
+                )
+            deltas = (chunk["choices"][0]["delta"].get("content") or "" for chunk in response)
+        try:
+            for delta in deltas:
+                if cancel_event is not None and cancel_event.is_set():
+                    cancelled = True
+                    break
+                if not delta:
+                    continue
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                completion.append(delta)
+                yield delta
+        except GeneratorExit:
+            cancelled = True
+            raise
+        finally:
+            deltas.close()
+            if response is not None:
+                # Closing the generator expression alone leaves the SDK's streaming response open.
+                response.close()
+            self.last_usage = self.usage_record("".join(completion), start, first_token, cancelled)
+
+    async def astream(self, prompt : str):
+        """
+        Asynchronously predicts the response to a prompt, yielding content deltas as they arrive.
+
+        Leaves a usage record in self.last_usage like stream().
+
+        Parameters:
+            prompt (str): The user prompt.
+
+        Yields:
+            str: The content deltas.
+        """
+        from ..utils.async_client import get_default_client
+        client = self.client if self.client is not None else get_default_client()
+        message = {"role": "user", "content": prompt}
+        self.messages.append(message)
+        start = time.perf_counter()
+        first_token = None
+        completion = []
+        cancelled = False
+        deltas = client.chat_completion_stream(self.messages, self.model_name, temperature=0.0, max_tokens=1500)
+        try:
+            async for delta in deltas:
+                if not delta:
+                    continue
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                completion.append(delta)
+                yield delta
+        except (GeneratorExit, asyncio.CancelledError):
+            cancelled = True
+            raise
+        finally:
+            await deltas.aclose()
+            self.last_usage = self.usage_record("".join(completion), start, first_token, cancelled)
@@ -0,0 +1,265 @@
+"""
+Embedding backends.
+
+An embedder anywhere in ragalchemy is a callable mapping a list of texts to their
+embeddings. The backends below are such callables that also declare their model_name (the
+key EmbeddingCache namespaces entries by) and dim, and return an (n, dim) float32 array.
+They can be passed as `embedder` to PPTExtractor, PPTQnA, SlideCorpus, SlideIndex and
+IngestionPipeline:
+
+    OpenAIEmbeddingBackend        the OpenAI embeddings API (the default behaviour)
+    SentenceTransformerBackend    a local sentence-transformers model, batched on CPU or GPU
+    ONNXEmbeddingBackend          a local ONNX export of a transformer encoder, run with onnxruntime
+    HashingEmbeddingBackend       feature hashing of words; no model and no network, for tests and smoke runs
+
+Local models are imported and loaded on first use, once per process and set of settings.
+Their dependencies are the "sentence-transformers" and "onnx" extras of the package, e.g.
+`pip install ragalchemy[onnx]`.
+"""
+import re
+import threading
+import zlib
+from typing import List, Optional
+
+import numpy as np
+
+# Models loaded in this process, shared by every backend with the same settings.
+_loaded_models = {}
+_load_lock = threading.Lock()
+
+
+def _l2_normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+
+class EmbeddingBackend:
+    """
+    The base class of embedding backends. Subclasses implement embed().
+    """
+    model_name: str = ""
+    dim: Optional[int] = None
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embeds a list of texts.
+
+        Returns:
+            np.ndarray: The (len(texts), dim) float32 embeddings, in input order.
+        """
+        raise NotImplementedError
+
+    def __call__(self, texts: List[str]) -> np.ndarray:
+        texts = list(texts)
+        if not texts:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        return self.embed(texts)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.model_name!r})"
+
+
+class OpenAIEmbeddingBackend(EmbeddingBackend):
+    """
+    Embeds texts with the OpenAI embeddings API, with one multi-input request per call.
+    """
+    def __init__(self, model_name: str = "text-embedding-ada-002", client = None, dim: Optional[int] = 1536) -> None:
+        """
+        Initializes the OpenAIEmbeddingBackend object.
+
+        Args:
+            model_name (str, optional): The embedding model. Defaults to "text-embedding-ada-002".
+            client (AsyncOpenAIClient, optional): A pooled, rate-limited client used instead of the blocking openai SDK call.
+            dim (int, optional): The embedding dimension of the model. Defaults to 1536.
+        """
+        self.model_name = model_name
+        self.client = client
+        self.dim = dim
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        if self.client is not None:
+            embeddings = self.client.embeddings_sync(texts, self.model_name)
+        else:
+            from ..embedding.openai import openai
+            response = openai.Embedding.create(model=self.model_name, input=texts)
+            embeddings = [item["embedding"] for item in sorted(response["data"], key=lambda item: item["index"])]
+        return np.asarray(embeddings, dtype=np.float32)
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """
+    Embeds texts with a local sentence-transformers model.
+
+    The whole list is encoded in one call that the library splits into batch_size batches,
+    so callers can pass large batches. num_threads caps the intra-op threads torch uses on
+    CPU, which keeps throughput predictable next to other work.
+    """
+    def __init__(
+            self,
+            model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+            device: str = "cpu",
+            batch_size: int = 32,
+            num_threads: Optional[int] = None,
+            normalize: bool = True
+        ) -> None:
+        """
+        Initializes the SentenceTransformerBackend object.
+
+        Args:
+            model_name (str, optional): A sentence-transformers model name or local directory. Defaults to "sentence-transformers/all-MiniLM-L6-v2".
+            device (str, optional): The torch device. Defaults to "cpu".
+            batch_size (int, optional): The number of texts per forward pass. Defaults to 32.
+            num_threads (int, optional): The number of CPU threads torch uses. Defaults to torch's own choice.
+            normalize (bool, optional): L2-normalize the embeddings. Defaults to True.
+        """
+        self.model_name = model_name
+        self.device = device
+        self.batch_size = batch_size
+        self.num_threads = num_threads
+        self.normalize = normalize
+        self.dim = None
+
+    def _load(self):
+        key = ("sentence-transformers", self.model_name, self.device, self.num_threads)
+        with _load_lock:
+            if key not in _loaded_models:
+                import torch
+                from sentence_transformers import SentenceTransformer
+
+                if self.num_threads is not None:
+                    torch.set_num_threads(self.num_threads)
+                _loaded_models[key] = SentenceTransformer(self.model_name, device=self.device)
+        model = _loaded_models[key]
+        self.dim = model.get_sentence_embedding_dimension()
+        return model
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        model = self._load()
+        embeddings = model.encode(texts, batch_size=self.batch_size, convert_to_numpy=True, normalize_embeddings=self.normalize, show_progress_bar=False)
+        return np.asarray(embeddings, dtype=np.float32)
+
+
+class ONNXEmbeddingBackend(EmbeddingBackend):
+    """
+    Embeds texts with an ONNX export of a transformer encoder, run with onnxruntime.
+
+    The token embeddings of the first model output are mean-pooled over the attention mask
+    (or the first token is taken with pooling="cls"). onnxruntime needs no torch, which
+    keeps the install small for air-gapped ingestion hosts.
+    """
+    def __init__(
+            self,
+            model_path: str,
+            tokenizer: str,
+            batch_size: int = 32,
+            max_length: int = 256,
+            num_threads: Optional[int] = None,
+            pooling: str = "mean",
+            normalize: bool = True,
+            model_name: Optional[str] = None
+        ) -> None:
+        """
+        Initializes the ONNXEmbeddingBackend object.
+
+        Args:
+            model_path (str): The .onnx model file.
+            tokenizer (str): The tokenizer name or local directory, loaded with transformers.AutoTokenizer.
+            batch_size (int, optional): The number of texts per inference run. Defaults to 32.
+            max_length (int, optional): The maximum number of tokens per text; longer texts are truncated. Defaults to 256.
+            num_threads (int, optional): The number of intra-op threads of the session. Defaults to onnxruntime's own choice.
+            pooling (str, optional): "mean" or "cls". Defaults to "mean".
+            normalize (bool, optional): L2-normalize the embeddings. Defaults to True.
+            model_name (str, optional): The name the embeddings are cached under. Defaults to model_path.
+        """
+        self.model_path = model_path
+        self.tokenizer = tokenizer
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.num_threads = num_threads
+        self.pooling = pooling
+        self.normalize = normalize
+        self.model_name = model_name or model_path
+        self.dim = None
+
+    def _load(self):
+        key = ("onnx", self.model_path, self.tokenizer, self.num_threads)
+        with _load_lock:
+            if key not in _loaded_models:
+                import onnxruntime
+                from transformers import AutoTokenizer
+
+                options = onnxruntime.SessionOptions()
+                if self.num_threads is not None:
+                    options.intra_op_num_threads = self.num_threads
+                session = onnxruntime.InferenceSession(self.model_path, options, providers=["CPUExecutionProvider"])
+                _loaded_models[key] = (AutoTokenizer.from_pretrained(self.tokenizer), session)
+        return _loaded_models[key]
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        tokenizer, session = self._load()
+        input_names = {node.name for node in session.get_inputs()}
+        batches = []
+        for start in range(0, len(texts), self.batch_size):
+            encoded = tokenizer(texts[start:start + self.batch_size], padding=True, truncation=True, max_length=self.max_length, return_tensors="np")
+            feed = {name: np.asarray(value, dtype=np.int64) for name, value in encoded.items() if name in input_names}
+            hidden = session.run(None, feed)[0]
+            if self.pooling == "cls":
+                pooled = hidden[:, 0]
+            else:
+                mask = encoded["attention_mask"][..., None].astype(np.float32)
+                pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            batches.append(pooled.astype(np.float32))
+        embeddings = np.concatenate(batches)
+        self.dim = embeddings.shape[1]
+        return _l2_normalize(embeddings) if self.normalize else embeddings
+
+
+class HashingEmbeddingBackend(EmbeddingBackend):
+    """
+    Embeds texts by feature hashing their lowercase words and word bigrams into a signed
+    dim-sized vector. Texts sharing words get similar vectors, which is enough for tests,
+    CI and air-gapped smoke runs; it has no notion of meaning.
+    """
+    def __init__(self, dim: int = 384, bigrams: bool = True) -> None:
+        """
+        Initializes the HashingEmbeddingBackend object.
+
+        Args:
+            dim (int, optional): The embedding dimension. Defaults to 384.
+            bigrams (bool, optional): Also hash pairs of consecutive words. Defaults to True.
+        """
+        self.dim = dim
+        self.bigrams = bigrams
+        self.model_name = f"hashing-{dim}{'-bigrams' if bigrams else ''}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        embeddings = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = re.findall(r"\w+", text.lower())
+            features = words + [a + " " + b for a, b in zip(words, words[1:])] if self.bigrams else words
+            for feature in features:
+                h = zlib.crc32(feature.encode("utf-8"))
+                embeddings[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        return _l2_normalize(embeddings)
+
+
+def get_backend(spec: str) -> EmbeddingBackend:
+    """
+    Creates a backend from a short specification, as accepted by the ingestion CLI:
+    "openai[:model]", "sentence-transformers[:model]", "onnx:model.onnx:tokenizer" or
+    "hashing[:dim]".
+    """
+    kind, _, argument = spec.partition(":")
+    if kind == "openai":
+        return OpenAIEmbeddingBackend(argument) if argument else OpenAIEmbeddingBackend()
+    if kind == "sentence-transformers":
+        return SentenceTransformerBackend(argument) if argument else SentenceTransformerBackend()
+    if kind == "onnx":
+        model_path, _, tokenizer = argument.rpartition(":")
+        if not model_path or not tokenizer:
+            raise Exception("The onnx backend is specified as onnx:<model.onnx>:<tokenizer>")
+        return ONNXEmbeddingBackend(model_path, tokenizer)
+    if kind == "hashing":
+        return HashingEmbeddingBackend(int(argument)) if argument else HashingEmbeddingBackend()
+    raise Exception("Embedding backend", spec, "not supported.")
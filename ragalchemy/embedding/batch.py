@@ -0,0 +1,87 @@
+from typing import Callable, List, Optional
+
+from ..embedding.openai import count_tokens, get_embeddings
+
+# text-embedding-ada-002 accepts up to 2048 inputs per request; the token budget keeps
+# each request small enough to return quickly.
+MAX_BATCH_SIZE = 2048
+MAX_BATCH_TOKENS = 50000
+
+
+def make_token_batches(token_counts: List[int], max_batch_tokens: int = MAX_BATCH_TOKENS, max_batch_size: int = MAX_BATCH_SIZE) -> List[List[int]]:
+    """
+    Packs texts into batches that stay within a token budget.
+
+    Texts keep their original order. A text larger than the budget on its own is placed in
+    a batch by itself.
+
+    Args:
+        token_counts (List[int]): The number of tokens of each text.
+        max_batch_tokens (int, optional): The maximum number of tokens per batch. Defaults to MAX_BATCH_TOKENS.
+        max_batch_size (int, optional): The maximum number of texts per batch. Defaults to MAX_BATCH_SIZE.
+
+    Returns:
+        List[List[int]]: The batches, as lists of indices into token_counts.
+    """
+    batches = []
+    batch = []
+    batch_tokens = 0
+    for index, tokens in enumerate(token_counts):
+        if batch and (batch_tokens + tokens > max_batch_tokens or len(batch) >= max_batch_size):
+            batches.append(batch)
+            batch = []
+            batch_tokens = 0
+        batch.append(index)
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def embed_in_batches(
+        texts: List[str],
+        embedder: Callable[[List[str]], List[List[float]]] = get_embeddings,
+        token_counts: Optional[List[int]] = None,
+        max_batch_tokens: int = MAX_BATCH_TOKENS,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        on_error: Optional[Callable[[int, Exception], None]] = None
+    ) -> List[Optional[List[float]]]:
+    """
+    Embeds a list of texts using token-budgeted multi-input requests.
+
+    If a batch request fails, its texts are retried one by one so that a single bad input
+    does not lose the embeddings of the whole batch.
+
+    Args:
+        texts (List[str]): The texts to embed.
+        embedder (Callable, optional): Maps a list of texts to a list of embeddings. Defaults to get_embeddings.
+        token_counts (List[int], optional): Precomputed token counts of the texts. Counted with count_tokens if not passed.
+        max_batch_tokens (int, optional): The maximum number of tokens per request. Defaults to MAX_BATCH_TOKENS.
+        max_batch_size (int, optional): The maximum number of texts per request. Defaults to MAX_BATCH_SIZE.
+        on_error (Callable, optional): Called with the index of the text and the exception when a text cannot be embedded.
+
+    Returns:
+        List[Optional[List[float]]]: The embeddings in input order, None for texts that failed.
+    """
+    if token_counts is None:
+        token_counts = [count_tokens(text) for text in texts]
+    embeddings = [None] * len(texts)
+    for batch in make_token_batches(token_counts, max_batch_tokens, max_batch_size):
+        try:
+            batch_embeddings = embedder([texts[index] for index in batch])
+            if len(batch_embeddings) != len(batch):
+                raise Exception(f"Expected {len(batch)} embeddings, got {len(batch_embeddings)}")
+            for index, embedding in zip(batch, batch_embeddings):
+                embeddings[index] = embedding
+        except Exception as batch_error:
+            if len(batch) == 1:
+                if on_error is not None:
+                    on_error(batch[0], batch_error)
+                continue
+            for index in batch:
+                try:
+                    embeddings[index] = embedder([texts[index]])[0]
+                except Exception as e:
+                    if on_error is not None:
+                        on_error(index, e)
+    return embeddings
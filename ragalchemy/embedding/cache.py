@@ -0,0 +1,132 @@
+import hashlib
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from ..utils.sqlite_cache import SQLiteCache
+
+DEFAULT_EMBEDDING_MODEL = "text-embedding-ada-002"
+
+
+class EmbeddingCache(SQLiteCache):
+    """
+    A content-addressed on-disk cache of embeddings, keyed by hash(model, normalized text).
+
+    Embeddings are stored as float32 blobs. Entries are namespaced by model so that the
+    embeddings of one model can be invalidated without touching the others.
+    """
+    def __init__(self, path: str = ":memory:", model: str = DEFAULT_EMBEDDING_MODEL, max_entries: Optional[int] = 100000, max_bytes: Optional[int] = None) -> None:
+        """
+        Initializes the EmbeddingCache object.
+
+        Args:
+            path (str, optional): The path of the SQLite file. Defaults to an in-memory database.
+            model (str, optional): The model used when an embedder does not declare a model_name.
+            max_entries (int, optional): The maximum number of embeddings kept. Defaults to 100000.
+            max_bytes (int, optional): The maximum total size of the stored embeddings. Unbounded if None.
+        """
+        super().__init__(path, max_entries=max_entries, max_bytes=max_bytes)
+        self.model = model
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """
+        Collapses whitespace so that re-extracted text with different padding hits the same entry.
+        """
+        return " ".join(text.split())
+
+    def key(self, text: str, model: Optional[str] = None) -> str:
+        """
+        Returns the cache key of a text for a model.
+        """
+        model = model or self.model
+        return hashlib.sha256((model + "\x00" + self.normalize_text(text)).encode("utf-8")).hexdigest()
+
+    def get_embeddings(self, texts: List[str], model: Optional[str] = None) -> List[Optional[np.ndarray]]:
+        """
+        Looks up the embeddings of a list of texts.
+
+        Args:
+            texts (List[str]): The texts to look up.
+            model (str, optional): The embedding model. Defaults to the cache model.
+
+        Returns:
+            List[Optional[np.ndarray]]: The cached embeddings in input order, as read-only float32 arrays over the stored bytes, None for misses.
+        """
+        keys = [self.key(text, model) for text in texts]
+        found = self.get_many(keys)
+        return [np.frombuffer(found[key], dtype=np.float32) if key in found else None for key in keys]
+
+    def set_embeddings(self, texts: List[str], embeddings: List[List[float]], model: Optional[str] = None) -> None:
+        """
+        Stores the embeddings of a list of texts.
+        """
+        model = model or self.model
+        self.set_many(
+            [(self.key(text, model), np.asarray(embedding, dtype=np.float32).tobytes()) for text, embedding in zip(texts, embeddings)],
+            namespace=model
+        )
+
+    def embed(self, texts: List[str], embedder: Callable[[List[str]], List[List[float]]], model: Optional[str] = None) -> List[List[float]]:
+        """
+        Returns the embeddings of a list of texts, calling the embedder only for cache misses.
+
+        Args:
+            texts (List[str]): The texts to embed.
+            embedder (Callable): Maps a list of texts to a list of embeddings.
+            model (str, optional): The embedding model. Defaults to the embedder's model_name, then the cache model.
+
+        Returns:
+            List[List[float]]: The embeddings in input order; the cached ones are float32 arrays.
+        """
+        model = model or getattr(embedder, "model_name", None) or self.model
+        embeddings = self.get_embeddings(texts, model)
+        missing = {}
+        for index, embedding in enumerate(embeddings):
+            if embedding is None:
+                missing.setdefault(self.normalize_text(texts[index]), []).append(index)
+        if missing:
+            missing_texts = [texts[indices[0]] for indices in missing.values()]
+            new_embeddings = embedder(missing_texts)
+            self.set_embeddings(missing_texts, new_embeddings, model)
+            for indices, embedding in zip(missing.values(), new_embeddings):
+                for index in indices:
+                    embeddings[index] = embedding
+        return embeddings
+
+    def wrap(self, embedder: Callable[[List[str]], List[List[float]]], model: Optional[str] = None) -> Callable[[List[str]], List[List[float]]]:
+        """
+        Returns an embedder that reads through this cache.
+        """
+        model = model or getattr(embedder, "model_name", None) or self.model
+        def cached_embedder(texts):
+            return self.embed(texts, embedder, model)
+        cached_embedder.model_name = model
+        cached_embedder.dim = getattr(embedder, "dim", None)
+        return cached_embedder
+
+    def warm(self, texts: List[str], embedder: Callable[[List[str]], List[List[float]]], model: Optional[str] = None) -> int:
+        """
+        Embeds and stores the texts that are not cached yet.
+
+        Returns:
+            int: The number of texts that had to be embedded.
+        """
+        misses = self.misses
+        self.embed(texts, embedder, model)
+        return self.misses - misses
+
+    def invalidate(self, texts: Optional[List[str]] = None, model: Optional[str] = None, embedder: Optional[Callable] = None) -> None:
+        """
+        Removes cached embeddings.
+
+        Args:
+            texts (List[str], optional): The texts to remove. If None, every entry of the model is removed.
+            model (str, optional): The embedding model. If None and no texts are passed, the whole cache is cleared.
+            embedder (Callable, optional): The embedder the entries were stored through; its model_name is used when model is None, as in embed(). With neither, texts are removed from the cache model.
+        """
+        model = model or getattr(embedder, "model_name", None)
+        if texts is None:
+            self.clear(model)
+        else:
+            self.delete_many([self.key(text, model) for text in texts])
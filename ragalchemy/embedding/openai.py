@@ -1,32 +1,141 @@
-import tiktoken
-import openai
-
-encoding = tiktoken.get_encoding("cl100k_base")
-openai.api_key = "OPENAIKEY"
-
-def count_tokens(string: str) -> int:
-    """
-    Returns the number of tokens in a text string.
-
-    Args:
-        string (str): The text string.
-
-    Returns:
-        int: The number of tokens.
-    """
-    num_tokens = len(encoding.encode(string))
-    return num_tokens
-
-def get_embedding(text_to_embed):
-    """
-    Retrieves the embedding for a given text.
-
-    Args:
-        text_to_embed (str): The text to embed.
-
-    Returns:
-        str: The embedding.
-    """
-    response = openai.Embedding.create(model="text-embedding-ada-002", input=[text_to_embed])
-    embedding = response["data"][0]["embedding"]
-    return embedding
\ No newline at end of file
+import re
+import threading
+import warnings
+
+from ..utils.lazy import LazyModule
+
+ENCODING_NAME = "cl100k_base"
+
+
+def _default_api_key(module) -> None:
+    # Keep a key set before the SDK was first used (or read from $OPENAI_API_KEY).
+    if module.api_key is None:
+        module.api_key = "OPENAIKEY"
+
+openai = LazyModule("openai", on_import=_default_api_key)
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+class EstimatedEncoding:
+    """
+    A local stand-in for the tiktoken encoding when its BPE ranks cannot be loaded (no
+    network on first use, or tiktoken missing). Words are split into pieces of up to four
+    characters, each with its leading whitespace, and every punctuation mark is a piece,
+    which lands close to cl100k_base counts on English text. decode() joins the pieces,
+    so truncation keeps working.
+    """
+    name = "estimate"
+    _pieces = re.compile(r"\s*\w{1,4}|\s*[^\w\s]|\s+")
+
+    def encode(self, text: str) -> list:
+        return self._pieces.findall(text)
+
+    def decode(self, tokens: list) -> str:
+        return "".join(tokens)
+
+
+def get_encoding():
+    """
+    Returns the tiktoken encoding used to count tokens, built on first use: importing
+    tiktoken and loading the BPE ranks is the most expensive part of start-up. tiktoken
+    downloads the ranks the first time; if that fails, an EstimatedEncoding is used for
+    the rest of the process so that offline extraction with a local embedder still works.
+    """
+    global _encoding
+    if _encoding is None:
+        with _encoding_lock:
+            if _encoding is None:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding(ENCODING_NAME)
+                except Exception as e:
+                    warnings.warn(f"Could not load the {ENCODING_NAME} tokenizer ({e!r}); token counts are estimated.")
+                    _encoding = EstimatedEncoding()
+    return _encoding
+
+def count_tokens(string: str) -> int:
+    """
+    Returns the number of tokens in a text string.
+
+    Args:
+        string (str): The text string.
+
+    Returns:
+        int: The number of tokens.
+    """
+    num_tokens = len(get_encoding().encode(string))
+    return num_tokens
+
+def truncate_tokens(string: str, max_tokens: int) -> str:
+    """
+    Returns the longest prefix of a text string that is at most max_tokens tokens long.
+
+    Args:
+        string (str): The text string.
+        max_tokens (int): The maximum number of tokens.
+
+    Returns:
+        str: The truncated text string.
+    """
+    encoding = get_encoding()
+    tokens = encoding.encode(string)
+    if len(tokens) <= max_tokens:
+        return string
+    return encoding.decode(tokens[:max(max_tokens, 0)])
+
+def get_embedding(text_to_embed, cache=None, client=None):
+    """
+    Retrieves the embedding for a given text.
+
+    Args:
+        text_to_embed (str): The text to embed.
+        cache (EmbeddingCache, optional): A cache consulted before calling the API.
+        client (AsyncOpenAIClient, optional): A pooled, rate-limited client used instead of the blocking openai SDK call.
+
+    Returns:
+        str: The embedding.
+    """
+    if cache is not None or client is not None:
+        return get_embeddings([text_to_embed], cache=cache, client=client)[0]
+    response = openai.Embedding.create(model="text-embedding-ada-002", input=[text_to_embed])
+    embedding = response["data"][0]["embedding"]
+    return embedding
+
+def get_embeddings(texts_to_embed, cache=None, client=None):
+    """
+    Retrieves the embeddings for a list of texts with a single multi-input request.
+
+    Args:
+        texts_to_embed (List[str]): The texts to embed.
+        cache (EmbeddingCache, optional): A cache consulted before calling the API; only misses are requested.
+        client (AsyncOpenAIClient, optional): A pooled, rate-limited client used instead of the blocking openai SDK call.
+
+    Returns:
+        List[List[float]]: The embeddings, in the same order as the input texts.
+    """
+    if cache is not None:
+        return cache.embed(texts_to_embed, lambda texts: get_embeddings(texts, client=client))
+    if client is not None:
+        return client.embeddings_sync(texts_to_embed)
+    response = openai.Embedding.create(model="text-embedding-ada-002", input=list(texts_to_embed))
+    data = sorted(response["data"], key=lambda item: item["index"])
+    return [item["embedding"] for item in data]
+
+async def aget_embeddings(texts_to_embed, client=None):
+    """
+    Asynchronously retrieves the embeddings for a list of texts with a single multi-input request.
+
+    Args:
+        texts_to_embed (List[str]): The texts to embed.
+        client (AsyncOpenAIClient, optional): The client to use. Defaults to the shared default client.
+
+    Returns:
+        List[List[float]]: The embeddings, in the same order as the input texts.
+    """
+    from ..utils.async_client import get_default_client
+    client = client if client is not None else get_default_client()
+    return await client.embeddings(texts_to_embed)
+
+get_embeddings.model_name = "text-embedding-ada-002"
\ No newline at end of file
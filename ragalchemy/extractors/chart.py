@@ -0,0 +1,115 @@
+import io
+from typing import List, Optional, Tuple
+
+from lxml import etree
+from pptx.oxml.ns import nsmap
+
+from ..utils.common_functions import format_table
+from ..utils.lazy import LazyModule
+
+# Only needed by the embedded-workbook fallback.
+pd = LazyModule("pandas")
+
+
+def _format_value(text: Optional[str]) -> str:
+    if text is None:
+        return ""
+    try:
+        # 15 significant digits round-trip the doubles Office writes without float noise.
+        return format(float(text), ".15g")
+    except ValueError:
+        return text
+
+
+_NAMESPACES = nsmap("c")
+_POINT_COUNT = etree.XPath("./c:ptCount/@val", namespaces=_NAMESPACES)
+_POINTS = etree.XPath("./c:pt | ./c:lvl[1]/c:pt", namespaces=_NAMESPACES)
+_POINT_VALUE = etree.XPath("./c:v/text()", namespaces=_NAMESPACES)
+_CACHES = {
+    tag: etree.XPath(
+        f"./c:{tag}/*/c:numCache | ./c:{tag}/*/c:strCache | ./c:{tag}/c:numLit | ./c:{tag}/c:strLit"
+        f" | ./c:{tag}/c:multiLvlStrRef/c:multiLvlStrCache",
+        namespaces=_NAMESPACES
+    )
+    for tag in ("cat", "val", "xVal", "yVal")
+}
+
+
+def _cached_points(ser, tag: str) -> List[Optional[str]]:
+    """
+    Reads the cached points of a c:ser child (c:cat, c:val, c:xVal or c:yVal) by index, with
+    a few precompiled XPath queries per series. python-pptx's Series.values runs one query
+    per point, which dominates on long series. Multi-level categories keep their innermost level.
+    """
+    cache = _CACHES[tag](ser)
+    if not cache:
+        return []
+    cache = cache[0]
+    count = _POINT_COUNT(cache)
+    points = _POINTS(cache)
+    values = [None] * (int(count[0]) if count else len(points))
+    for point in points:
+        index = int(point.get("idx"))
+        text = _POINT_VALUE(point)
+        if index < len(values):
+            values[index] = text[0] if text else None
+    return values
+
+
+def chart_data_from_xml(chart) -> Optional[Tuple[List[str], List[list]]]:
+    """
+    Reads a chart's data from the category, value and x-value caches stored in the chart
+    XML (c:ser/c:cat, c:val, c:xVal, c:yVal), walking the plots and series through
+    python-pptx's plots API, without opening the embedded workbook.
+
+    Args:
+        chart (pptx.chart.chart.Chart): The chart.
+
+    Returns:
+        Optional[Tuple[List[str], List[list]]]: The (header, rows) of a table with one row per
+        category (or x value) and one column per series, or None if the caches hold no values.
+    """
+    labels = []
+    columns = []
+    for plot in chart.plots:
+        for series in plot.series:
+            ser = series._element
+            if not labels:
+                # XY and bubble charts have x values instead of categories.
+                labels = _cached_points(ser, "cat") or [_format_value(value) for value in _cached_points(ser, "xVal")]
+            values = _cached_points(ser, "val") or _cached_points(ser, "yVal")
+            columns.append((series.name or "", values))
+    if not any(value is not None for _, values in columns for value in values):
+        return None
+    length = max([len(labels)] + [len(values) for _, values in columns])
+    labels = [label or "" for label in labels] + [""] * (length - len(labels))
+    rows = []
+    for index in range(length):
+        rows.append([labels[index]] + [_format_value(values[index]) if index < len(values) else "" for _, values in columns])
+    return [""] + [name for name, _ in columns], rows
+
+
+def chart_data_from_workbook(chart) -> Tuple[List[str], List[list]]:
+    """
+    Reads a chart's data from its embedded Excel workbook, for charts whose XML caches are empty.
+    """
+    df = pd.read_excel(io.BytesIO(chart.part.chart_workbook.xlsx_part.blob)).dropna(axis=1, how='all').dropna(axis=0, how='all')
+    return [''] + list(df.columns), [list(row) for row in df.itertuples()]
+
+
+def chart_data_table(chart) -> str:
+    """
+    Renders the data of a chart as a text table, read from the chart XML caches when they
+    are present and from the embedded workbook otherwise.
+
+    Args:
+        chart (pptx.chart.chart.Chart): The chart.
+
+    Returns:
+        str: The table as a string.
+    """
+    data = chart_data_from_xml(chart)
+    if data is None:
+        data = chart_data_from_workbook(chart)
+    header, rows = data
+    return format_table(header, rows)
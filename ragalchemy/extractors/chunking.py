@@ -0,0 +1,179 @@
+from typing import Callable, List
+
+import numpy as np
+
+from ..embedding.openai import count_tokens
+from ..embedding.batch import embed_in_batches, MAX_BATCH_TOKENS, MAX_BATCH_SIZE
+from ..extractors.pptx import Entity, Slide
+
+DEFAULT_CHUNK_TOKENS = 256
+
+
+class Chunk(Slide):
+    """
+    Represents a token-bounded piece of a slide: the slide's text runs, a group of table or
+    chart rows, or the OCR text of an image.
+
+    A Chunk is a Slide whose slide_text is the chunk content prefixed with the slide number
+    and title, so that it embeds and reads in context. It can be embedded, indexed with
+    SlideIndex and packed into prompts like a slide, and is cited by its slide_number.
+    """
+    __slots__ = ("chunk_type", "chunk_number")
+
+    def __init__(self, slide: Slide, chunk_number: int, chunk_type: str, text: str, entities: List[Entity]) -> None:
+        """
+        Initializes the Chunk object.
+
+        Args:
+            slide (Slide): The slide the chunk comes from.
+            chunk_number (int): The 0-based position of the chunk within its slide.
+            chunk_type (str): The type of the entities it was built from: "text", "table", "chart" or "image".
+            text (str): The chunk content, without the slide header.
+            entities (List[Entity]): The entities the chunk was built from.
+        """
+        slide_text = _chunk_header(slide) + text
+        super().__init__(slide.slide_number, slide.slide_title, slide_text, entities, [], count_tokens(slide_text))
+        self.chunk_type = chunk_type
+        self.chunk_number = chunk_number
+
+
+def _chunk_header(slide: Slide) -> str:
+    return f"Slide Number {slide.slide_number}\nSlide Title : {slide.slide_title}\n"
+
+
+def _split_words(line: str, max_tokens: int) -> List[str]:
+    pieces, current, used = [], [], 0
+    for word in line.split(" "):
+        tokens = count_tokens(" " + word)
+        if current and used + tokens > max_tokens:
+            pieces.append(" ".join(current))
+            current, used = [], 0
+        current.append(word)
+        used += tokens
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def _pack_lines(lines: List[str], max_tokens: int, header: str = "", footer: str = "") -> List[str]:
+    fixed = count_tokens(header + footer)
+    pieces, current, used = [], [], fixed
+    for line in lines:
+        tokens = count_tokens(line) + 1
+        if current and used + tokens > max_tokens:
+            pieces.append(header + "\n".join(current) + footer)
+            current, used = [], fixed
+        current.append(line)
+        used += tokens
+    if current:
+        pieces.append(header + "\n".join(current) + footer)
+    return pieces
+
+
+def split_text(text: str, max_tokens: int) -> List[str]:
+    """
+    Splits a text into pieces of at most max_tokens tokens, at line breaks where possible and
+    between words otherwise.
+    """
+    lines = []
+    for line in text.split("\n"):
+        if not line.strip():
+            continue
+        lines.extend([line] if count_tokens(line) <= max_tokens else _split_words(line, max_tokens))
+    return _pack_lines(lines, max_tokens)
+
+
+def split_table(text: str, max_tokens: int) -> List[str]:
+    """
+    Splits a boxed text table (as rendered for slide tables and chart data) into groups of
+    rows of at most max_tokens tokens. Every piece repeats the lines above the table (chart
+    title and type) and the table header, and is closed with the bottom border.
+    """
+    lines = text.split("\n")
+    borders = [i for i, line in enumerate(lines) if line.startswith("+")]
+    if len(borders) < 3:
+        return split_text(text, max_tokens)
+    header_end = borders[1] + 1
+    # Slide tables are rendered without field names, so their real header is the first row.
+    if "Field 1" in lines[borders[0] + 1] and header_end < borders[-1]:
+        header_end += 1
+    header = "\n".join(lines[:header_end]) + "\n"
+    footer = "\n" + lines[borders[-1]]
+    rows = lines[header_end:borders[-1]]
+    if not rows:
+        return [text]
+    return _pack_lines(rows, max_tokens, header, footer)
+
+
+def chunk_slide(slide: Slide, max_tokens: int = DEFAULT_CHUNK_TOKENS) -> List[Chunk]:
+    """
+    Builds the chunks of a slide from its entities: the text runs, grouped by shape, are split
+    into token-bounded pieces; every table and chart is split by row groups; the OCR text of
+    every image is split like text.
+
+    Args:
+        slide (Slide): The slide.
+        max_tokens (int, optional): The maximum number of tokens per chunk, slide header included. Defaults to 256.
+
+    Returns:
+        List[Chunk]: The chunks, text first, then tables, charts and images in slide order.
+    """
+    budget = max(16, max_tokens - count_tokens(_chunk_header(slide)))
+    text_entities = [entity for entity in slide.entities if entity.chart_type == "text"]
+    chunks = []
+    if text_entities:
+        # Runs of the same shape are fragments of its paragraphs; shapes go on separate lines.
+        shapes = {}
+        for entity in text_entities:
+            shapes.setdefault((entity.left, entity.top, entity.width, entity.height), []).append(entity.text)
+        text = "\n".join("".join(runs) for runs in shapes.values())
+        for piece in split_text(text, budget):
+            chunks.append(Chunk(slide, len(chunks), "text", "Slide Text : " + piece, text_entities))
+    for entity in slide.entities:
+        if entity.chart_type in ("table", "chart"):
+            pieces = split_table(entity.text, budget)
+            label = "Slide Table : \n" if entity.chart_type == "table" else "Slide Chart : \n"
+        elif entity.chart_type == "image":
+            pieces = split_text(entity.text, budget)
+            label = "Slide Image OCR Text : \n"
+        else:
+            continue
+        for piece in pieces:
+            chunks.append(Chunk(slide, len(chunks), entity.chart_type, label + piece, [entity]))
+    return chunks
+
+
+def chunk_slides(slides: List[Slide], max_tokens: int = DEFAULT_CHUNK_TOKENS) -> List[Chunk]:
+    """
+    Builds the chunks of several slides, in slide order.
+    """
+    return [chunk for slide in slides for chunk in chunk_slide(slide, max_tokens)]
+
+
+def embed_chunks(
+        chunks: List[Chunk],
+        embedder: Callable[[List[str]], List[List[float]]],
+        max_batch_tokens: int = MAX_BATCH_TOKENS,
+        max_batch_size: int = MAX_BATCH_SIZE
+    ) -> List[Chunk]:
+    """
+    Embeds chunks in token-budgeted multi-input requests. The embeddings are row views of
+    one float32 matrix, as for slides.
+
+    Returns:
+        List[Chunk]: The embedded chunks, without those whose embedding failed.
+    """
+    embeddings = embed_in_batches(
+        [chunk.slide_text for chunk in chunks],
+        embedder,
+        token_counts=[chunk.tokens for chunk in chunks],
+        max_batch_tokens=max_batch_tokens,
+        max_batch_size=max_batch_size
+    )
+    embedded = [(chunk, embedding) for chunk, embedding in zip(chunks, embeddings) if embedding is not None]
+    if not embedded:
+        return []
+    matrix = np.array([embedding for _, embedding in embedded], dtype=np.float32)
+    for (chunk, _), row in zip(embedded, matrix):
+        chunk.embeddings = row
+    return [chunk for chunk, _ in embedded]
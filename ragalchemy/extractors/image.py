@@ -1,102 +1,257 @@
-import io
-import os
-from PIL import Image
-import requests
-  
-def extract_text_from_ocr(img,ocr_engine="tesseract"):
-    if ocr_engine == "tesseract":
-        try:
-            import pytesseract
-            # Replace the below line with the tesseract path for windows, any other operating system comment the below line
-            #pytesseract.pytesseract.tesseract_cmd = r'Tesseract-OCR\tesseract.exe'
-            pil_image = Image.open(img)
-            text = pytesseract.image_to_string(pil_image)
-            return text
-        except:
-            raise Exception("pytesseract not installed. If using Window please download tesseract and pass the path")
-        
-def ImageChartDataExtractor():
-    """
-    Initialize a TableExtractor object.
-    
-    Args:
-        model_name (str): The name or path of the pre-trained model to be used for table extraction.
-        
-    Returns:
-        None
-    """
-    # Import necessary libraries
-    from transformers import Pix2StructProcessor, Pix2StructForConditionalGeneration
-    import torch
-    
-    # Define the constructor
-    def __init__(self, model_name="google/deploy") -> None:
-        # Initialize the Pix2StructProcessor and Pix2StructForConditionalGeneration
-        self.processor = Pix2StructProcessor.from_pretrained(model_name)
-        self.model = Pix2StructForConditionalGeneration.from_pretrained(model_name)
-        # Set the device to GPU if available, otherwise use CPU
-        self.device = "cuda:0" if torch.cuda.is_available() else "cpu"
-        # Move the model to the selected device
-        self.model.to(self.device)
-        
-    # Define the method to extract table from image
-    def extract_chart_data_from_image(self, img) -> str:
-        """
-        Extracts the underlying data table from an image.
-
-        Parameters:
-            img (PIL.Image.Image): The image from which to extract the table.
-
-        Returns:
-            str: The decoded data table extracted from the image.
-        """
-        # Preprocess the image and generate the underlying data table
-        inputs = self.processor(images=img, text="Generate underlying data table of the table/chart/figure below:", return_tensors="pt").to(self.device)
-        # Generate predictions using the model
-        predictions = self.model.generate(**inputs, max_new_tokens=512)
-        # Decode the predictions and remove special tokens
-        return self.processor.decode(predictions[0], skip_special_tokens=True)
-        
-        
-
-def TableTransformer():
-    """
-    Initialize a TableExtractor object.
-    
-    Args:
-        model_name (str): The name or path of the pre-trained model to be used for table extraction.
-        
-    Returns:
-        None
-    """
-    # Import necessary libraries
-    from transformers import AutoImageProcessor, TableTransformerModel
-    import torch
-    
-    # Define the constructor
-    def __init__(self, model_name="microsoft/table-transformer-detection") -> None:
-        # Initialize the Pix2StructProcessor and Pix2StructForConditionalGeneration
-        self.processor = AutoImageProcessor.from_pretrained(model_name)
-        self.model = TableTransformerModel.from_pretrained(model_name)
-        # Set the device to GPU if available, otherwise use CPU
-        self.device = "cuda:0" if torch.cuda.is_available() else "cpu"
-        # Move the model to the selected device
-        self.model.to(self.device)
-        
-    # Define the method to extract table from image
-    def extract_table_from_image(self, img) -> str:
-        """
-        Extracts the underlying data table from an image.
-
-        Parameters:
-            img (PIL.Image.Image): The image from which to extract the table.
-
-        Returns:
-            str: The decoded data table extracted from the image.
-        """
-        # Preprocess the image and generate the underlying data table
-        inputs = self.processor(images=img, return_tensors="pt").to(self.device)
-        # Generate predictions using the model
-        predictions = self.model(**inputs)
-        # Decode the predictions and remove special tokens
+import hashlib
+import io
+import math
+import os
+import threading
+from typing import List, Optional
+from ..utils.lazy import LazyModule
+from ..utils.sqlite_cache import SQLiteCache
+
+Image = LazyModule("PIL.Image")
+
+# Images smaller than this on either side (in pixels) are bullets, dividers or icons.
+MIN_IMAGE_SIDE = 32
+# Images whose grey-level histogram carries less information than this (in bits) are flat
+# fills, gradients or lines. Text and charts are well above it.
+MIN_IMAGE_ENTROPY = 1.0
+
+
+def image_hash(blob: bytes) -> str:
+    """
+    Returns the content hash an image's extracted text is cached under.
+    """
+    return hashlib.sha256(blob).hexdigest()
+
+
+def is_decorative_image(blob: bytes, min_side: int = MIN_IMAGE_SIDE, min_entropy: float = MIN_IMAGE_ENTROPY) -> bool:
+    """
+    Tells whether an image is too small or too uniform to hold text or chart data, using
+    only its header dimensions and the histogram of a small thumbnail.
+
+    Args:
+        blob (bytes): The image file bytes.
+        min_side (int, optional): The minimum width and height, in pixels. Defaults to MIN_IMAGE_SIDE.
+        min_entropy (float, optional): The minimum grey-level entropy, in bits. Defaults to MIN_IMAGE_ENTROPY.
+
+    Returns:
+        bool: True if the image should not be sent to OCR or chart extraction.
+    """
+    try:
+        img = Image.open(io.BytesIO(blob))
+        if min(img.size) < min_side:
+            return True
+        # draft() lets JPEG decode at a reduced scale; other formats ignore it.
+        img.draft("L", (128, 128))
+        img = img.convert("L")
+        img.thumbnail((128, 128))
+    except Exception:
+        # Formats PIL cannot read (EMF/WMF) are left to the OCR engine.
+        return False
+    histogram = img.histogram()
+    total = float(sum(histogram))
+    entropy = -sum(count / total * math.log2(count / total) for count in histogram if count)
+    return entropy < min_entropy
+
+
+class ImageTextCache(SQLiteCache):
+    """
+    A persistent cache of the text extracted from images, keyed by hash(extraction kind, image bytes).
+
+    The extraction kind names the engine (e.g. "ocr:tesseract") so that OCR text and chart
+    data of the same image are kept apart and can be invalidated separately.
+    """
+    def __init__(self, path: str = ":memory:", max_entries: Optional[int] = 100000, max_bytes: Optional[int] = None) -> None:
+        """
+        Initializes the ImageTextCache object.
+
+        Args:
+            path (str, optional): The path of the SQLite file. Defaults to an in-memory database.
+            max_entries (int, optional): The maximum number of texts kept. Defaults to 100000.
+            max_bytes (int, optional): The maximum total size of the stored texts. Unbounded if None.
+        """
+        super().__init__(path, max_entries=max_entries, max_bytes=max_bytes)
+
+    @staticmethod
+    def key(blob_hash: str, kind: str) -> str:
+        return hashlib.sha256((kind + "\x00" + blob_hash).encode("utf-8")).hexdigest()
+
+    def get_text(self, blob_hash: str, kind: str) -> Optional[str]:
+        """
+        Returns the cached text of an image, or None on a miss.
+        """
+        value = self.get(self.key(blob_hash, kind))
+        return None if value is None else value.decode("utf-8")
+
+    def set_text(self, blob_hash: str, kind: str, text: str) -> None:
+        """
+        Stores the text extracted from an image.
+        """
+        self.set(self.key(blob_hash, kind), text.encode("utf-8"), namespace=kind)
+
+  
+def extract_text_from_ocr(img,ocr_engine="tesseract"):
+    if ocr_engine == "tesseract":
+        try:
+            import pytesseract
+            # Replace the below line with the tesseract path for windows, any other operating system comment the below line
+            #pytesseract.pytesseract.tesseract_cmd = r'Tesseract-OCR\tesseract.exe'
+            pil_image = Image.open(img)
+            text = pytesseract.image_to_string(pil_image)
+            return text
+        except:
+            raise Exception("pytesseract not installed. If using Window please download tesseract and pass the path")
+        
+DEPLOT_MODEL = "google/deplot"
+DEPLOT_PROMPT = "Generate underlying data table of the table/chart/figure below:"
+
+# Models loaded in this process, shared by every ImageChartDataExtractor with the same settings.
+_loaded_models = {}
+_load_lock = threading.Lock()
+
+
+class ImageChartDataExtractor:
+    """
+    Extracts the underlying data table of chart images with a Pix2Struct (DePlot) model.
+
+    The model is only imported and loaded on the first extraction, once per process and set
+    of settings, and shared by all extractors; the extractor itself only holds its settings,
+    so it is cheap to create and can be sent to worker processes. Images are run through
+    generate() in batches; Pix2Struct pads every image to the same number of patches, so a
+    batch costs one forward pass per generated token.
+    """
+    def __init__(
+            self,
+            model_name: str = DEPLOT_MODEL,
+            device: Optional[str] = None,
+            batch_size: int = 8,
+            max_new_tokens: int = 512,
+            num_threads: Optional[int] = None,
+            dtype: Optional[str] = None,
+            quantize: bool = False
+        ) -> None:
+        """
+        Initializes the ImageChartDataExtractor object.
+
+        Args:
+            model_name (str, optional): The name or path of the pre-trained model. Defaults to "google/deplot".
+            device (str, optional): The torch device. Defaults to the first GPU if available, otherwise the CPU.
+            batch_size (int, optional): The number of images per generate() call. Defaults to 8.
+            max_new_tokens (int, optional): The maximum length of a decoded table. Defaults to 512.
+            num_threads (int, optional): The number of CPU threads torch uses. Defaults to torch's own choice.
+            dtype (str, optional): "bfloat16" or "float16" to run the model in half precision. Defaults to float32.
+            quantize (bool, optional): Apply int8 dynamic quantization to the linear layers (CPU only). Defaults to False.
+        """
+        self.model_name = model_name
+        self.device = device
+        self.batch_size = batch_size
+        self.max_new_tokens = max_new_tokens
+        self.num_threads = num_threads
+        self.dtype = dtype
+        self.quantize = quantize
+
+    def _load(self):
+        """
+        Returns the (processor, model, device) of this extractor's settings, loading them on first use.
+        """
+        key = (self.model_name, self.device, self.dtype, self.quantize)
+        with _load_lock:
+            if key not in _loaded_models:
+                from transformers import Pix2StructProcessor, Pix2StructForConditionalGeneration
+                import torch
+
+                if self.num_threads is not None:
+                    torch.set_num_threads(self.num_threads)
+                device = self.device or ("cuda:0" if torch.cuda.is_available() else "cpu")
+                processor = Pix2StructProcessor.from_pretrained(self.model_name)
+                model = Pix2StructForConditionalGeneration.from_pretrained(self.model_name)
+                model.eval()
+                if self.dtype is not None:
+                    model = model.to(getattr(torch, self.dtype))
+                if self.quantize:
+                    if device != "cpu":
+                        raise Exception("int8 dynamic quantization is only supported on the CPU")
+                    model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+                model.to(device)
+                _loaded_models[key] = (processor, model, device)
+        return _loaded_models[key]
+
+    def extract_chart_data_from_image(self, img) -> str:
+        """
+        Extracts the underlying data table from an image.
+
+        Parameters:
+            img (PIL.Image.Image or file-like): The image from which to extract the table.
+
+        Returns:
+            str: The decoded data table extracted from the image.
+        """
+        return self.extract_chart_data_from_images([img])[0]
+
+    def extract_chart_data_from_images(self, imgs: List) -> List[str]:
+        """
+        Extracts the underlying data tables from a list of images, batch_size images at a time.
+
+        Parameters:
+            imgs (List[PIL.Image.Image or file-like]): The images from which to extract the tables.
+
+        Returns:
+            List[str]: The decoded data tables, in input order.
+        """
+        import torch
+
+        processor, model, device = self._load()
+        images = [img if isinstance(img, Image.Image) else Image.open(img) for img in imgs]
+        images = [img.convert("RGB") for img in images]
+        tables = []
+        for start in range(0, len(images), self.batch_size):
+            batch = images[start:start + self.batch_size]
+            inputs = processor(images=batch, text=[DEPLOT_PROMPT] * len(batch), return_tensors="pt").to(device)
+            if self.dtype is not None:
+                inputs["flattened_patches"] = inputs["flattened_patches"].to(getattr(torch, self.dtype))
+            with torch.inference_mode():
+                predictions = model.generate(**inputs, max_new_tokens=self.max_new_tokens)
+            tables.extend(processor.batch_decode(predictions, skip_special_tokens=True))
+        return tables
+
+
+def TableTransformer():
+    """
+    Initialize a TableExtractor object.
+    
+    Args:
+        model_name (str): The name or path of the pre-trained model to be used for table extraction.
+        
+    Returns:
+        None
+    """
+    # Import necessary libraries
+    from transformers import AutoImageProcessor, TableTransformerModel
+    import torch
+    
+    # Define the constructor
+    def __init__(self, model_name="microsoft/table-transformer-detection") -> None:
+        # Initialize the Pix2StructProcessor and Pix2StructForConditionalGeneration
+        self.processor = AutoImageProcessor.from_pretrained(model_name)
+        self.model = TableTransformerModel.from_pretrained(model_name)
+        # Set the device to GPU if available, otherwise use CPU
+        self.device = "cuda:0" if torch.cuda.is_available() else "cpu"
+        # Move the model to the selected device
+        self.model.to(self.device)
+        
+    # Define the method to extract table from image
+    def extract_table_from_image(self, img) -> str:
+        """
+        Extracts the underlying data table from an image.
+
+        Parameters:
+            img (PIL.Image.Image): The image from which to extract the table.
+
+        Returns:
+            str: The decoded data table extracted from the image.
+        """
+        # Preprocess the image and generate the underlying data table
+        inputs = self.processor(images=img, return_tensors="pt").to(self.device)
+        # Generate predictions using the model
+        predictions = self.model(**inputs)
+        # Decode the predictions and remove special tokens
         return predictions
\ No newline at end of file
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import zipfile
+from typing import Dict, List, Optional, Tuple
+
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+
+MANIFEST_VERSION = 1
+
+# Relationships that do not change what is extracted from a slide.
+IGNORED_RELATIONSHIPS = {RT.SLIDE_LAYOUT, RT.NOTES_SLIDE}
+
+
+def _hash_part(archive: zipfile.ZipFile, part, digest, seen: set) -> None:
+    """
+    Feeds the raw bytes of a part and, recursively, of the parts it relates to (images,
+    charts, embedded workbooks) into a digest.
+    """
+    partname = str(part.partname)
+    if partname in seen:
+        return
+    seen.add(partname)
+    # Part names are left out: PowerPoint renumbers slide and media parts when slides move.
+    digest.update(archive.read(partname.lstrip("/")))
+    for rel_id in sorted(part.rels):
+        rel = part.rels[rel_id]
+        if rel.is_external:
+            digest.update(rel.target_ref.encode("utf-8"))
+        elif rel.reltype not in IGNORED_RELATIONSHIPS:
+            _hash_part(archive, rel.target_part, digest, seen)
+
+
+def fingerprint_slides(file_path: str, presentation) -> List[str]:
+    """
+    Fingerprints every slide of a presentation from the bytes stored in the .pptx zip: the
+    slide XML part and the media, chart and workbook parts it references. Layouts and notes
+    are left out since they do not change the extracted content.
+
+    Args:
+        file_path (str): The path to the PPT file.
+        presentation (pptx.Presentation): The presentation opened from file_path.
+
+    Returns:
+        List[str]: One sha256 hex digest per slide, in slide order.
+    """
+    fingerprints = []
+    with zipfile.ZipFile(file_path) as archive:
+        for slide in presentation.slides:
+            digest = hashlib.sha256()
+            _hash_part(archive, slide.part, digest, set())
+            fingerprints.append(digest.hexdigest())
+    return fingerprints
+
+
+def occurrence_keys(fingerprints: List[str]) -> List[Tuple[str, int]]:
+    """
+    Pairs every fingerprint with the number of times it occurred before in the list, so
+    identical slides (a repeated divider, say) keep distinct keys.
+    """
+    seen = {}
+    keys = []
+    for fingerprint in fingerprints:
+        keys.append((fingerprint, seen.get(fingerprint, 0)))
+        seen[fingerprint] = keys[-1][1] + 1
+    return keys
+
+
+def load_manifest(path: str, options: dict) -> Optional[dict]:
+    """
+    Loads an ingestion manifest written by save_manifest.
+
+    Args:
+        path (str): The manifest file.
+        options (dict): The extraction options of the current run.
+
+    Returns:
+        Optional[dict]: The manifest, or None if it does not exist or was written with other options or format version.
+    """
+    if not os.path.isfile(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("options") != options:
+        return None
+    return manifest
+
+
+def save_manifest(path: str, file_path: str, options: dict, slides: List, fingerprints: Dict[int, str]) -> None:
+    """
+    Writes the fingerprint, extracted content and embedding of every slide.
+
+    Args:
+        path (str): The manifest file.
+        file_path (str): The path to the PPT file.
+        options (dict): The extraction options the slides were extracted with.
+        slides (List[Slide]): The extracted slides.
+        fingerprints (Dict[int, str]): The fingerprint of each slide, by slide number.
+    """
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "file_path": file_path,
+        "options": options,
+        "slides": [
+            {
+                "fingerprint": fingerprints[slide.slide_number],
+                "slide_number": slide.slide_number,
+                "slide_title": slide.slide_title,
+                "slide_text": slide.slide_text,
+                "tokens": slide.tokens,
+                "entities": [[e.chart_type, e.text, e.left, e.top, e.width, e.height] for e in slide.entities],
+                "embeddings": [float(value) for value in slide.embeddings],
+            }
+            for slide in slides
+        ],
+    }
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
@@ -1,301 +1,928 @@
-import warnings
-warnings.simplefilter(action='ignore', category=FutureWarning)
-
-import io
-import os
-import shutil
-import pandas as pd
-import numpy as np
-
-from enum import Enum
-from PIL import Image
-from pptx import Presentation
-from pptx.enum.shapes import MSO_SHAPE_TYPE, MSO_SHAPE
-from pptx.util import Inches, Cm, Pt
-from pptx.oxml.xmlchemy import OxmlElement
-from pptx.dml.color import ColorFormat, RGBColor
-from typing import List
-
-from ..utils.common_functions import *
-from ..embedding.openai import count_tokens, get_embedding
-from ..extractors.image import extract_text_from_ocr, ImageChartDataExtractor
-class Entity:
-    """
-    Represents an entity with chart type, text, position, and size.
-    """
-    def __init__(self, chart_type: str, text: str, left: int, top: int, width: int, height: int) -> None:
-        """
-        Initializes the Entity object.
-
-        Args:
-            chart_type (str): The type of chart.
-            text (str): The text associated with the entity.
-            left (int): The left position of the entity.
-            top (int): The top position of the entity.
-            width (int): The width of the entity.
-            height (int): The height of the entity.
-        """
-        self.chart_type = chart_type
-        self.text = text
-        self.left = left
-        self.top = top
-        self.width = width
-        self.height = height
-        
-    def __repr__(self): return repr(self.__dict__)
-          
-class Slide:
-    """
-    Represents a slide with slide number, title, text, entities, embeddings, and tokens.
-    """
-    def __init__(self, slide_number: int, slide_title: str, slide_text: str, entities: List[Entity], embeddings: np.array, tokens: int) -> None:
-        """
-        Initializes the Slide object.
-
-        Args:
-            slide_number (int): The number of the slide.
-            slide_title (str): The title of the slide.
-            slide_text (str): The text content of the slide.
-            entities (List[Entity]): The list of entities on the slide.
-            embeddings (np.array): The embeddings associated with the slide.
-            tokens (int): The number of tokens in the slide.
-        """
-        self.slide_number = slide_number
-        self.slide_title = slide_title
-        self.slide_text = slide_text
-        self.entities = entities
-        self.embeddings = embeddings
-        self.tokens = tokens
-        self.similarity = 0
-    
-    def __repr__(self): return repr(self.__dict__)
-        
-        
-class PPTExtractor():
-    def __init__(self, file_path, extraction_method: str = "slide", ocr_engine: str = "tesseract",extract_from_image: bool = False,chart_from_image : bool = False) -> None:
-        """
-        Initializes a PPTExtractor object.
-
-        Args:
-        - file_path (str): The path to the PPT file.
-        - extraction_method (str, optional): The method to extract content from slides. Defaults to "slide".
-        - ocr_engine (str, optional): The OCR engine to use for image text extraction. Defaults to "tesseract".
-        """
-        self.file_path = file_path
-        self.extraction_method = extraction_method
-        self.ocr_engine = ocr_engine
-        self.slides = []
-        self.total_tokens = 0
-        self.extract_from_image = extract_from_image
-        self.chart_from_image = chart_from_image
-
-    def extract(self,maintain_order : bool = False,embedding : bool = True):
-        """
-        Extracts content from the PPT file.
-
-        Raises:
-        - Exception: If the PPT file is not found.
-        """
-        if not os.path.isfile(self.file_path):
-            raise Exception("PPT File not Found")
-
-        presentation = Presentation(self.file_path)
-        self.title = presentation.core_properties.title
-        self.author = presentation.core_properties.author
-        self.subject = presentation.core_properties.subject
-        self.keywords = presentation.core_properties.keywords
-        self.last_modified_by = presentation.core_properties.last_modified_by
-        self.created = presentation.core_properties.created
-        self.modified = presentation.core_properties.modified
-        self.slide_height = presentation.slide_height
-        self.slide_width = presentation.slide_width
-        self.entities = []
-        self.deplot = ImageChartDataExtractor()
-        
-        for slide_number, slide in enumerate(presentation.slides):
-            try:
-                slide_number += 1
-                entities = []
-                slide_wise_text = ''
-                slide_wise_table = ''
-                slide_wise_chart = ''
-                slide_wise_ocr = ''
-
-                slide_title = ""
-                try:
-                    slide_title += slide.shapes.title.text
-                except:
-                    pass
-                
-                
-                slide_text = "Slide Number : "+str(slide_number)
-                slide_text += "\nSlide Title : "+str(slide_title)
-                
-                # Extract text from shapes
-                for shape in slide.shapes:
-                    if shape.has_text_frame:
-                        for paragraph in shape.text_frame.paragraphs:
-                            for run in paragraph.runs:
-                                slide_wise_text += run.text
-                                slide_text += "\nSlide Text : "+run.text
-                                entities.append(Entity("text", run.text, shape.left, shape.top, shape.width, shape.height))
-                    
-                    # Extract table from shapes
-                    if shape.has_table:
-                        table = shape.table
-                        table_str = convert_pptx_table_to_prettytable(table)
-                        slide_wise_table += " \n " + table_str + " \n "
-                        slide_text += "\nSlide Table : "+table_str
-                        entities.append(Entity("table", table_str, shape.left, shape.top, shape.width, shape.height))
-                    
-                    # Extract chart from shapes
-                    if shape.has_chart:
-                        chart = shape.chart
-                        chart_data_df = pd.read_excel(chart.part.chart_workbook.xlsx_part.blob).dropna(axis=1, how='all').dropna(axis=0, how='all')
-                        chart_str = format_dataframe_to_prettytables(chart_data_df)
-                        chart_text = ''
-                        if chart.has_title:
-                            chart_text += "Chart Title : " + chart.chart_title.text_frame.text
-                        chart_text += "\nChart Type : " + str(chart.chart_type) + "\n"
-                        chart_text += chart_str
-                        slide_wise_chart += " \n " + chart_text + " \n "
-                        slide_text += "\nSlide Chart : "+chart_text
-                        entities.append(Entity("chart", chart_text, shape.left, shape.top, shape.width, shape.height))
-                    
-                    # Extract OCR text from images
-                    if shape.shape_type == MSO_SHAPE_TYPE.PICTURE and self.extract_from_image:
-                        if self.chart_from_image:
-                            text = self.deplot.extract_chart_data_from_image(io.BytesIO(shape.image.blob)) 
-                        else:
-                            text = extract_text_from_ocr(io.BytesIO(shape.image.blob))
-                        slide_wise_ocr += text + " \n "
-                        slide_text += "\nSlide OCR : "+text
-                        entities.append(Entity("image", text, shape.left, shape.top, shape.width, shape.height))
-
-                
-                if not maintain_order:
-                    slide_text = f"""
-                    Slide Number {slide_number}
-                    Slide Title : {slide_title}
-                    Slide Text : {slide_wise_text}
-                    Slide Table : 
-                    {slide_wise_table}
-                    Slide Charts Data : 
-                    {slide_wise_chart}
-                    Slide Image OCR Text : 
-                    {slide_wise_ocr}
-                    """
-                
-                tokens = count_tokens(slide_text)
-                self.total_tokens += tokens
-                if embedding:
-                    embeddings = get_embedding(slide_text)
-                else:
-                    embeddings = []
-                self.slides.append(Slide(slide_number, slide_title, slide_text, entities, embeddings, tokens))
-            except Exception as e:
-                print("Ignoring slide ", slide_number, " Error ", e)
-        
-    
-    def persist(self,path : str =None):
-        """
-        Persist the data to a PowerPoint file and save associated text files.
-        """
-        # Check if the PowerPoint file exists
-        if not os.path.isfile(self.file_path):
-            raise Exception("PPT File not Found")
-        # Load the PowerPoint presentation
-        presentation = Presentation(self.file_path)
-
-        # Iterate through each slide in the presentation
-        for slide_number, slide in enumerate(presentation.slides):
-            slide_number += 1
-
-            # Find the corresponding slide in the self.slides list
-            for s in self.slides:
-                if s.slide_number == slide_number:
-                    entities = s.entities
-
-                    # Add shapes and text boxes to the slide for each entity
-                    for e in entities:
-                        a = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, e.left, e.top, e.width, e.height)
-                        txBox = slide.shapes.add_textbox(e.left, e.top, e.width, e.height)
-                        tf = txBox.text_frame
-                        tf.text = e.chart_type
-
-                        # Set the fill color of the shape
-                        fill = a.fill
-                        fill.solid()
-                        fore_color = fill.fore_color
-                        fore_color.rgb = RGBColor(251, 244, 222)
-
-                        # Set the transparency of the fill color
-                        ts = a.fill._xPr.solidFill
-                        sF = ts.get_or_change_to_srgbClr()
-                        sE = SubElement(sF, 'a:alpha', val=str(44000))
-
-        # Get the file extension and folder name
-        _, file_extension = os.path.splitext(self.file_path)
-        foldername = self.file_path.replace(file_extension, "")
-
-        # Delete the folder if it exists, then create a new one
-        if os.path.exists(foldername) and path is None:
-            shutil.rmtree(foldername)
-            print(f"Deleted folder: {foldername}")
-            os.mkdir(foldername)
-            os.mkdir(os.path.join(foldername,"highlight"))
-            os.mkdir(os.path.join(foldername,"slides"))
-            os.mkdir(os.path.join(foldername,"metadata"))
-            print(f"Created folder: {foldername}")
-        else:
-            os.mkdir(foldername)
-            os.mkdir(os.path.join(foldername,"highlight"))
-            os.mkdir(os.path.join(foldername,"slides"))
-            os.mkdir(os.path.join(foldername,"metadata"))
-            print(f"Created folder: {foldername}")
-
-        # Save the modified presentation to a new file
-        presentation.save(os.path.join(foldername,"highlight","highlighted.pptx"))
-
-        # Save associated text files for each slide
-        for slide in self.slides:
-            ent = "\n".join([str(e.__dict__) for e in slide.entities])
-            with open(os.path.join(foldername,"metadata",f"{slide.slide_number}.txt"), "w", encoding="utf-8") as f:
-                f.write(slide.slide_text + "\n\n" + ent)
-            
-    def combine(self):
-        
-        full_text = f"""
-                Presentation Title : {self.title} 
-                Presentation Author : {self.author} 
-                Subject : {self.subject} 
-                Keywords : {self.keywords} 
-                Last Modified Date : {self.last_modified_by} 
-                Created Date : {self.created} 
-                Modified Date : {self.modified}
-                
-        """
-        for slide_num,slide in enumerate(self.slides):
-            full_text += "                  ------------------------------ SLIDE " + str(slide_num+1) + " ------------------------------ \n\n"
-            full_text += slide.slide_text + "\n\n"
-        return full_text
-
-    def to_json(self):
-        return repr(self.__dict__)
-    
-    def to_dataframe(self) -> pd.DataFrame:
-        data = []
-        for slide_num,slide in enumerate(self.slides):
-            slide_num += 1
-            text = ""
-            for ent in slide.entities:
-                if ent.chart_type == "text":
-                    text += ent.text + " "
-                else:
-                    data.append({"Slide Number":slide_num,"Type":ent.chart_type,"Text":ent.text,"Embedding":slide.embeddings,"Position":str([ent.left,ent.top,ent.width,ent.height])})    
-            data.append({"Slide Number":slide_num,"Type":"text","Text":text,"Embedding":slide.embeddings,"Position":str([ent.left,ent.top,ent.width,ent.height])}) 
-        return pd.DataFrame(data)
-    
-    
-    def __repr__(self): return repr(self.__dict__)
-        
\ No newline at end of file
+import warnings
+warnings.simplefilter(action='ignore', category=FutureWarning)
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import numpy as np
+
+from enum import Enum
+from pptx import Presentation
+from pptx.enum.shapes import MSO_SHAPE_TYPE, MSO_SHAPE
+from pptx.util import Inches, Cm, Pt
+from pptx.oxml.xmlchemy import OxmlElement
+from pptx.dml.color import ColorFormat, RGBColor
+from typing import List, Optional
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+from ..utils.common_functions import *
+from ..utils.lazy import LazyModule
+from ..embedding.openai import count_tokens, get_embedding, get_embeddings
+from ..embedding.batch import embed_in_batches, MAX_BATCH_TOKENS, MAX_BATCH_SIZE
+from ..extractors.image import extract_text_from_ocr, ImageChartDataExtractor, image_hash, is_decorative_image
+from ..extractors.chart import chart_data_table
+from ..extractors.incremental import fingerprint_slides, occurrence_keys, load_manifest, save_manifest
+
+pd = LazyModule("pandas")
+
+# Version of the directory format written by PPTExtractor.save.
+DECK_FORMAT_VERSION = 1
+class Entity:
+    """
+    Represents an entity with chart type, text, position, and size.
+    """
+    __slots__ = ("chart_type", "text", "left", "top", "width", "height")
+
+    def __init__(self, chart_type: str, text: str, left: int, top: int, width: int, height: int) -> None:
+        """
+        Initializes the Entity object.
+
+        Args:
+            chart_type (str): The type of chart.
+            text (str): The text associated with the entity.
+            left (int): The left position of the entity.
+            top (int): The top position of the entity.
+            width (int): The width of the entity.
+            height (int): The height of the entity.
+        """
+        self.chart_type = chart_type
+        self.text = text
+        self.left = left
+        self.top = top
+        self.width = width
+        self.height = height
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+        
+    def __repr__(self): return repr(self.to_dict())
+          
+class Slide:
+    """
+    Represents a slide with slide number, title, text, entities, embeddings, and tokens.
+
+    After embedding, Slide.embeddings is a float32 row view into the extractor's shared
+    embedding matrix rather than a list of Python floats.
+    """
+    __slots__ = ("slide_number", "slide_title", "slide_text", "entities", "embeddings", "tokens", "similarity")
+
+    def __init__(self, slide_number: int, slide_title: str, slide_text: str, entities: List[Entity], embeddings: np.array, tokens: int) -> None:
+        """
+        Initializes the Slide object.
+
+        Args:
+            slide_number (int): The number of the slide.
+            slide_title (str): The title of the slide.
+            slide_text (str): The text content of the slide.
+            entities (List[Entity]): The list of entities on the slide.
+            embeddings (np.array): The embeddings associated with the slide.
+            tokens (int): The number of tokens in the slide.
+        """
+        self.slide_number = slide_number
+        self.slide_title = slide_title
+        self.slide_text = slide_text
+        self.entities = entities
+        self.embeddings = embeddings
+        self.tokens = tokens
+        self.similarity = 0
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+    
+    def __repr__(self): return repr(self.to_dict())
+        
+        
+class PPTExtractor():
+    def __init__(self, file_path, extraction_method: str = "slide", ocr_engine: str = "tesseract",extract_from_image: bool = False,chart_from_image : bool = False, embedder = None, embedding_cache = None, workers: int = 1, image_cache = None, skip_decorative_images: bool = True, chart_extractor: ImageChartDataExtractor = None, token_counting: bool = True) -> None:
+        """
+        Initializes a PPTExtractor object.
+
+        Args:
+        - file_path (str): The path to the PPT file.
+        - extraction_method (str, optional): The method to extract content from slides. Defaults to "slide".
+        - ocr_engine (str, optional): The OCR engine to use for image text extraction. Defaults to "tesseract".
+        - embedder (Callable, optional): Maps a list of texts to a list of embeddings, e.g. an EmbeddingBackend from embedding.backends for local models. Defaults to get_embeddings.
+        - embedding_cache (EmbeddingCache, optional): A persistent cache the embedder reads through, so unchanged slides and repeated queries are not re-embedded.
+        - workers (int, optional): The number of processes slides are extracted in. Defaults to 1 (in-process).
+        - image_cache (ImageTextCache, optional): A persistent cache of image OCR text and chart data, so logos and template images repeated across decks are extracted once.
+        - skip_decorative_images (bool, optional): Skip images that are too small or uniform to hold text. Defaults to True.
+        - chart_extractor (ImageChartDataExtractor, optional): The chart-from-image model settings. Defaults to DePlot with default settings.
+        - token_counting (bool, optional): Count the tokens of each slide as it is parsed. Slide.tokens is 0 when off, for callers that count them later. Defaults to True.
+        """
+        self.file_path = file_path
+        self.extraction_method = extraction_method
+        self.ocr_engine = ocr_engine
+        self.slides = []
+        self._fingerprint = None
+        self.total_tokens = 0
+        self.extract_from_image = extract_from_image
+        self.chart_from_image = chart_from_image
+        self.embedder = embedder if embedder is not None else get_embeddings
+        self.embedding_cache = embedding_cache
+        self.workers = workers
+        self.image_cache = image_cache
+        self.skip_decorative_images = skip_decorative_images
+        self.token_counting = token_counting
+        # Image text by (extraction kind, image hash); None marks a decorative image.
+        self._image_texts = {}
+        # Chart-from-image inference is only set up when used; the model itself loads lazily.
+        self.deplot = (chart_extractor or ImageChartDataExtractor()) if chart_from_image else None
+        if embedding_cache is not None:
+            self.embedder = embedding_cache.wrap(self.embedder)
+
+    def _open_presentation(self):
+        """
+        Opens the PPT file and reads the presentation metadata.
+
+        Raises:
+        - Exception: If the PPT file is not found.
+        """
+        if not os.path.isfile(self.file_path):
+            raise Exception("PPT File not Found")
+
+        presentation = Presentation(self.file_path)
+        self.title = presentation.core_properties.title
+        self.author = presentation.core_properties.author
+        self.subject = presentation.core_properties.subject
+        self.keywords = presentation.core_properties.keywords
+        self.last_modified_by = presentation.core_properties.last_modified_by
+        self.created = presentation.core_properties.created
+        self.modified = presentation.core_properties.modified
+        self.slide_height = presentation.slide_height
+        self.slide_width = presentation.slide_width
+        self.entities = []
+        return presentation
+
+    def _extract_slides(self, presentation, indices: List[int], maintain_order: bool = False):
+        """
+        Extracts the slides at the given 0-based indices, in process workers if configured.
+
+        Yields:
+        - (slide_number, Slide or None, error or None) in slide order.
+        """
+        if self.extract_from_image and self.chart_from_image:
+            self._extract_image_texts(presentation, indices)
+        if self.workers > 1 and len(indices) > 1:
+            yield from self._extract_slides_parallel(indices, maintain_order)
+        else:
+            slides = presentation.slides
+            for index in indices:
+                yield self._extract_slide_safely(slides[index], index + 1, maintain_order)
+
+    def extract(self,maintain_order : bool = False,embedding : bool = True):
+        """
+        Extracts content from the PPT file.
+
+        Raises:
+        - Exception: If the PPT file is not found.
+        """
+        self._fingerprint = None
+        for slide in self.iter_slides(maintain_order, embedding):
+            self.slides.append(slide)
+        if embedding:
+            self.pack_embeddings()
+
+    def iter_slides(self, maintain_order : bool = False, embedding : bool = True, sinks : Optional[list] = None, max_batch_tokens: int = MAX_BATCH_TOKENS, max_batch_size: int = MAX_BATCH_SIZE):
+        """
+        Extracts content from the PPT file and yields the finished slides one at a time,
+        without keeping them in self.slides.
+
+        Parsed slides are buffered only until an embedding request is full (max_batch_tokens
+        or max_batch_size), then embedded and yielded, so memory stays bounded on large decks
+        and consumers start working before parsing finishes. Slides are also written to every
+        sink as they are yielded; sinks are closed when the iteration ends. To only fill the
+        sinks, exhaust the iterator, e.g. `for _ in extractor.iter_slides(sinks=[...]): pass`.
+
+        Args:
+        - maintain_order (bool, optional): Passed to the slide extraction. Defaults to False.
+        - embedding (bool, optional): Embed the slides before yielding them. Defaults to True.
+        - sinks (list, optional): Objects with write(slide) and close() methods, e.g. from ragalchemy.pipeline.sinks.
+        - max_batch_tokens (int, optional): The maximum number of tokens per embedding request. Defaults to MAX_BATCH_TOKENS.
+        - max_batch_size (int, optional): The maximum number of slides per embedding request. Defaults to MAX_BATCH_SIZE.
+
+        Yields:
+        - Slide: The extracted slides, in slide order.
+
+        Raises:
+        - Exception: If the PPT file is not found.
+        """
+        sinks = sinks or []
+        presentation = self._open_presentation()
+        buffer = []
+        buffer_tokens = 0
+        try:
+            for slide_number, slide, error in self._extract_slides(presentation, list(range(len(presentation.slides))), maintain_order):
+                if error is not None:
+                    print("Ignoring slide ", slide_number, " Error ", error)
+                    continue
+                self.total_tokens += slide.tokens
+                if not embedding:
+                    yield from self._emit_slides([slide], sinks)
+                    continue
+                if buffer and (len(buffer) >= max_batch_size or buffer_tokens + slide.tokens > max_batch_tokens):
+                    yield from self._emit_slides(self._embed(buffer, max_batch_tokens, max_batch_size), sinks)
+                    buffer, buffer_tokens = [], 0
+                buffer.append(slide)
+                buffer_tokens += slide.tokens
+            if buffer:
+                yield from self._emit_slides(self._embed(buffer, max_batch_tokens, max_batch_size), sinks)
+        finally:
+            for sink in sinks:
+                sink.close()
+
+    @staticmethod
+    def _emit_slides(slides: List["Slide"], sinks: list):
+        for slide in slides:
+            for sink in sinks:
+                sink.write(slide)
+            yield slide
+
+    def extract_incremental(self, manifest_path: str, maintain_order : bool = False, embedding : bool = True):
+        """
+        Extracts content from the PPT file, re-processing only the slides that changed since
+        the last run recorded in a manifest.
+
+        Every slide is fingerprinted from its XML part and the media, chart and workbook parts it
+        references inside the .pptx zip. Slides whose fingerprint is in the manifest reuse their
+        stored Slide record and embedding; a slide that only moved is renumbered and re-embedded
+        without being re-parsed. New and changed slides are extracted and embedded as usual, and
+        removed slides are dropped. The manifest is rewritten at the end.
+
+        The outcome is stored in self.changes as lists of slide numbers under "unchanged",
+        "moved", "changed", "added" and "removed" (removed numbers refer to the previous run).
+
+        Args:
+        - manifest_path (str): The manifest file. Created on the first run.
+        - maintain_order (bool, optional): Passed to the slide extraction. Defaults to False.
+        - embedding (bool, optional): Embed new, changed and moved slides. Defaults to True.
+        """
+        options = {
+            "maintain_order": maintain_order,
+            "extract_from_image": self.extract_from_image,
+            "chart_from_image": self.chart_from_image,
+            "extraction_method": self.extraction_method,
+            "ocr_engine": self.ocr_engine,
+            "skip_decorative_images": self.skip_decorative_images,
+            # Stored embeddings are only reused for the same embedding model.
+            "embedding_model": getattr(self.embedder, "model_name", None),
+            "embedding_dim": getattr(self.embedder, "dim", None),
+        }
+        presentation = self._open_presentation()
+        # Identical slides share a fingerprint, so slides are keyed by (fingerprint, occurrence).
+        keys = occurrence_keys(fingerprint_slides(self.file_path, presentation))
+        manifest = load_manifest(manifest_path, options)
+        previous = {}
+        previous_numbers = {}
+        if manifest is not None:
+            records = manifest["slides"]
+            for key, record in zip(occurrence_keys([record["fingerprint"] for record in records]), records):
+                previous[key] = record
+                previous_numbers[record["slide_number"]] = key
+
+        self.changes = {"unchanged": [], "moved": [], "changed": [], "added": [], "removed": []}
+        slides = {}
+        to_extract = []
+        for index, key in enumerate(keys):
+            slide_number = index + 1
+            record = previous.get(key)
+            if record is None:
+                to_extract.append(index)
+                self.changes["changed" if slide_number in previous_numbers else "added"].append(slide_number)
+                continue
+            entities = [Entity(*entity) for entity in record["entities"]]
+            slide = Slide(slide_number, record["slide_title"], record["slide_text"], entities, record["embeddings"], record["tokens"])
+            if record["slide_number"] == slide_number:
+                self.changes["unchanged"].append(slide_number)
+            else:
+                # The slide text starts with its number, so a moved slide keeps its parsed
+                # content but gets a new header, token count and embedding.
+                header = "Slide Number : {}" if maintain_order else "Slide Number {}"
+                slide.slide_text = slide.slide_text.replace(header.format(record["slide_number"]), header.format(slide_number), 1)
+                slide.tokens = count_tokens(slide.slide_text)
+                slide.embeddings = []
+                self.changes["moved"].append(slide_number)
+            slides[slide_number] = slide
+        current = set(keys)
+        self.changes["removed"] = sorted(number for number, key in previous_numbers.items() if key not in current)
+
+        for slide_number, slide, error in self._extract_slides(presentation, to_extract, maintain_order):
+            if error is not None:
+                print("Ignoring slide ", slide_number, " Error ", error)
+                continue
+            slides[slide_number] = slide
+
+        self.slides = [slides[slide_number] for slide_number in sorted(slides)]
+        self._fingerprint = None
+        self.total_tokens = sum(slide.tokens for slide in self.slides)
+        if embedding:
+            self.embed_slides()
+        save_manifest(manifest_path, self.file_path, options, self.slides, {slide.slide_number: keys[slide.slide_number - 1][0] for slide in self.slides})
+
+    def _extract_slide(self, slide, slide_number: int, maintain_order: bool = False) -> Slide:
+        """
+        Extracts the text, tables, charts and image text of a single slide.
+
+        Args:
+        - slide (pptx.slide.Slide): The slide to extract.
+        - slide_number (int): The 1-based number of the slide.
+        - maintain_order (bool, optional): Keep the shape order in the slide text instead of grouping by content type.
+
+        Returns:
+        - Slide: The extracted slide, without embeddings.
+        """
+        entities = []
+        slide_wise_text = ''
+        slide_wise_table = ''
+        slide_wise_chart = ''
+        slide_wise_ocr = ''
+
+        slide_title = ""
+        try:
+            slide_title += slide.shapes.title.text
+        except:
+            pass
+                
+                
+        slide_text = "Slide Number : "+str(slide_number)
+        slide_text += "\nSlide Title : "+str(slide_title)
+                
+        # Extract text from shapes
+        for shape in slide.shapes:
+            if shape.has_text_frame:
+                for paragraph in shape.text_frame.paragraphs:
+                    for run in paragraph.runs:
+                        slide_wise_text += run.text
+                        slide_text += "\nSlide Text : "+run.text
+                        entities.append(Entity("text", run.text, shape.left, shape.top, shape.width, shape.height))
+                    
+            # Extract table from shapes
+            if shape.has_table:
+                table = shape.table
+                table_str = convert_pptx_table_to_prettytable(table)
+                slide_wise_table += " \n " + table_str + " \n "
+                slide_text += "\nSlide Table : "+table_str
+                entities.append(Entity("table", table_str, shape.left, shape.top, shape.width, shape.height))
+                    
+            # Extract chart from shapes
+            if shape.has_chart:
+                chart = shape.chart
+                chart_str = chart_data_table(chart)
+                chart_text = ''
+                if chart.has_title:
+                    chart_text += "Chart Title : " + chart.chart_title.text_frame.text
+                chart_text += "\nChart Type : " + str(chart.chart_type) + "\n"
+                chart_text += chart_str
+                slide_wise_chart += " \n " + chart_text + " \n "
+                slide_text += "\nSlide Chart : "+chart_text
+                entities.append(Entity("chart", chart_text, shape.left, shape.top, shape.width, shape.height))
+                    
+            # Extract OCR text from images
+            if shape.shape_type == MSO_SHAPE_TYPE.PICTURE and self.extract_from_image:
+                text = self._image_text(shape.image.blob)
+                if text is not None:
+                    slide_wise_ocr += text + " \n "
+                    slide_text += "\nSlide OCR : "+text
+                    entities.append(Entity("image", text, shape.left, shape.top, shape.width, shape.height))
+
+                
+        if not maintain_order:
+            # No indentation and no headers of empty sections: both only cost prompt tokens.
+            sections = [f"Slide Number {slide_number}", f"Slide Title : {slide_title}"]
+            if slide_wise_text:
+                sections.append(f"Slide Text : {slide_wise_text}")
+            for header, content in (("Slide Table", slide_wise_table), ("Slide Charts Data", slide_wise_chart), ("Slide Image OCR Text", slide_wise_ocr)):
+                if content.strip():
+                    sections.append(f"{header} : \n{content.strip()}")
+            slide_text = "\n".join(sections)
+
+        tokens = count_tokens(slide_text) if self.token_counting else 0
+        return Slide(slide_number, slide_title, slide_text, entities, [], tokens)
+
+    def _image_text(self, blob: bytes) -> Optional[str]:
+        """
+        Returns the OCR text (or chart data, with chart_from_image) of an image.
+
+        Images are identified by the hash of their bytes: a repeated image is extracted once
+        per extractor, and once overall when an image_cache is set.
+
+        Returns:
+        - Optional[str]: The extracted text, or None for a decorative image.
+        """
+        blob_hash = image_hash(blob)
+        kind = self._image_kind()
+        if (kind, blob_hash) in self._image_texts:
+            return self._image_texts[kind, blob_hash]
+        if self.skip_decorative_images and is_decorative_image(blob):
+            text = None
+        else:
+            text = self.image_cache.get_text(blob_hash, kind) if self.image_cache is not None else None
+            if text is None:
+                if self.chart_from_image:
+                    text = self.deplot.extract_chart_data_from_image(io.BytesIO(blob))
+                else:
+                    text = extract_text_from_ocr(io.BytesIO(blob), self.ocr_engine)
+                if self.image_cache is not None:
+                    self.image_cache.set_text(blob_hash, kind, text)
+        self._image_texts[kind, blob_hash] = text
+        return text
+
+    def _image_kind(self) -> str:
+        return "chart:" + self.deplot.model_name if self.chart_from_image else "ocr:" + self.ocr_engine
+
+    def extract_image_texts(self) -> dict:
+        """
+        Extracts the text of every distinct picture of the deck (OCR, or chart data with
+        chart_from_image) ahead of parsing. Parsing the slides afterwards reuses it.
+
+        Returns:
+        - dict: The image text by (extraction kind, image hash); None marks a decorative image.
+        """
+        presentation = self._open_presentation()
+        self._extract_image_texts(presentation, list(range(len(presentation.slides))))
+        return self._image_texts
+
+    def _extract_image_texts(self, presentation, indices: List[int]):
+        """
+        Extracts the text of the distinct pictures of the given slides before the slides are
+        parsed. Chart-from-image extraction runs in batches, so the model sees whole-deck
+        batches instead of one image at a time. The results land in the same per-extractor
+        store _image_text reads.
+        """
+        kind = self._image_kind()
+        pending = {}
+        for index in indices:
+            for shape in presentation.slides[index].shapes:
+                if shape.shape_type != MSO_SHAPE_TYPE.PICTURE:
+                    continue
+                try:
+                    blob = shape.image.blob
+                except Exception:
+                    # Linked pictures have no blob; parsing the slide reports them.
+                    continue
+                blob_hash = image_hash(blob)
+                if (kind, blob_hash) in self._image_texts or blob_hash in pending:
+                    continue
+                if self.skip_decorative_images and is_decorative_image(blob):
+                    self._image_texts[kind, blob_hash] = None
+                    continue
+                text = self.image_cache.get_text(blob_hash, kind) if self.image_cache is not None else None
+                if text is not None:
+                    self._image_texts[kind, blob_hash] = text
+                    continue
+                pending[blob_hash] = blob
+        if not pending:
+            return
+        if self.chart_from_image:
+            texts = self.deplot.extract_chart_data_from_images([io.BytesIO(blob) for blob in pending.values()])
+        else:
+            texts = [extract_text_from_ocr(io.BytesIO(blob), self.ocr_engine) for blob in pending.values()]
+        for blob_hash, text in zip(pending, texts):
+            self._image_texts[kind, blob_hash] = text
+            if self.image_cache is not None:
+                self.image_cache.set_text(blob_hash, kind, text)
+
+    def _extract_slide_safely(self, slide, slide_number: int, maintain_order: bool = False):
+        try:
+            return slide_number, self._extract_slide(slide, slide_number, maintain_order), None
+        except Exception as e:
+            return slide_number, None, e
+
+    def _extract_slides_parallel(self, indices: List[int], maintain_order: bool = False):
+        """
+        Extracts slides in a pool of worker processes, yielding results in slide order.
+
+        Each worker opens the presentation once and extracts the slides it is handed, so
+        python-pptx objects never cross process boundaries; only Slide records are returned.
+        """
+        options = {
+            "extraction_method": self.extraction_method,
+            "ocr_engine": self.ocr_engine,
+            "extract_from_image": self.extract_from_image,
+            "chart_from_image": self.chart_from_image,
+            "skip_decorative_images": self.skip_decorative_images,
+            # Workers reopen a file-backed cache; an in-memory one cannot be shared.
+            "image_cache": self.image_cache if self.image_cache is not None and self.image_cache.path != ":memory:" else None,
+            "chart_extractor": self.deplot,
+        }
+        workers = min(self.workers, len(indices))
+        # Only a few slides per worker are queued or finished ahead of the consumer, so a slow
+        # consumer of iter_slides does not let extracted slides pile up in memory.
+        window = workers * 4
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_slide_worker, initargs=(self.file_path, options, self._image_texts)) as executor:
+            futures = deque()
+            for index in indices:
+                futures.append(executor.submit(_extract_slide_in_worker, index, maintain_order))
+                if len(futures) >= window:
+                    yield futures.popleft().result()
+            while futures:
+                yield futures.popleft().result()
+
+    def embed_slides(self, max_batch_tokens: int = MAX_BATCH_TOKENS, max_batch_size: int = MAX_BATCH_SIZE):
+        """
+        Embeds the parsed slides in token-budgeted multi-input requests and stores the
+        results on Slide.embeddings. Slides that already have embeddings are kept as they are.
+
+        Slides whose embedding fails are ignored, as slides that fail to parse are.
+
+        Args:
+        - max_batch_tokens (int, optional): The maximum number of tokens per request. Defaults to MAX_BATCH_TOKENS.
+        - max_batch_size (int, optional): The maximum number of slides per request. Defaults to MAX_BATCH_SIZE.
+        """
+        self.slides = self._embed(self.slides, max_batch_tokens, max_batch_size)
+        self._fingerprint = None
+        self.pack_embeddings()
+
+    def build_chunks(self, max_tokens: Optional[int] = None, embedding: bool = True) -> list:
+        """
+        Splits the extracted slides into token-bounded chunks built from their entities (text
+        runs, table and chart row groups, image text) and embeds them in batches.
+
+        Args:
+        - max_tokens (int, optional): The maximum number of tokens per chunk. Defaults to DEFAULT_CHUNK_TOKENS.
+        - embedding (bool, optional): Embed the chunks. Defaults to True.
+
+        Returns:
+        - List[Chunk]: The chunks, also kept as self.chunks.
+        """
+        from ..extractors.chunking import chunk_slides, embed_chunks, DEFAULT_CHUNK_TOKENS
+
+        self.chunks = chunk_slides(self.slides, max_tokens or DEFAULT_CHUNK_TOKENS)
+        if embedding:
+            self.chunks = embed_chunks(self.chunks, self.embedder)
+        return self.chunks
+
+    def pack_embeddings(self) -> np.ndarray:
+        """
+        Copies the embeddings of all embedded slides into one contiguous float32 matrix and
+        makes each Slide.embeddings a row view of it, so a deck holds one array instead of
+        one boxed float per dimension.
+
+        Returns:
+        - np.ndarray: The (embedded slides, dimension) matrix, also kept as self.embedding_matrix.
+        """
+        embedded = [slide for slide in self.slides if len(slide.embeddings) > 0]
+        if not embedded:
+            self.embedding_matrix = np.empty((0, 0), dtype=np.float32)
+            return self.embedding_matrix
+        self.embedding_matrix = np.array([slide.embeddings for slide in embedded], dtype=np.float32)
+        for slide, row in zip(embedded, self.embedding_matrix):
+            slide.embeddings = row
+        return self.embedding_matrix
+
+    def _embed(self, slides: List["Slide"], max_batch_tokens: int, max_batch_size: int) -> List["Slide"]:
+        """
+        Embeds the slides that have no embeddings yet.
+
+        Returns:
+        - List[Slide]: The slides, without those whose embedding failed.
+        """
+        pending = [slide for slide in slides if len(slide.embeddings) == 0]
+        failed = {}
+        def on_error(index, e):
+            failed[index] = e
+
+        embeddings = embed_in_batches(
+            [slide.slide_text for slide in pending],
+            self.embedder,
+            token_counts=[slide.tokens for slide in pending],
+            max_batch_tokens=max_batch_tokens,
+            max_batch_size=max_batch_size,
+            on_error=on_error
+        )
+        # Each request's embeddings become rows of one float32 array.
+        vectors = np.array([embedding for embedding in embeddings if embedding is not None], dtype=np.float32)
+        rows = iter(vectors)
+        dropped = set()
+        for index, (slide, slide_embeddings) in enumerate(zip(pending, embeddings)):
+            if slide_embeddings is None:
+                print("Ignoring slide ", slide.slide_number, " Error ", failed.get(index))
+                self.total_tokens -= slide.tokens
+                dropped.add(id(slide))
+                continue
+            slide.embeddings = next(rows)
+        return [slide for slide in slides if id(slide) not in dropped]
+
+    
+    def persist(self,path : str =None):
+        """
+        Persist the data to a PowerPoint file and save associated text files.
+        """
+        # Check if the PowerPoint file exists
+        if not os.path.isfile(self.file_path):
+            raise Exception("PPT File not Found")
+        # Load the PowerPoint presentation
+        presentation = Presentation(self.file_path)
+
+        # Iterate through each slide in the presentation
+        for slide_number, slide in enumerate(presentation.slides):
+            slide_number += 1
+
+            # Find the corresponding slide in the self.slides list
+            for s in self.slides:
+                if s.slide_number == slide_number:
+                    entities = s.entities
+
+                    # Add shapes and text boxes to the slide for each entity
+                    for e in entities:
+                        a = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, e.left, e.top, e.width, e.height)
+                        txBox = slide.shapes.add_textbox(e.left, e.top, e.width, e.height)
+                        tf = txBox.text_frame
+                        tf.text = e.chart_type
+
+                        # Set the fill color of the shape
+                        fill = a.fill
+                        fill.solid()
+                        fore_color = fill.fore_color
+                        fore_color.rgb = RGBColor(251, 244, 222)
+
+                        # Set the transparency of the fill color
+                        ts = a.fill._xPr.solidFill
+                        sF = ts.get_or_change_to_srgbClr()
+                        sE = SubElement(sF, 'a:alpha', val=str(44000))
+
+        # Get the file extension and folder name
+        _, file_extension = os.path.splitext(self.file_path)
+        foldername = self.file_path.replace(file_extension, "")
+
+        # Delete the folder if it exists, then create a new one
+        if os.path.exists(foldername) and path is None:
+            shutil.rmtree(foldername)
+            print(f"Deleted folder: {foldername}")
+            os.mkdir(foldername)
+            os.mkdir(os.path.join(foldername,"highlight"))
+            os.mkdir(os.path.join(foldername,"slides"))
+            os.mkdir(os.path.join(foldername,"metadata"))
+            print(f"Created folder: {foldername}")
+        else:
+            os.mkdir(foldername)
+            os.mkdir(os.path.join(foldername,"highlight"))
+            os.mkdir(os.path.join(foldername,"slides"))
+            os.mkdir(os.path.join(foldername,"metadata"))
+            print(f"Created folder: {foldername}")
+
+        # Save the modified presentation to a new file
+        presentation.save(os.path.join(foldername,"highlight","highlighted.pptx"))
+
+        # Save associated text files for each slide
+        for slide in self.slides:
+            ent = "\n".join([str(e.to_dict()) for e in slide.entities])
+            with open(os.path.join(foldername,"metadata",f"{slide.slide_number}.txt"), "w", encoding="utf-8") as f:
+                f.write(slide.slide_text + "\n\n" + ent)
+            
+    def combine(self):
+        
+        header = f"""
+                Presentation Title : {self.title} 
+                Presentation Author : {self.author} 
+                Subject : {self.subject} 
+                Keywords : {self.keywords} 
+                Last Modified Date : {self.last_modified_by} 
+                Created Date : {self.created} 
+                Modified Date : {self.modified}
+                
+        """
+        parts = [header]
+        for slide_num,slide in enumerate(self.slides):
+            parts.append("                  ------------------------------ SLIDE " + str(slide_num+1) + " ------------------------------ \n\n")
+            parts.append(slide.slide_text + "\n\n")
+        return "".join(parts)
+
+    def metadata(self) -> dict:
+        """
+        Returns the presentation metadata read by extract(), with dates as ISO strings.
+        """
+        return {
+            "file_path": self.file_path,
+            "title": self.title,
+            "author": self.author,
+            "subject": self.subject,
+            "keywords": self.keywords,
+            "last_modified_by": self.last_modified_by,
+            "created": self.created.isoformat() if self.created is not None else None,
+            "modified": self.modified.isoformat() if self.modified is not None else None,
+            "slide_height": self.slide_height,
+            "slide_width": self.slide_width,
+        }
+
+    def fingerprint(self) -> str:
+        """
+        Returns a sha256 hex digest of the extracted content (slide numbers, titles and text),
+        which changes whenever a re-extraction changes what answers are built from. It is
+        computed once per extraction.
+        """
+        if self._fingerprint is None:
+            digest = hashlib.sha256()
+            for slide in self.slides:
+                digest.update(f"{slide.slide_number}\x00{slide.slide_title}\x00{slide.slide_text}\x00".encode("utf-8"))
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def to_json(self) -> str:
+        """
+        Returns the presentation metadata and the slides, including their embeddings, as a JSON string.
+        """
+        return json.dumps({
+            "metadata": self.metadata(),
+            "total_tokens": self.total_tokens,
+            "slides": [
+                {
+                    "slide_number": slide.slide_number,
+                    "slide_title": slide.slide_title,
+                    "slide_text": slide.slide_text,
+                    "tokens": slide.tokens,
+                    "entities": [[e.chart_type, e.text, e.left, e.top, e.width, e.height] for e in slide.entities],
+                    "embeddings": [float(value) for value in slide.embeddings],
+                }
+                for slide in self.slides
+            ],
+        })
+
+    def save(self, path: str):
+        """
+        Saves the extracted deck to a directory that load() reads back without the .pptx.
+
+        Layout of the directory:
+            deck.json       format version, options, metadata and the slide records
+            embeddings.f32  the float32 embedding matrix, one row per embedded slide
+
+        deck.json is replaced last, so a reader never sees a half-written deck.
+
+        Args:
+        - path (str): The directory, created if missing.
+        """
+        os.makedirs(path, exist_ok=True)
+        matrix = self.pack_embeddings()
+        rows = iter(range(len(matrix)))
+        slides = []
+        for slide in self.slides:
+            slides.append({
+                "slide_number": slide.slide_number,
+                "slide_title": slide.slide_title,
+                "slide_text": slide.slide_text,
+                "tokens": slide.tokens,
+                "entities": [[e.chart_type, e.text, e.left, e.top, e.width, e.height] for e in slide.entities],
+                "row": next(rows) if len(slide.embeddings) > 0 else -1,
+            })
+        deck = {
+            "version": DECK_FORMAT_VERSION,
+            "options": {
+                "extraction_method": self.extraction_method,
+                "ocr_engine": self.ocr_engine,
+                "extract_from_image": self.extract_from_image,
+                "chart_from_image": self.chart_from_image,
+                "skip_decorative_images": self.skip_decorative_images,
+            },
+            "metadata": self.metadata(),
+            "total_tokens": self.total_tokens,
+            "dim": int(matrix.shape[1]),
+            "count": int(matrix.shape[0]),
+            "slides": slides,
+        }
+        matrix.tofile(os.path.join(path, "embeddings.f32"))
+        with open(os.path.join(path, "deck.tmp.json"), "w", encoding="utf-8") as f:
+            json.dump(deck, f)
+        os.replace(os.path.join(path, "deck.tmp.json"), os.path.join(path, "deck.json"))
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True, **kwargs) -> "PPTExtractor":
+        """
+        Loads a deck written by save().
+
+        Args:
+        - path (str): The directory.
+        - mmap (bool, optional): Map the embedding file instead of reading it; the slides' embeddings are read-only row views of the map. Defaults to True.
+        - **kwargs: Passed to PPTExtractor, e.g. the embedder used to embed queries.
+
+        Returns:
+        - PPTExtractor: An extractor holding the saved slides and metadata.
+        """
+        with open(os.path.join(path, "deck.json"), "r", encoding="utf-8") as f:
+            deck = json.load(f)
+        if deck["version"] != DECK_FORMAT_VERSION:
+            raise Exception(f"Unsupported deck format version {deck['version']}")
+        metadata = deck["metadata"]
+        extractor = cls(metadata["file_path"], **{**deck["options"], **kwargs})
+        for name in ("title", "author", "subject", "keywords", "last_modified_by", "slide_height", "slide_width"):
+            setattr(extractor, name, metadata[name])
+        extractor.created = datetime.fromisoformat(metadata["created"]) if metadata["created"] else None
+        extractor.modified = datetime.fromisoformat(metadata["modified"]) if metadata["modified"] else None
+        extractor.entities = []
+        extractor.total_tokens = deck["total_tokens"]
+
+        shape = (deck["count"], deck["dim"])
+        embeddings_path = os.path.join(path, "embeddings.f32")
+        if deck["count"] == 0:
+            matrix = np.empty(shape, dtype=np.float32)
+        elif mmap:
+            matrix = np.memmap(embeddings_path, dtype=np.float32, mode="r", shape=shape)
+        else:
+            matrix = np.fromfile(embeddings_path, dtype=np.float32).reshape(shape)
+        extractor.embedding_matrix = matrix
+        for record in deck["slides"]:
+            entities = [Entity(*entity) for entity in record["entities"]]
+            embeddings = matrix[record["row"]] if record["row"] >= 0 else []
+            extractor.slides.append(Slide(record["slide_number"], record["slide_title"], record["slide_text"], entities, embeddings, record["tokens"]))
+        return extractor
+    
+    def to_dataframe(self) -> "pd.DataFrame":
+        data = []
+        for slide_num,slide in enumerate(self.slides):
+            slide_num += 1
+            text = ""
+            for ent in slide.entities:
+                if ent.chart_type == "text":
+                    text += ent.text + " "
+                else:
+                    data.append({"Slide Number":slide_num,"Type":ent.chart_type,"Text":ent.text,"Embedding":slide.embeddings,"Position":str([ent.left,ent.top,ent.width,ent.height])})    
+            data.append({"Slide Number":slide_num,"Type":"text","Text":text,"Embedding":slide.embeddings,"Position":str([ent.left,ent.top,ent.width,ent.height])}) 
+        return pd.DataFrame(data)
+
+    def to_columns(self) -> dict:
+        """
+        Returns the slides and their entities as columns of NumPy arrays.
+
+        Each embedding is stored once, as a row of the float32 "embeddings" matrix of the
+        slides table (NaN for a slide without embedding); entities
+        refer to their slide through "slide_number". Unknown entity positions are -1.
+
+        Returns:
+        - dict: {"slides": {column: array}, "entities": {column: array}}.
+        """
+        dim = max((len(slide.embeddings) for slide in self.slides), default=0)
+        embeddings = np.full((len(self.slides), dim), np.nan, dtype=np.float32)
+        for i, slide in enumerate(self.slides):
+            if len(slide.embeddings) > 0:
+                embeddings[i] = slide.embeddings
+        entities = [(slide.slide_number, e) for slide in self.slides for e in slide.entities]
+        def position(values):
+            return np.array([-1 if value is None else value for value in values], dtype=np.int64)
+        return {
+            "slides": {
+                "slide_number": np.array([slide.slide_number for slide in self.slides], dtype=np.int32),
+                "slide_title": np.array([slide.slide_title for slide in self.slides], dtype=object),
+                "slide_text": np.array([slide.slide_text for slide in self.slides], dtype=object),
+                "tokens": np.array([slide.tokens for slide in self.slides], dtype=np.int32),
+                "embeddings": embeddings,
+            },
+            "entities": {
+                "slide_number": np.array([number for number, _ in entities], dtype=np.int32),
+                "chart_type": np.array([e.chart_type for _, e in entities], dtype=object),
+                "text": np.array([e.text for _, e in entities], dtype=object),
+                "left": position(e.left for _, e in entities),
+                "top": position(e.top for _, e in entities),
+                "width": position(e.width for _, e in entities),
+                "height": position(e.height for _, e in entities),
+            },
+        }
+
+    def to_arrow(self):
+        """
+        Returns the columns of to_columns() as two pyarrow Tables (slides, entities). The
+        embeddings are a fixed-size list column built over the float32 matrix without copying.
+        """
+        import pyarrow as pa
+
+        columns = self.to_columns()
+        slides = dict(columns["slides"])
+        embeddings = slides.pop("embeddings")
+        tables = []
+        for table in (slides, columns["entities"]):
+            tables.append(pa.table({name: pa.array(values, type=pa.string() if values.dtype == object else None) for name, values in table.items()}))
+        values = pa.array(embeddings.reshape(-1), type=pa.float32())
+        tables[0] = tables[0].append_column("embeddings", pa.FixedSizeListArray.from_arrays(values, embeddings.shape[1]))
+        return tables[0], tables[1]
+
+    def to_parquet(self, folder: str):
+        """
+        Writes the tables of to_arrow() to slides.parquet and entities.parquet in a folder.
+        """
+        import pyarrow.parquet as pq
+
+        os.makedirs(folder, exist_ok=True)
+        slides, entities = self.to_arrow()
+        pq.write_table(slides, os.path.join(folder, "slides.parquet"))
+        pq.write_table(entities, os.path.join(folder, "entities.parquet"))
+    
+    
+    def __repr__(self): return repr(self.__dict__)
+
+
+# State of a slide extraction worker process, set up once by _init_slide_worker.
+_worker_extractor = None
+_worker_slides = None
+
+def _init_slide_worker(file_path, options, image_texts):
+    global _worker_extractor, _worker_slides
+    _worker_extractor = PPTExtractor(file_path, **options)
+    # Image text already extracted by the parent, including batched chart data.
+    _worker_extractor._image_texts = image_texts
+    _worker_slides = list(Presentation(file_path).slides)
+
+def _extract_slide_in_worker(index, maintain_order):
+    slide_number, slide, error = _worker_extractor._extract_slide_safely(_worker_slides[index], index + 1, maintain_order)
+    # Exceptions raised by the parsing libraries are not always picklable.
+    return slide_number, slide, None if error is None else Exception(str(error))
@@ -0,0 +1,353 @@
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, List, Optional
+
+from ..extractors.pptx import PPTExtractor
+from ..embedding.openai import get_embeddings, count_tokens
+from ..embedding.batch import embed_in_batches, MAX_BATCH_TOKENS, MAX_BATCH_SIZE
+from ..retrieval.corpus import SlideCorpus
+
+# Marks the end of a stage's input. Each worker puts it back so its siblings stop too.
+_DONE = object()
+
+
+class IngestRecord:
+    """
+    Represents the outcome of one file in one pipeline stage.
+    """
+    def __init__(self, file_path: str, stage: str, status: str, seconds: float = 0.0, slides: int = 0, tokens: int = 0, error: Optional[str] = None) -> None:
+        """
+        Initializes the IngestRecord object.
+
+        Args:
+            file_path (str): The path to the PPT file.
+            stage (str): The stage name: "images", "parse", "tokens", "embed" or "persist".
+            status (str): "ok", "failed" or "skipped".
+            seconds (float, optional): The time spent in the stage.
+            slides (int, optional): The number of slides that came out of the stage.
+            tokens (int, optional): The number of slide tokens that came out of the stage.
+            error (str, optional): The error message of a failed stage.
+        """
+        self.file_path = file_path
+        self.stage = stage
+        self.status = status
+        self.seconds = seconds
+        self.slides = slides
+        self.tokens = tokens
+        self.error = error
+
+    def to_dict(self) -> dict:
+        return dict(self.__dict__)
+
+    def __repr__(self): return repr(self.__dict__)
+
+
+class _Item:
+    """
+    A deck flowing through the pipeline.
+    """
+    def __init__(self, file_path: str) -> None:
+        self.file_path = file_path
+        self.image_texts = None
+        self.deck = None
+        self.slides = []
+
+
+def _extract_image_texts(file_path: str, extractor_options: dict) -> dict:
+    """
+    Extracts the text of the distinct pictures of a deck (OCR or chart data) in a worker process.
+    """
+    return PPTExtractor(file_path, **extractor_options).extract_image_texts()
+
+
+def _parse_file(file_path: str, extractor_options: dict, maintain_order: bool, image_texts: Optional[dict] = None):
+    """
+    Parses a deck in a worker process, without token counting and with the picture text
+    found by the images stage.
+    """
+    extractor = PPTExtractor(file_path, **{**extractor_options, "token_counting": False})
+    if image_texts is not None:
+        extractor._image_texts = image_texts
+    extractor.extract(maintain_order=maintain_order, embedding=False)
+    return SlideCorpus.deck_record(extractor), extractor.slides
+
+
+def find_pptx_files(paths: Iterable[str]) -> List[str]:
+    """
+    Expands files and directories (recursively) into the list of .pptx files they contain.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                for name in sorted(names):
+                    # Skip the lock files PowerPoint leaves next to open decks.
+                    if name.lower().endswith(".pptx") and not name.startswith("~$"):
+                        files.append(os.path.join(root, name))
+        else:
+            files.append(path)
+    return files
+
+
+class IngestionPipeline:
+    """
+    Streams decks through images -> parse -> tokens -> embed -> persist stages into a SlideCorpus.
+
+    Each stage has its own worker count and a bounded input queue. A stage that falls behind
+    fills its queue, which blocks the stage before it, so memory stays bounded however many
+    files are queued. The images stage (OCR, or chart data with chart_from_image) runs only
+    with extract_from_image, in its own process pool, and comes before parsing since the
+    slide text includes the picture text. Parsing (python-pptx, tables, charts) runs in a
+    second process pool since it is CPU-bound; token counting and embedding run in threads,
+    the former since tiktoken releases the GIL, the latter since it waits on the network;
+    persisting runs in a single thread since the corpus is appended sequentially.
+    """
+    def __init__(
+            self,
+            corpus: SlideCorpus,
+            parse_workers: int = 4,
+            embed_workers: int = 4,
+            image_workers: int = 2,
+            token_workers: int = 2,
+            queue_size: int = 8,
+            embedder: Optional[Callable] = None,
+            extractor_options: Optional[dict] = None,
+            maintain_order: bool = False,
+            max_batch_tokens: int = MAX_BATCH_TOKENS,
+            max_batch_size: int = MAX_BATCH_SIZE,
+            on_record: Optional[Callable[[IngestRecord], None]] = None,
+            report_path: Optional[str] = None
+        ) -> None:
+        """
+        Initializes the IngestionPipeline object.
+
+        Args:
+            corpus (SlideCorpus): The corpus the decks are appended to.
+            parse_workers (int, optional): The number of parsing processes. Defaults to 4.
+            embed_workers (int, optional): The number of concurrent embedding threads. Defaults to 4.
+            image_workers (int, optional): The number of OCR / chart-from-image processes. Defaults to 2.
+            token_workers (int, optional): The number of token counting threads. Defaults to 2.
+            queue_size (int, optional): The capacity of each stage's input queue, in decks. Defaults to 8.
+            embedder (Callable, optional): Maps a list of texts to a list of embeddings. Defaults to the corpus embedder, then get_embeddings.
+            extractor_options (dict, optional): Picklable PPTExtractor options, e.g. {"extract_from_image": True}. A file-backed image_cache is reopened in each process.
+            maintain_order (bool, optional): Passed to PPTExtractor.extract. Defaults to False.
+            max_batch_tokens (int, optional): The maximum number of tokens per embedding request.
+            max_batch_size (int, optional): The maximum number of slides per embedding request.
+            on_record (Callable, optional): Called with every IngestRecord as it is produced.
+            report_path (str, optional): A JSONL file every IngestRecord is appended to.
+        """
+        self.corpus = corpus
+        self.parse_workers = parse_workers
+        self.embed_workers = embed_workers
+        self.image_workers = image_workers
+        self.token_workers = token_workers
+        self.queue_size = queue_size
+        self.embedder = embedder or corpus.embedder or get_embeddings
+        if embedder is None and corpus.embedding_cache is not None:
+            self.embedder = corpus.embedding_cache.wrap(self.embedder)
+        self.extractor_options = extractor_options or {}
+        self.maintain_order = maintain_order
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.on_record = on_record
+        self.report_path = report_path
+        self.records = []
+        self._lock = threading.Lock()
+        self._image_pool = None
+        self._pool = None
+        self.corpus.flush()
+
+    def _emit(self, record: IngestRecord) -> None:
+        with self._lock:
+            self.records.append(record)
+            if self.report_path is not None:
+                with open(self.report_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record.to_dict()) + "\n")
+            if self.on_record is not None:
+                self.on_record(record)
+
+    def _extract_images(self, item: _Item) -> _Item:
+        future = self._image_pool.submit(_extract_image_texts, item.file_path, self.extractor_options)
+        item.image_texts = future.result()
+        return item
+
+    def _parse(self, item: _Item) -> _Item:
+        future = self._pool.submit(_parse_file, item.file_path, self.extractor_options, self.maintain_order, item.image_texts)
+        item.deck, item.slides = future.result()
+        item.image_texts = None
+        return item
+
+    def _count_tokens(self, item: _Item) -> _Item:
+        for slide in item.slides:
+            slide.tokens = count_tokens(slide.slide_text)
+        return item
+
+    def _embed(self, item: _Item) -> _Item:
+        embeddings = embed_in_batches(
+            [slide.slide_text for slide in item.slides],
+            self.embedder,
+            token_counts=[slide.tokens for slide in item.slides],
+            max_batch_tokens=self.max_batch_tokens,
+            max_batch_size=self.max_batch_size
+        )
+        slides = []
+        for slide, slide_embeddings in zip(item.slides, embeddings):
+            if slide_embeddings is not None:
+                slide.embeddings = slide_embeddings
+                slides.append(slide)
+        if item.slides and not slides:
+            raise Exception("No slide could be embedded")
+        item.slides = slides
+        return item
+
+    def _persist(self, item: _Item) -> _Item:
+        self.corpus.add_slides(item.deck, item.slides)
+        return item
+
+    def _start_stage(self, name: str, func: Callable, inbox: queue.Queue, outbox: Optional[queue.Queue], workers: int) -> List[threading.Thread]:
+        def worker():
+            while True:
+                item = inbox.get()
+                if item is _DONE:
+                    inbox.put(_DONE)
+                    return
+                start = time.perf_counter()
+                try:
+                    item = func(item)
+                except Exception as e:
+                    self._emit(IngestRecord(item.file_path, name, "failed", time.perf_counter() - start, error=str(e)))
+                    continue
+                self._emit(IngestRecord(item.file_path, name, "ok", time.perf_counter() - start, len(item.slides), sum(slide.tokens for slide in item.slides)))
+                if outbox is not None:
+                    # Blocks while the next stage's queue is full.
+                    outbox.put(item)
+
+        threads = [threading.Thread(target=worker, name=f"ingest-{name}-{i}", daemon=True) for i in range(workers)]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def run(self, file_paths: Iterable[str], skip_existing: bool = True) -> List[IngestRecord]:
+        """
+        Ingests decks into the corpus.
+
+        Args:
+            file_paths (Iterable[str]): The .pptx files to ingest.
+            skip_existing (bool, optional): Skip decks already in the corpus. If False, such decks are re-ingested and replace their previous version. Defaults to True.
+
+        A file listed more than once is ingested once. The corpus is flushed at the end.
+
+        Returns:
+            List[IngestRecord]: The final record of each file: its persist record, or the record of the stage it failed or was skipped in.
+        """
+        self.records = []
+        extract_images = bool(self.extractor_options.get("extract_from_image"))
+        image_queue = queue.Queue(self.queue_size)
+        parse_queue = queue.Queue(self.queue_size)
+        token_queue = queue.Queue(self.queue_size)
+        embed_queue = queue.Queue(self.queue_size)
+        persist_queue = queue.Queue(self.queue_size)
+        with ProcessPoolExecutor(max_workers=self.image_workers if extract_images else 1) as self._image_pool, ProcessPoolExecutor(max_workers=self.parse_workers) as self._pool:
+            stages = []
+            if extract_images:
+                stages.append((self._start_stage("images", self._extract_images, image_queue, parse_queue, self.image_workers), parse_queue))
+            stages += [
+                (self._start_stage("parse", self._parse, parse_queue, token_queue, self.parse_workers), token_queue),
+                (self._start_stage("tokens", self._count_tokens, token_queue, embed_queue, self.token_workers), embed_queue),
+                (self._start_stage("embed", self._embed, embed_queue, persist_queue, self.embed_workers), persist_queue),
+                (self._start_stage("persist", self._persist, persist_queue, None, 1), None),
+            ]
+            inbox = image_queue if extract_images else parse_queue
+            seen = set()
+            for file_path in file_paths:
+                key = os.path.realpath(file_path)
+                if key in seen:
+                    continue
+                seen.add(key)
+                if skip_existing and self.corpus.has_deck(file_path):
+                    self._emit(IngestRecord(file_path, "images" if extract_images else "parse", "skipped"))
+                    continue
+                inbox.put(_Item(file_path))
+            inbox.put(_DONE)
+            for threads, outbox in stages:
+                for thread in threads:
+                    thread.join()
+                if outbox is not None:
+                    outbox.put(_DONE)
+        self._image_pool = None
+        self._pool = None
+        self.corpus.flush()
+
+        final = {}
+        for record in self.records:
+            final[record.file_path] = record
+        return list(final.values())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest a directory of .pptx decks into a SlideCorpus.")
+    parser.add_argument("paths", nargs="+", help=".pptx files or directories searched recursively")
+    parser.add_argument("--corpus", required=True, help="The corpus directory, created if missing")
+    parser.add_argument("--parse-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--embed-workers", type=int, default=4)
+    parser.add_argument("--image-workers", type=int, default=os.cpu_count() or 1, help="OCR / chart-from-image processes, used with --extract-from-image")
+    parser.add_argument("--token-workers", type=int, default=2)
+    parser.add_argument("--queue-size", type=int, default=8)
+    parser.add_argument("--embedding-cache", help="An EmbeddingCache SQLite file")
+    parser.add_argument("--embedder", default="openai", help="The embedding backend: openai[:model], sentence-transformers[:model], onnx:<model.onnx>:<tokenizer> or hashing[:dim]")
+    parser.add_argument("--image-cache", help="An ImageTextCache SQLite file shared by the parsing processes")
+    parser.add_argument("--report", help="A JSONL file the per-file stage records are appended to")
+    parser.add_argument("--extract-from-image", action="store_true")
+    parser.add_argument("--chart-from-image", action="store_true")
+    parser.add_argument("--maintain-order", action="store_true")
+    parser.add_argument("--reingest", action="store_true", help="Ingest decks already in the corpus again, replacing their previous version")
+    args = parser.parse_args(argv)
+
+    embedding_cache = None
+    if args.embedding_cache:
+        from ..embedding.cache import EmbeddingCache
+        embedding_cache = EmbeddingCache(args.embedding_cache)
+    extractor_options = {"extract_from_image": args.extract_from_image, "chart_from_image": args.chart_from_image}
+    if args.image_cache:
+        from ..extractors.image import ImageTextCache
+        extractor_options["image_cache"] = ImageTextCache(args.image_cache)
+    from ..embedding.backends import get_backend
+    corpus = SlideCorpus(args.corpus, embedder=get_backend(args.embedder), embedding_cache=embedding_cache)
+    files = find_pptx_files(args.paths)
+
+    def on_record(record):
+        line = f"[{record.stage}] {record.status:<7} {record.file_path}"
+        if record.status == "ok":
+            line += f" ({record.slides} slides, {record.seconds:.2f}s)"
+        elif record.error:
+            line += f" : {record.error}"
+        print(line, flush=True)
+
+    pipeline = IngestionPipeline(
+        corpus,
+        parse_workers=args.parse_workers,
+        embed_workers=args.embed_workers,
+        image_workers=args.image_workers,
+        token_workers=args.token_workers,
+        queue_size=args.queue_size,
+        extractor_options=extractor_options,
+        maintain_order=args.maintain_order,
+        on_record=on_record,
+        report_path=args.report
+    )
+    start = time.perf_counter()
+    records = pipeline.run(files, skip_existing=not args.reingest)
+    elapsed = time.perf_counter() - start
+    done = sum(1 for record in records if record.stage == "persist" and record.status == "ok")
+    failed = sum(1 for record in records if record.status == "failed")
+    print(f"Ingested {done} of {len(files)} decks in {elapsed:.1f}s, {failed} failed. Corpus now holds {len(corpus) - len(corpus.deleted_rows())} slides.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
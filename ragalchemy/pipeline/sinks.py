@@ -0,0 +1,119 @@
+import json
+import os
+from typing import List, Optional
+
+
+class SlideSink:
+    """
+    Receives the slides yielded by PPTExtractor.iter_slides, one at a time.
+
+    Sinks can also be used as context managers, which close them on exit.
+    """
+    def write(self, slide) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def slide_record(slide) -> dict:
+    """
+    Returns the JSON-serializable record of a slide, including its embedding.
+    """
+    return {
+        "slide_number": slide.slide_number,
+        "slide_title": slide.slide_title,
+        "slide_text": slide.slide_text,
+        "tokens": slide.tokens,
+        "entities": [[e.chart_type, e.text, e.left, e.top, e.width, e.height] for e in slide.entities],
+        "embeddings": [float(value) for value in slide.embeddings],
+    }
+
+
+class JSONLSink(SlideSink):
+    """
+    Writes one JSON record per slide to a JSONL file.
+    """
+    def __init__(self, path: str, append: bool = False) -> None:
+        """
+        Initializes the JSONLSink object.
+
+        Args:
+            path (str): The JSONL file.
+            append (bool, optional): Append to an existing file instead of replacing it. Defaults to False.
+        """
+        self.path = path
+        self._file = open(path, "a" if append else "w", encoding="utf-8")
+
+    def write(self, slide) -> None:
+        self._file.write(json.dumps(slide_record(slide)) + "\n")
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+
+class MetadataSink(SlideSink):
+    """
+    Writes the per-slide text files of PPTExtractor.persist (metadata/<slide number>.txt)
+    as the slides arrive. The highlighted copy of the deck is not produced, since it needs
+    every slide.
+    """
+    def __init__(self, folder: str) -> None:
+        """
+        Initializes the MetadataSink object.
+
+        Args:
+            folder (str): The persist folder; the metadata subfolder is created if missing.
+        """
+        self.folder = os.path.join(folder, "metadata")
+        os.makedirs(self.folder, exist_ok=True)
+
+    def write(self, slide) -> None:
+        ent = "\n".join([str(e.to_dict()) for e in slide.entities])
+        with open(os.path.join(self.folder, f"{slide.slide_number}.txt"), "w", encoding="utf-8") as f:
+            f.write(slide.slide_text + "\n\n" + ent)
+
+
+class CorpusSink(SlideSink):
+    """
+    Appends embedded slides to a SlideCorpus as one deck, in groups of flush_size slides.
+
+    The deck record is taken from the extractor when the first group is appended, after
+    iter_slides has read the presentation metadata. A deck whose iteration is interrupted
+    stays in the corpus with the slides appended so far.
+    """
+    def __init__(self, corpus, extractor, flush_size: int = 256) -> None:
+        """
+        Initializes the CorpusSink object.
+
+        Args:
+            corpus (SlideCorpus): The corpus the slides are appended to.
+            extractor (PPTExtractor): The extractor whose iter_slides feeds this sink.
+            flush_size (int, optional): The number of slides buffered between appends. Defaults to 256.
+        """
+        self.corpus = corpus
+        self.extractor = extractor
+        self.flush_size = flush_size
+        self.deck_id: Optional[int] = None
+        self._buffer: List = []
+
+    def write(self, slide) -> None:
+        self._buffer.append(slide)
+        if len(self._buffer) >= self.flush_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer and self.deck_id is not None:
+            return
+        self.deck_id = self.corpus.add_slides(self.corpus.deck_record(self.extractor), self._buffer, self.deck_id)
+        self._buffer = []
+
+    def close(self) -> None:
+        self.flush()
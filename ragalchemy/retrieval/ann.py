@@ -0,0 +1,398 @@
+"""
+Approximate nearest-neighbour backends for SlideIndex.
+
+A backend stores L2-normalized float32 vectors under sequential ids (the order they were
+added) and exposes:
+    add(vectors)            append vectors, assigning them the next ids
+    search(query, k)        return (ids, scores) of the approximate top-k by inner product
+    save(path) / load(path) serialize to and from a directory
+    __len__()               the number of stored vectors
+"""
+import json
+import os
+import numpy as np
+from typing import Optional, Tuple
+
+from ..retrieval.index import l2_normalize, top_k
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+    """
+    Returns the index of the most similar centroid of each vector, in chunks to bound memory.
+    """
+    assignments = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), chunk_size):
+        assignments[start:start + chunk_size] = np.argmax(vectors[start:start + chunk_size] @ centroids.T, axis=1)
+    return assignments
+
+
+def spherical_kmeans(vectors: np.ndarray, n_clusters: int, n_iter: int = 20, seed: int = 0) -> np.ndarray:
+    """
+    Clusters unit vectors by cosine similarity.
+
+    Args:
+        vectors (np.ndarray): The (n, dim) L2-normalized vectors.
+        n_clusters (int): The number of clusters.
+        n_iter (int, optional): The number of Lloyd iterations. Defaults to 20.
+        seed (int, optional): The random seed. Defaults to 0.
+
+    Returns:
+        np.ndarray: The (n_clusters, dim) L2-normalized centroids.
+    """
+    rng = np.random.default_rng(seed)
+    n_clusters = min(n_clusters, len(vectors))
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    for _ in range(n_iter):
+        assignments = _assign(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+        counts = np.bincount(assignments, minlength=n_clusters)
+        empty = counts == 0
+        # Re-seed empty clusters with random points so that every list stays in use.
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        centroids = l2_normalize(sums)
+    return centroids
+
+
+class IVFIndex:
+    """
+    An inverted-file index implemented in NumPy.
+
+    Vectors are partitioned into `nlist` clusters by spherical k-means. A query is compared
+    with the centroids and only the vectors of the `nprobe` closest clusters are scored, so
+    raising nprobe trades speed for recall.
+
+    The index trains itself on the first vectors added (or on an explicit sample passed to
+    train()) and accepts incremental inserts after. Centroids learnt from a small first
+    batch (a single deck, say) fit the later corpus poorly, so once the index holds
+    retrain_growth times more vectors than it was trained on, it is retrained on the stored
+    vectors and they are re-assigned. Retraining stops once max_train_size vectors are used.
+    """
+    def __init__(self, nlist: int = 1024, nprobe: int = 16, n_iter: int = 20, max_train_size: int = 262144, seed: int = 0, retrain_growth: Optional[float] = 4.0) -> None:
+        """
+        Initializes the IVFIndex object.
+
+        Args:
+            nlist (int, optional): The number of clusters. Around sqrt(n) to 4*sqrt(n) works well. Defaults to 1024.
+            nprobe (int, optional): The number of clusters scanned per query. Defaults to 16.
+            n_iter (int, optional): The number of k-means iterations. Defaults to 20.
+            max_train_size (int, optional): The maximum number of vectors sampled for training. Defaults to 262144.
+            seed (int, optional): The random seed. Defaults to 0.
+            retrain_growth (float, optional): Retrain when the index holds this many times the vectors it was trained on. Never retrains automatically if None. Defaults to 4.
+        """
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.n_iter = n_iter
+        self.max_train_size = max_train_size
+        self.seed = seed
+        self.retrain_growth = retrain_growth
+        self.centroids = None
+        # The number of vectors the centroids were learnt from, None for given centroids.
+        self.train_size = None
+        self.count = 0
+        self._ids = []
+        self._vectors = []
+        self._pending_ids = []
+        self._pending_vectors = []
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(self, vectors: np.ndarray) -> None:
+        """
+        Learns the cluster centroids from a sample of vectors. Vectors already stored are
+        re-assigned to the new clusters.
+        """
+        vectors = l2_normalize(vectors)
+        if len(vectors) > self.max_train_size:
+            rng = np.random.default_rng(self.seed)
+            vectors = vectors[rng.choice(len(vectors), self.max_train_size, replace=False)]
+        self.train_from_centroids(spherical_kmeans(vectors, self.nlist, self.n_iter, self.seed))
+        self.train_size = len(vectors)
+
+    def add(self, vectors: np.ndarray) -> None:
+        """
+        Appends vectors, assigning them the next sequential ids.
+        """
+        vectors = l2_normalize(np.atleast_2d(vectors))
+        if len(vectors) == 0:
+            return
+        if not self.is_trained:
+            self.train(vectors)
+        self._insert(np.arange(self.count, self.count + len(vectors), dtype=np.int64), vectors)
+        self.count += len(vectors)
+        if self._needs_retraining():
+            self.train(self._stored()[1])
+
+    def _needs_retraining(self) -> bool:
+        return (
+            self.retrain_growth is not None
+            and self.train_size is not None
+            and self.train_size < self.max_train_size
+            and self.count > self.retrain_growth * self.train_size
+        )
+
+    def _insert(self, ids: np.ndarray, vectors: np.ndarray) -> None:
+        assignments = _assign(vectors, self.centroids)
+        order = np.argsort(assignments, kind="stable")
+        lists, starts = np.unique(assignments[order], return_index=True)
+        for list_id, group in zip(lists, np.split(order, starts[1:])):
+            self._pending_ids[list_id].append(ids[group])
+            self._pending_vectors[list_id].append(vectors[group])
+
+    def _stored(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the ids and vectors of every stored vector, in id order.
+        """
+        for list_id in range(len(self._ids)):
+            self._compact(list_id)
+        if not self._ids:
+            return np.empty(0, dtype=np.int64), np.empty((0, 0), dtype=np.float32)
+        ids = np.concatenate(self._ids)
+        order = np.argsort(ids, kind="stable")
+        return ids[order], np.concatenate(self._vectors)[order]
+
+    def _compact(self, list_id: int) -> None:
+        if self._pending_ids[list_id]:
+            self._ids[list_id] = np.concatenate([self._ids[list_id]] + self._pending_ids[list_id])
+            self._vectors[list_id] = np.concatenate([self._vectors[list_id]] + self._pending_vectors[list_id])
+            self._pending_ids[list_id] = []
+            self._pending_vectors[list_id] = []
+
+    def search(self, query: np.ndarray, k: int = 10, nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the approximate top-k vectors by inner product.
+
+        Args:
+            query (np.ndarray): The query vector.
+            k (int, optional): The number of results. Defaults to 10.
+            nprobe (int, optional): Overrides the number of clusters scanned for this query.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The ids and scores, most similar first.
+        """
+        if self.count == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        query = l2_normalize(query)
+        probes = top_k(self.centroids @ query, nprobe or self.nprobe)
+        for list_id in probes:
+            self._compact(list_id)
+        ids = np.concatenate([self._ids[list_id] for list_id in probes])
+        vectors = np.concatenate([self._vectors[list_id] for list_id in probes])
+        scores = vectors @ query
+        best = top_k(scores, k)
+        return ids[best], scores[best]
+
+    def save(self, path: str) -> None:
+        """
+        Writes the index to a directory.
+        """
+        os.makedirs(path, exist_ok=True)
+        for list_id in range(len(self._ids)):
+            self._compact(list_id)
+        sizes = np.array([len(ids) for ids in self._ids], dtype=np.int64)
+        dim = self.centroids.shape[1] if self.is_trained else 0
+        np.savez(
+            os.path.join(path, "ivf.npz"),
+            centroids=self.centroids if self.is_trained else np.empty((0, 0), dtype=np.float32),
+            sizes=sizes,
+            ids=np.concatenate(self._ids) if self._ids else np.empty(0, dtype=np.int64),
+            vectors=np.concatenate(self._vectors) if self._vectors else np.empty((0, dim), dtype=np.float32),
+        )
+        with open(os.path.join(path, "ivf.json"), "w", encoding="utf-8") as f:
+            json.dump({"nlist": self.nlist, "nprobe": self.nprobe, "n_iter": self.n_iter, "max_train_size": self.max_train_size, "seed": self.seed, "retrain_growth": self.retrain_growth, "count": self.count, "train_size": self.train_size}, f)
+
+    @classmethod
+    def load(cls, path: str) -> "IVFIndex":
+        """
+        Reads an index written by save().
+        """
+        with open(os.path.join(path, "ivf.json"), "r", encoding="utf-8") as f:
+            params = json.load(f)
+        count = params.pop("count")
+        train_size = params.pop("train_size", None)
+        index = cls(**params)
+        data = np.load(os.path.join(path, "ivf.npz"))
+        if len(data["centroids"]) > 0:
+            index.train_from_centroids(data["centroids"])
+            bounds = np.cumsum(data["sizes"])[:-1]
+            index._ids = np.split(data["ids"], bounds)
+            index._vectors = np.split(data["vectors"], bounds)
+        index.count = count
+        index.train_size = train_size
+        return index
+
+    def train_from_centroids(self, centroids: np.ndarray) -> None:
+        """
+        Uses precomputed centroids instead of training, e.g. to share a quantizer between
+        shards. Vectors already stored are re-assigned to the new clusters.
+        """
+        ids, vectors = self._stored()
+        self.centroids = l2_normalize(centroids)
+        self.train_size = None
+        n_lists, dim = self.centroids.shape
+        self._ids = [np.empty(0, dtype=np.int64) for _ in range(n_lists)]
+        self._vectors = [np.empty((0, dim), dtype=np.float32) for _ in range(n_lists)]
+        self._pending_ids = [[] for _ in range(n_lists)]
+        self._pending_vectors = [[] for _ in range(n_lists)]
+        if len(ids) > 0:
+            self._insert(ids, vectors)
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class HNSWLibIndex:
+    """
+    An adapter for an hnswlib HNSW graph. Requires the optional hnswlib package.
+
+    M and ef_construction control graph quality at build time; ef controls the recall/speed
+    trade-off at query time.
+    """
+    def __init__(self, dim: Optional[int] = None, M: int = 32, ef_construction: int = 200, ef: int = 64, initial_capacity: int = 100000) -> None:
+        try:
+            import hnswlib
+        except ImportError:
+            raise Exception("hnswlib not installed. Install it with 'pip install hnswlib' or use IVFIndex.")
+        self._hnswlib = hnswlib
+        self.dim = dim
+        self.M = M
+        self.ef_construction = ef_construction
+        self.ef = ef
+        self.initial_capacity = initial_capacity
+        self.index = None
+        if dim is not None:
+            self._init_index(dim)
+
+    def _init_index(self, dim: int) -> None:
+        self.dim = dim
+        self.index = self._hnswlib.Index(space="ip", dim=dim)
+        self.index.init_index(max_elements=self.initial_capacity, ef_construction=self.ef_construction, M=self.M)
+        self.index.set_ef(self.ef)
+
+    def add(self, vectors: np.ndarray) -> None:
+        vectors = l2_normalize(np.atleast_2d(vectors))
+        if len(vectors) == 0:
+            return
+        if self.index is None:
+            self._init_index(vectors.shape[1])
+        count = self.index.get_current_count()
+        if count + len(vectors) > self.index.get_max_elements():
+            self.index.resize_index(max(2 * self.index.get_max_elements(), count + len(vectors)))
+        self.index.add_items(vectors, np.arange(count, count + len(vectors)))
+
+    def search(self, query: np.ndarray, k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        if len(self) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        k = min(k, len(self))
+        self.index.set_ef(max(self.ef, k))
+        labels, distances = self.index.knn_query(l2_normalize(query), k=k)
+        # hnswlib reports inner-product distance as 1 - similarity.
+        return labels[0].astype(np.int64), (1 - distances[0]).astype(np.float32)
+
+    def save(self, path: str) -> None:
+        os.makedirs(path, exist_ok=True)
+        self.index.save_index(os.path.join(path, "hnsw.bin"))
+        with open(os.path.join(path, "hnsw.json"), "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "M": self.M, "ef_construction": self.ef_construction, "ef": self.ef}, f)
+
+    @classmethod
+    def load(cls, path: str) -> "HNSWLibIndex":
+        with open(os.path.join(path, "hnsw.json"), "r", encoding="utf-8") as f:
+            params = json.load(f)
+        index = cls(**{key: value for key, value in params.items() if key != "dim"})
+        index.dim = params["dim"]
+        index.index = index._hnswlib.Index(space="ip", dim=params["dim"])
+        index.index.load_index(os.path.join(path, "hnsw.bin"))
+        index.index.set_ef(index.ef)
+        return index
+
+    def __len__(self) -> int:
+        return 0 if self.index is None else self.index.get_current_count()
+
+
+class FaissIndex:
+    """
+    An adapter for a faiss index built from a factory string, e.g. "HNSW32" or "IVF1024,Flat".
+    Requires the optional faiss package. Search-time parameters such as "nprobe=16" or
+    "efSearch=64" are applied with faiss.ParameterSpace.
+    """
+    def __init__(self, factory: str = "HNSW32", search_params: str = "", dim: Optional[int] = None) -> None:
+        try:
+            import faiss
+        except ImportError:
+            raise Exception("faiss not installed. Install it with 'pip install faiss-cpu' or use IVFIndex.")
+        self._faiss = faiss
+        self.factory = factory
+        self.search_params = search_params
+        self.dim = dim
+        self.index = None
+        if dim is not None:
+            self._init_index(dim)
+
+    def _init_index(self, dim: int) -> None:
+        self.dim = dim
+        self.index = self._faiss.index_factory(dim, self.factory, self._faiss.METRIC_INNER_PRODUCT)
+        if self.search_params:
+            self._faiss.ParameterSpace().set_index_parameters(self.index, self.search_params)
+
+    def add(self, vectors: np.ndarray) -> None:
+        vectors = np.ascontiguousarray(l2_normalize(np.atleast_2d(vectors)))
+        if len(vectors) == 0:
+            return
+        if self.index is None:
+            self._init_index(vectors.shape[1])
+        if not self.index.is_trained:
+            self.index.train(vectors)
+        self.index.add(vectors)
+
+    def search(self, query: np.ndarray, k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        if len(self) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        scores, ids = self.index.search(l2_normalize(query).reshape(1, -1), min(k, len(self)))
+        keep = ids[0] >= 0
+        return ids[0][keep].astype(np.int64), scores[0][keep]
+
+    def save(self, path: str) -> None:
+        os.makedirs(path, exist_ok=True)
+        self._faiss.write_index(self.index, os.path.join(path, "faiss.index"))
+        with open(os.path.join(path, "faiss.json"), "w", encoding="utf-8") as f:
+            json.dump({"factory": self.factory, "search_params": self.search_params, "dim": self.dim}, f)
+
+    @classmethod
+    def load(cls, path: str) -> "FaissIndex":
+        with open(os.path.join(path, "faiss.json"), "r", encoding="utf-8") as f:
+            params = json.load(f)
+        index = cls(params["factory"], params["search_params"])
+        index.dim = params["dim"]
+        index.index = index._faiss.read_index(os.path.join(path, "faiss.index"))
+        if index.search_params:
+            index._faiss.ParameterSpace().set_index_parameters(index.index, index.search_params)
+        return index
+
+    def __len__(self) -> int:
+        return 0 if self.index is None else self.index.ntotal
+
+
+def recall_at_k(backend, vectors: np.ndarray, queries: np.ndarray, k: int = 10) -> float:
+    """
+    Measures how many of the exact top-k neighbours an approximate backend returns.
+
+    Args:
+        backend: A backend holding `vectors`, in order.
+        vectors (np.ndarray): The indexed vectors.
+        queries (np.ndarray): The query vectors.
+        k (int, optional): The number of neighbours. Defaults to 10.
+
+    Returns:
+        float: The mean recall@k over the queries, between 0 and 1.
+    """
+    vectors = l2_normalize(vectors)
+    queries = l2_normalize(np.atleast_2d(queries))
+    found = 0
+    for query in queries:
+        exact = set(top_k(vectors @ query, k).tolist())
+        ids, _ = backend.search(query, k)
+        found += len(exact.intersection(ids.tolist()))
+    return found / (len(queries) * min(k, len(vectors)))
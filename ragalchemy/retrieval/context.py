@@ -0,0 +1,127 @@
+from typing import Iterable, List, Optional, Tuple
+
+from ..embedding.openai import count_tokens, truncate_tokens
+
+# Context window sizes, in tokens, of the OpenAI chat models. Dated variants (e.g.
+# "gpt-4-0613") use the entry of their longest matching prefix.
+MODEL_CONTEXT_TOKENS = {
+    "gpt-3.5-turbo": 4096,
+    "gpt-3.5-turbo-16k": 16384,
+    "gpt-4": 8192,
+    "gpt-4-32k": 32768,
+}
+DEFAULT_CONTEXT_TOKENS = 4096
+
+# The completion length ChatOpenAI requests (max_tokens).
+COMPLETION_TOKENS = 1500
+
+
+def context_budget(model: str, prompt: str = "", completion_tokens: int = COMPLETION_TOKENS, margin: int = 64) -> int:
+    """
+    Returns the number of tokens left for context in a model's window once the fixed part of
+    the prompt, the completion and a safety margin are set aside.
+
+    Args:
+        model (str): The chat model name.
+        prompt (str, optional): The fixed text sent with the context (system prompt, instructions, question).
+        completion_tokens (int, optional): The tokens reserved for the answer. Defaults to COMPLETION_TOKENS.
+        margin (int, optional): Tokens reserved for message framing and tokenization differences. Defaults to 64.
+
+    Returns:
+        int: The context budget, at least 0.
+    """
+    matches = [name for name in MODEL_CONTEXT_TOKENS if model.startswith(name)]
+    window = MODEL_CONTEXT_TOKENS[max(matches, key=len)] if matches else DEFAULT_CONTEXT_TOKENS
+    return max(0, window - count_tokens(prompt) - completion_tokens - margin)
+
+
+class ContextBuilder:
+    """
+    Packs labelled texts, such as retrieved slides, into a token budget.
+
+    Entries are (label, text, tokens) triples taken in the given order, most relevant first.
+    `tokens` is the cached token count of the text (Slide.tokens), so texts are only
+    tokenized again when one has to be trimmed; pass None to have it counted. Labels are
+    short and counted on the fly.
+
+    When an entry does not fit in what is left of the budget, `overflow` decides:
+        "trim"  cut it to the remaining budget (if at least min_tokens remain) and stop
+        "skip"  leave it out and keep trying the following, possibly shorter, entries
+        "stop"  stop packing
+    """
+    def __init__(self, max_tokens: int, overflow: str = "trim", min_tokens: int = 64, separator: str = "\n") -> None:
+        """
+        Initializes the ContextBuilder object.
+
+        Args:
+            max_tokens (int): The token budget of the packed context.
+            overflow (str, optional): "trim", "skip" or "stop". Defaults to "trim".
+            min_tokens (int, optional): The smallest remainder worth filling with a trimmed entry. Defaults to 64.
+            separator (str, optional): Appended after every entry. Defaults to a newline.
+        """
+        if overflow not in ("trim", "skip", "stop"):
+            raise Exception("overflow must be 'trim', 'skip' or 'stop'")
+        self.max_tokens = max_tokens
+        self.overflow = overflow
+        self.min_tokens = min_tokens
+        self.separator = separator
+        self._separator_tokens = count_tokens(separator) if separator else 0
+
+    def _entry_tokens(self, label: str, text: str, tokens: Optional[int]) -> int:
+        text_tokens = tokens if tokens is not None else count_tokens(text)
+        return count_tokens(label) + text_tokens + self._separator_tokens
+
+    def pack(self, entries: Iterable[Tuple[str, str, Optional[int]]]) -> Tuple[str, List[int]]:
+        """
+        Packs entries into the budget.
+
+        Args:
+            entries (Iterable[Tuple[str, str, Optional[int]]]): The (label, text, tokens) entries, most relevant first.
+
+        Returns:
+            Tuple[str, List[int]]: The packed context and the indices of the entries it includes (trimmed ones too).
+        """
+        parts = []
+        included = []
+        used = 0
+        for index, (label, text, tokens) in enumerate(entries):
+            needed = self._entry_tokens(label, text, tokens)
+            if used + needed <= self.max_tokens:
+                parts.append(label + text + self.separator)
+                included.append(index)
+                used += needed
+                continue
+            if self.overflow == "skip":
+                continue
+            if self.overflow == "trim":
+                remaining = self.max_tokens - used - count_tokens(label) - self._separator_tokens
+                if remaining >= self.min_tokens:
+                    parts.append(label + truncate_tokens(text, remaining) + self.separator)
+                    included.append(index)
+            break
+        return "".join(parts), included
+
+    def groups(self, entries: Iterable[Tuple[str, str, Optional[int]]]) -> List[Tuple[str, List[int]]]:
+        """
+        Splits entries, in order, into consecutive groups that each fit in the budget, e.g. for
+        map-reduce summarization. An entry larger than the whole budget is trimmed to fit alone.
+
+        Returns:
+            List[Tuple[str, List[int]]]: The packed text and entry indices of each group.
+        """
+        groups = []
+        parts, indices, used = [], [], 0
+        for index, (label, text, tokens) in enumerate(entries):
+            needed = self._entry_tokens(label, text, tokens)
+            if parts and used + needed > self.max_tokens:
+                groups.append(("".join(parts), indices))
+                parts, indices, used = [], [], 0
+            if needed > self.max_tokens:
+                text = truncate_tokens(text, self.max_tokens - count_tokens(label) - self._separator_tokens)
+                needed = self.max_tokens
+            parts.append(label + text + self.separator)
+            indices.append(index)
+            used += needed
+        if parts:
+            groups.append(("".join(parts), indices))
+        return groups
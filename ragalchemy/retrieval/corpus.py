@@ -0,0 +1,391 @@
+import json
+import os
+import time
+import numpy as np
+from typing import List, Optional, Tuple
+
+from ..extractors.pptx import PPTExtractor, Slide, Entity
+from ..retrieval.index import SlideIndex, l2_normalize
+from ..retrieval.lexical import BM25Index, fuse_ids, hybrid_search_ids
+
+CORPUS_VERSION = 1
+
+# One row per slide; the slide record itself is read lazily from slides.jsonl at `offset`.
+ROW_DTYPE = np.dtype([("deck", np.int32), ("slide_number", np.int32), ("tokens", np.int32), ("offset", np.int64), ("length", np.int32)])
+
+
+class _LazySlides:
+    """
+    A read-only sequence of the corpus slides that loads each record on access.
+    """
+    def __init__(self, corpus: "SlideCorpus") -> None:
+        self.corpus = corpus
+
+    def __getitem__(self, row: int) -> Slide:
+        return self.corpus.get_slide(row)
+
+    def __len__(self) -> int:
+        return len(self.corpus)
+
+
+class _LiveLexicalIndex:
+    """
+    The corpus BM25 index seen through search_ids() with the rows of replaced decks left out,
+    as passed to hybrid_search_ids.
+    """
+    def __init__(self, corpus: "SlideCorpus") -> None:
+        self.corpus = corpus
+
+    def search_ids(self, query: str, k: int = 10) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        deleted = self.corpus.deleted_rows()
+        ids, scores, coverage = self.corpus.lexical_index.search_ids(query, k + len(deleted))
+        keep = ~np.isin(ids, deleted)
+        return ids[keep][:k], scores[keep][:k], coverage[keep][:k]
+
+
+class SlideCorpus:
+    """
+    A multi-deck slide store persisted to a directory.
+
+    Layout of the directory:
+        manifest.json   format version, embedding dimension, row count and the ingested decks
+        embeddings.f32  L2-normalized float32 embeddings, one row per slide, opened as a np.memmap
+        rows.bin        a compact table of (deck, slide_number, tokens, offset, length) per row, opened as a np.memmap
+        slides.jsonl    slide title, text and entities, one JSON record per row
+        lexical/        a BM25 index of the slide texts, saved by flush()
+
+    Reopening a corpus only reads the manifest and maps the row table and the embeddings, so
+    no deck is re-extracted. New decks are appended to the end of every file, so the cost of
+    an append does not grow with the corpus; rows past the count recorded in the manifest
+    (from an interrupted append) are discarded on the next append. The lexical index is
+    rewritten as a whole, so it is only saved by flush(); rows appended since are indexed
+    when it is next loaded.
+
+    Adding a deck whose file is already in the corpus replaces it: the previous deck record
+    is marked "deleted" in the manifest and its rows are left out of every search. Their
+    space is not reclaimed.
+    """
+    def __init__(self, path: str, embedder=None, embedding_cache=None, backend=None) -> None:
+        """
+        Opens the corpus stored at path, creating an empty one if it does not exist.
+
+        Args:
+            path (str): The corpus directory.
+            embedder (Callable, optional): Passed to the PPTExtractor of ingested decks and used to embed queries, e.g. an EmbeddingBackend from embedding.backends.
+            embedding_cache (EmbeddingCache, optional): Passed to the PPTExtractor of ingested decks.
+            backend (optional): An approximate nearest-neighbour backend from retrieval.ann used by search(). Exact search over the memmap if None.
+        """
+        self.path = path
+        self.embedder = embedder
+        self.embedding_cache = embedding_cache
+        self.backend = backend
+        os.makedirs(path, exist_ok=True)
+        manifest_path = os.path.join(path, "manifest.json")
+        if os.path.isfile(manifest_path):
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+            if self.manifest["version"] != CORPUS_VERSION:
+                raise Exception(f"Unsupported corpus version {self.manifest['version']}")
+        else:
+            self.manifest = {"version": CORPUS_VERSION, "dim": 0, "count": 0, "text_bytes": 0, "decks": []}
+        self._open_rows()
+        self._open_embeddings()
+        self._index = None
+        self._lexical_index = None
+        self._lexical_saved = 0
+        self._deleted_rows = None
+
+    @property
+    def decks(self) -> List[dict]:
+        return self.manifest["decks"]
+
+    def _open_rows(self) -> None:
+        count = self.manifest["count"]
+        legacy_path = os.path.join(self.path, "rows.npy")
+        if os.path.isfile(legacy_path):
+            # Written by earlier versions; converted to rows.bin on the next append.
+            self.rows = np.load(legacy_path)[:count]
+        elif count == 0:
+            self.rows = np.empty(0, dtype=ROW_DTYPE)
+        else:
+            self.rows = np.memmap(os.path.join(self.path, "rows.bin"), dtype=ROW_DTYPE, mode="r", shape=(count,))
+
+    def _open_embeddings(self) -> None:
+        count, dim = self.manifest["count"], self.manifest["dim"]
+        if count == 0:
+            self.embeddings = np.empty((0, dim), dtype=np.float32)
+        else:
+            self.embeddings = np.memmap(os.path.join(self.path, "embeddings.f32"), dtype=np.float32, mode="r", shape=(count, dim))
+
+    def has_deck(self, file_path: str) -> bool:
+        file_path = os.path.abspath(file_path)
+        return any(deck["file_path"] == file_path and not deck.get("deleted") for deck in self.decks)
+
+    def deleted_rows(self) -> np.ndarray:
+        """
+        Returns the rows of the decks replaced by a later ingest of the same file, sorted.
+        """
+        if self._deleted_rows is None:
+            ranges = [np.arange(deck["first_row"], deck["first_row"] + deck["slide_count"]) for deck in self.decks if deck.get("deleted")]
+            self._deleted_rows = np.concatenate(ranges).astype(np.int64) if ranges else np.empty(0, dtype=np.int64)
+        return self._deleted_rows
+
+    def add_deck(self, file_path: str, skip_existing: bool = True, **extractor_kwargs) -> Optional[int]:
+        """
+        Extracts a .pptx file and appends its slides to the corpus.
+
+        Args:
+            file_path (str): The path to the PPT file.
+            skip_existing (bool, optional): Skip decks already in the corpus. If False, a deck already in the corpus is replaced. Defaults to True.
+            **extractor_kwargs: Passed to PPTExtractor.
+
+        Returns:
+            Optional[int]: The deck id, or None if the deck was skipped.
+        """
+        if skip_existing and self.has_deck(file_path):
+            return None
+        extractor_kwargs.setdefault("embedder", self.embedder)
+        extractor_kwargs.setdefault("embedding_cache", self.embedding_cache)
+        extractor = PPTExtractor(file_path, **extractor_kwargs)
+        extractor.extract()
+        return self.add_extractor(extractor)
+
+    def add_decks(self, file_paths: List[str], skip_existing: bool = True, **extractor_kwargs) -> List[Optional[int]]:
+        """
+        Extracts and appends several .pptx files, then flushes the corpus. A deck that fails
+        to extract is reported and skipped.
+        """
+        deck_ids = []
+        for file_path in file_paths:
+            try:
+                deck_ids.append(self.add_deck(file_path, skip_existing, **extractor_kwargs))
+            except Exception as e:
+                print("Ignoring deck ", file_path, " Error ", e)
+                deck_ids.append(None)
+        self.flush()
+        return deck_ids
+
+    def add_extractor(self, extractor: PPTExtractor) -> int:
+        """
+        Appends the slides of an already extracted deck.
+
+        Returns:
+            int: The deck id.
+        """
+        return self.add_slides(self.deck_record(extractor), extractor.slides)
+
+    @staticmethod
+    def deck_record(extractor: PPTExtractor) -> dict:
+        """
+        Returns the deck metadata stored in the manifest for an extracted deck.
+        """
+        return {
+            "file_path": os.path.abspath(extractor.file_path),
+            "title": extractor.title,
+            "author": extractor.author,
+            "subject": extractor.subject,
+            "keywords": extractor.keywords,
+            "last_modified_by": extractor.last_modified_by,
+            "created": str(extractor.created),
+            "modified": str(extractor.modified),
+        }
+
+    def add_slides(self, deck: dict, slides: List[Slide], deck_id: Optional[int] = None) -> int:
+        """
+        Appends a deck record and its embedded slides, or more slides of the last deck. A new
+        deck replaces the decks of the corpus with the same "file_path".
+
+        Args:
+            deck (dict): The deck metadata. Must contain "file_path". Ignored when deck_id is given.
+            slides (List[Slide]): The slides. Slides without embeddings are skipped.
+            deck_id (int, optional): The deck to extend instead of adding a new one. Only the last deck can be extended, so that its rows stay contiguous.
+
+        Returns:
+            int: The deck id.
+        """
+        slides = [slide for slide in slides if len(slide.embeddings) > 0]
+        if deck_id is None:
+            deck_id = len(self.decks)
+        elif deck_id != len(self.decks) - 1:
+            raise Exception("Only the last deck of the corpus can be extended")
+        vectors = l2_normalize(np.array([slide.embeddings for slide in slides], dtype=np.float32)) if slides else None
+        if vectors is not None:
+            if self.manifest["dim"] == 0:
+                self.manifest["dim"] = vectors.shape[1]
+            elif vectors.shape[1] != self.manifest["dim"]:
+                raise Exception(f"Embedding dimension {vectors.shape[1]} does not match corpus dimension {self.manifest['dim']}")
+
+        count, text_bytes = self.manifest["count"], self.manifest["text_bytes"]
+        rows = np.empty(len(slides), dtype=ROW_DTYPE)
+        records = []
+        offset = text_bytes
+        for i, slide in enumerate(slides):
+            record = json.dumps({
+                "slide_title": slide.slide_title,
+                "slide_text": slide.slide_text,
+                "entities": [[e.chart_type, e.text, e.left, e.top, e.width, e.height] for e in slide.entities],
+            }).encode("utf-8") + b"\n"
+            rows[i] = (deck_id, slide.slide_number, slide.tokens, offset, len(record))
+            records.append(record)
+            offset += len(record)
+
+        with open(os.path.join(self.path, "slides.jsonl"), "ab") as f:
+            f.truncate(text_bytes)
+            f.write(b"".join(records))
+        with open(os.path.join(self.path, "embeddings.f32"), "ab") as f:
+            f.truncate(count * self.manifest["dim"] * 4)
+            if vectors is not None:
+                f.write(vectors.tobytes())
+        legacy_path = os.path.join(self.path, "rows.npy")
+        with open(os.path.join(self.path, "rows.bin"), "ab") as f:
+            if os.path.isfile(legacy_path):
+                f.truncate(0)
+                f.write(np.ascontiguousarray(self.rows[:count]).tobytes())
+            f.truncate(count * ROW_DTYPE.itemsize)
+            f.write(rows.tobytes())
+        if deck_id == len(self.decks):
+            for previous in self.decks:
+                if previous["file_path"] == deck["file_path"] and not previous.get("deleted"):
+                    previous["deleted"] = True
+            deck.update({"deck_id": deck_id, "first_row": count, "slide_count": len(slides), "ingested_at": time.time()})
+            self.manifest["decks"].append(deck)
+        else:
+            self.decks[deck_id]["slide_count"] += len(slides)
+        self.manifest["count"] = count + len(slides)
+        self.manifest["text_bytes"] = offset
+        with open(os.path.join(self.path, "manifest.tmp.json"), "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f)
+        # The manifest is replaced last: until then a reader sees the previous count.
+        os.replace(os.path.join(self.path, "manifest.tmp.json"), os.path.join(self.path, "manifest.json"))
+        if os.path.isfile(legacy_path):
+            os.remove(legacy_path)
+
+        self._open_rows()
+        self._open_embeddings()
+        self._index = None
+        self._deleted_rows = None
+        return deck_id
+
+    def flush(self) -> None:
+        """
+        Saves the lexical index, first indexing the rows appended since it was last saved.
+        Call it once after a batch of appends: the index is rewritten as a whole.
+        """
+        index = self.lexical_index
+        if len(index) != self._lexical_saved:
+            index.save(os.path.join(self.path, "lexical"))
+            self._lexical_saved = len(index)
+
+    def close(self) -> None:
+        self.flush()
+
+    def get_slide(self, row: int) -> Slide:
+        """
+        Loads the slide stored at a row. Its embeddings are the normalized row of the memmap.
+        """
+        deck, slide_number, tokens, offset, length = self.rows[row]
+        with open(os.path.join(self.path, "slides.jsonl"), "rb") as f:
+            f.seek(int(offset))
+            record = json.loads(f.read(int(length)))
+        entities = [Entity(*entity) for entity in record["entities"]]
+        return Slide(int(slide_number), record["slide_title"], record["slide_text"], entities, self.embeddings[row], int(tokens))
+
+    def _slide_texts(self, start: int) -> List[str]:
+        """
+        Reads the slide texts of the rows from start to the end, in one sequential pass.
+        """
+        if start >= len(self):
+            return []
+        with open(os.path.join(self.path, "slides.jsonl"), "rb") as f:
+            f.seek(int(self.rows[start]["offset"]))
+            return [json.loads(f.readline())["slide_text"] for _ in range(start, len(self))]
+
+    def get_deck(self, row: int) -> dict:
+        return self.decks[int(self.rows[row]["deck"])]
+
+    @property
+    def index(self) -> SlideIndex:
+        """
+        A SlideIndex over the memory-mapped embeddings; slides are loaded only for returned results.
+        """
+        if self._index is None:
+            self._index = SlideIndex.from_matrix(self.embeddings, _LazySlides(self), normalized=True, backend=self.backend)
+            self._index.embedder = self.embedder
+        return self._index
+
+    @property
+    def lexical_index(self) -> BM25Index:
+        """
+        The BM25 index of the slide texts. It is loaded from disk and only the rows appended
+        since it was last saved are indexed; it is rebuilt if missing or unreadable.
+        """
+        if self._lexical_index is None:
+            lexical_path = os.path.join(self.path, "lexical")
+            try:
+                index = BM25Index.load(lexical_path, _LazySlides(self))
+            except Exception:
+                index = None
+            if index is None or len(index) > len(self):
+                index = BM25Index()
+                index.slides = _LazySlides(self)
+            self._lexical_index = index
+            self._lexical_saved = len(index)
+        if len(self._lexical_index) < len(self):
+            self._lexical_index.add_texts(self._slide_texts(len(self._lexical_index)))
+        return self._lexical_index
+
+    def _live_search_ids(self, query_embedding, k: int, threshold: Optional[float]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Runs a vector search without the rows of replaced decks, fetching as many more rows
+        as there are deleted ones so that k live rows can still be returned.
+        """
+        deleted = self.deleted_rows()
+        rows, scores = self.index.search_ids(query_embedding, k=k + len(deleted), threshold=threshold)
+        keep = ~np.isin(rows, deleted)
+        return rows[keep][:k], scores[keep][:k]
+
+    def search(self, query_embedding, k: int = 10, threshold: Optional[float] = None) -> List[Tuple[dict, Slide, float]]:
+        """
+        Finds the slides of all decks most similar to a query embedding.
+
+        Args:
+            query_embedding (List[float]): The query embedding.
+            k (int, optional): The maximum number of slides to return. Defaults to 10.
+            threshold (float, optional): The minimum cosine similarity of a returned slide.
+
+        Returns:
+            List[Tuple[dict, Slide, float]]: The (deck, slide, score) triples, most similar first.
+        """
+        rows, scores = self._live_search_ids(query_embedding, k, threshold)
+        return [(self.get_deck(row), self.get_slide(row), float(score)) for row, score in zip(rows, scores)]
+
+    def hybrid_search(self, query: str, k: int = 10, threshold: Optional[float] = None, embedder=None, fusion: str = "rrf", weights=None, min_margin: Optional[float] = 1.5) -> Tuple[List[Tuple[dict, Slide, float]], bool]:
+        """
+        Finds the slides of all decks that best match a query by fusing BM25 and vector
+        rankings. The query is only embedded when the lexical result is not confident.
+
+        Args:
+            query (str): The query text.
+            k (int, optional): The maximum number of slides to return. Defaults to 10.
+            threshold (float, optional): The minimum cosine similarity of a vector result.
+            embedder (Callable, optional): Embeds the query. Defaults to the corpus embedder. Without either, only the BM25 ranking is fused.
+            fusion (str, optional): "rrf" or "weighted". Defaults to "rrf".
+            weights (List[float], optional): The (lexical, dense) fusion weights.
+            min_margin (float, optional): See retrieval.lexical.is_confident. None always embeds the query.
+
+        Returns:
+            Tuple[List[Tuple[dict, Slide, float]], bool]: The (deck, slide, fused score) triples, best first, and whether the query was embedded.
+        """
+        embedder = embedder or self.embedder
+        if embedder is None:
+            ids, scores, _ = _LiveLexicalIndex(self).search_ids(query, k)
+            rows, scores = fuse_ids((ids, scores), (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)), k, fusion, weights)
+            return [(self.get_deck(row), self.get_slide(row), float(score)) for row, score in zip(rows, scores)], False
+        def dense_search_ids(text):
+            return self._live_search_ids(embedder([text])[0], k, threshold)
+        rows, scores, embedded = hybrid_search_ids(query, _LiveLexicalIndex(self), dense_search_ids, k, fusion, weights, min_margin)
+        return [(self.get_deck(row), self.get_slide(row), float(score)) for row, score in zip(rows, scores)], embedded
+
+    def __len__(self) -> int:
+        return self.manifest["count"]
+
@@ -0,0 +1,158 @@
+import numpy as np
+from typing import List, Optional, Tuple
+
+from ..extractors.pptx import Slide
+
+
+def l2_normalize(matrix: np.ndarray) -> np.ndarray:
+    """
+    Scales each row of a matrix to unit L2 norm. Rows with zero norm are left as zeros.
+
+    Args:
+        matrix (np.ndarray): A 1-D vector or a 2-D matrix of row vectors.
+
+    Returns:
+        np.ndarray: The normalized float32 matrix.
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Returns the indices of the k highest scores, best first, without sorting the whole array.
+    """
+    if k <= 0 or len(scores) == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class SlideIndex:
+    """
+    An in-memory cosine similarity index over slide embeddings.
+
+    Embeddings are L2-normalized once and kept in a single contiguous float32 matrix, so a
+    query is answered with one matrix-vector product and a partial sort. For very large
+    corpora an approximate backend from retrieval.ann can be passed instead, in which case
+    the vectors live in the backend and exact scoring is skipped.
+    """
+    def __init__(self, slides: Optional[List[Slide]] = None, backend = None, embedder = None) -> None:
+        """
+        Initializes the SlideIndex object.
+
+        Args:
+            slides (List[Slide], optional): The slides to index. Slides without embeddings are skipped.
+            backend (optional): An approximate nearest-neighbour backend such as IVFIndex. Exact search if None.
+            embedder (Callable, optional): Embeds text queries for search_text(), e.g. an EmbeddingBackend. Must be the model the slides were embedded with.
+        """
+        self.slides = []
+        self.matrix = np.empty((0, 0), dtype=np.float32)
+        self.backend = backend
+        self.embedder = embedder
+        if slides:
+            self.add(slides)
+
+    @classmethod
+    def from_matrix(cls, matrix: np.ndarray, slides: List[Slide], normalized: bool = False, backend = None) -> "SlideIndex":
+        """
+        Builds an index from an existing embedding matrix whose rows correspond to slides.
+
+        Args:
+            matrix (np.ndarray): The (n, dim) embedding matrix.
+            slides (List[Slide]): The slides, one per row.
+            normalized (bool, optional): Whether the rows are already L2-normalized float32, in which case the matrix is used as is (e.g. a memmap).
+            backend (optional): An approximate backend. Rows it does not hold yet (e.g. a backend loaded from disk before new decks were appended) are added to it.
+
+        Returns:
+            SlideIndex: The index.
+        """
+        index = cls(backend=backend)
+        index.slides = slides
+        if backend is not None:
+            for start in range(len(backend), len(matrix), 65536):
+                backend.add(matrix[start:start + 65536])
+        else:
+            index.matrix = matrix if normalized else np.ascontiguousarray(l2_normalize(matrix))
+        return index
+
+    def add(self, slides: List[Slide]) -> None:
+        """
+        Adds slides to the index.
+
+        Args:
+            slides (List[Slide]): The slides to add. Slides without embeddings are skipped.
+        """
+        slides = [slide for slide in slides if len(slide.embeddings) > 0]
+        if not slides:
+            return
+        vectors = l2_normalize(np.array([slide.embeddings for slide in slides], dtype=np.float32))
+        if self.backend is not None:
+            self.backend.add(vectors)
+        elif len(self.slides) == 0:
+            self.matrix = np.ascontiguousarray(vectors)
+        else:
+            self.matrix = np.concatenate([self.matrix, vectors])
+        self.slides.extend(slides)
+
+    def scores(self, query_embedding) -> np.ndarray:
+        """
+        Returns the cosine similarity of the query with every indexed slide.
+        """
+        return self.matrix @ l2_normalize(query_embedding)
+
+    def search_ids(self, query_embedding, k: int = 10, threshold: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the rows most similar to a query embedding.
+
+        Args:
+            query_embedding (List[float]): The query embedding.
+            k (int, optional): The maximum number of rows to return. Defaults to 10.
+            threshold (float, optional): The minimum cosine similarity of a returned row.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The row ids and their scores, most similar first.
+        """
+        if len(self.slides) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if self.backend is not None:
+            ids, ids_scores = self.backend.search(l2_normalize(query_embedding), k)
+        else:
+            scores = self.scores(query_embedding)
+            ids = top_k(scores, k)
+            ids_scores = scores[ids]
+        if threshold is not None:
+            keep = ids_scores >= threshold
+            ids, ids_scores = ids[keep], ids_scores[keep]
+        return ids, ids_scores
+
+    def search(self, query_embedding, k: int = 10, threshold: Optional[float] = None) -> List[Tuple[Slide, float]]:
+        """
+        Finds the slides most similar to a query embedding.
+
+        Args:
+            query_embedding (List[float]): The query embedding.
+            k (int, optional): The maximum number of slides to return. Defaults to 10.
+            threshold (float, optional): The minimum cosine similarity of a returned slide.
+
+        Returns:
+            List[Tuple[Slide, float]]: The (slide, score) pairs, most similar first.
+        """
+        ids, scores = self.search_ids(query_embedding, k, threshold)
+        return [(self.slides[i], float(score)) for i, score in zip(ids, scores)]
+
+    def search_text(self, query: str, k: int = 10, threshold: Optional[float] = None) -> List[Tuple[Slide, float]]:
+        """
+        Embeds a text query with the index embedder and finds the most similar slides.
+        """
+        if self.embedder is None:
+            raise Exception("search_text needs a SlideIndex created with an embedder")
+        return self.search(self.embedder([query])[0], k, threshold)
+
+    def __len__(self) -> int:
+        return len(self.slides)
@@ -0,0 +1,318 @@
+"""
+Lexical (BM25) retrieval over slide text and the fusion of lexical and vector rankings.
+
+Dense embeddings are good at paraphrases but poor at exact identifiers: SKU codes, figures
+and names from tables and charts. BM25Index covers those, and its results are merged with
+SlideIndex results by reciprocal rank fusion or by a weighted sum of normalized scores.
+"""
+import json
+import math
+import os
+import re
+import numpy as np
+from array import array
+from collections import Counter
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from ..extractors.pptx import Slide
+from ..retrieval.index import top_k
+
+LEXICAL_VERSION = 1
+
+# Words, numbers and compound identifiers such as "sku-0012", "38.5" or "q3/2023".
+TOKEN_PATTERN = re.compile(r"[^\W_]+(?:[-_./:][^\W_]+)*")
+
+STOPWORDS = frozenset("""
+a an and are as at be by can do does for from has have how i in is it its me my of on or
+our show tell that the their there these this to was were what when where which who why
+will with you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits a text into lowercase search terms. Compound identifiers are kept whole and also
+    split into their parts, so "SKU-0012" matches both "sku-0012" and "0012"; stopwords are
+    dropped.
+    """
+    terms = []
+    for match in TOKEN_PATTERN.finditer(text.lower()):
+        token = match.group()
+        if token in STOPWORDS:
+            continue
+        terms.append(token)
+        if not token.isalnum():
+            terms.extend(part for part in re.split(r"[-_./:]", token) if part not in STOPWORDS)
+    return terms
+
+
+class BM25Index:
+    """
+    An inverted index scored with Okapi BM25.
+
+    Every term maps to a postings list of (document id, term frequency) held in two typed
+    arrays (int32 ids, uint16 frequencies), so the index takes a few bytes per posting and
+    grows in place: adding documents only appends to the lists of their terms. Document
+    frequencies and the average length are read at query time, so no rebuild is needed.
+    A query scores only the postings of its terms.
+    """
+    def __init__(self, slides: Optional[List[Slide]] = None, k1: float = 1.2, b: float = 0.75) -> None:
+        """
+        Initializes the BM25Index object.
+
+        Args:
+            slides (List[Slide], optional): The slides to index, by slide_text.
+            k1 (float, optional): The term frequency saturation. Defaults to 1.2.
+            b (float, optional): The document length normalization. Defaults to 0.75.
+        """
+        self.k1 = k1
+        self.b = b
+        self.slides = []
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        self.doc_lengths = array("i")
+        self.total_length = 0
+        if slides:
+            self.add(slides)
+
+    def add_texts(self, texts: Sequence[str]) -> None:
+        """
+        Indexes documents under the next ids.
+        """
+        postings = self.postings
+        for text in texts:
+            doc_id = len(self.doc_lengths)
+            terms = tokenize(text)
+            for term, count in Counter(terms).items():
+                term_postings = postings.get(term)
+                if term_postings is None:
+                    term_postings = postings[term] = (array("i"), array("H"))
+                term_postings[0].append(doc_id)
+                term_postings[1].append(min(count, 65535))
+            self.doc_lengths.append(len(terms))
+            self.total_length += len(terms)
+
+    def add(self, slides: List[Slide]) -> None:
+        """
+        Adds slides to the index, by slide_text.
+        """
+        self.add_texts([slide.slide_text for slide in slides])
+        self.slides.extend(slides)
+
+    def search_ids(self, query: str, k: int = 10) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Finds the documents that best match a query.
+
+        Args:
+            query (str): The query text.
+            k (int, optional): The maximum number of documents to return. Defaults to 10.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: The document ids, their BM25 scores, and the fraction of the distinct query terms each contains, best first. Documents matching no term are not returned.
+        """
+        terms = set(tokenize(query))
+        count = len(self.doc_lengths)
+        if not terms or count == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32), np.empty(0, dtype=np.float32)
+        doc_lengths = np.frombuffer(self.doc_lengths, dtype=np.int32)
+        length_norm = self.k1 * (1 - self.b + self.b * doc_lengths / (self.total_length / count or 1))
+        scores = np.zeros(count, dtype=np.float32)
+        matched = np.zeros(count, dtype=np.int32)
+        for term in terms:
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+            docs = np.frombuffer(postings[0], dtype=np.int32)
+            tfs = np.frombuffer(postings[1], dtype=np.uint16).astype(np.float32)
+            idf = math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            scores[docs] += idf * tfs * (self.k1 + 1) / (tfs + length_norm[docs])
+            matched[docs] += 1
+        candidates = np.flatnonzero(matched)
+        best = candidates[top_k(scores[candidates], k)]
+        return best, scores[best], matched[best].astype(np.float32) / len(terms)
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[Slide, float]]:
+        """
+        Finds the slides that best match a query.
+
+        Returns:
+            List[Tuple[Slide, float]]: The (slide, score) pairs, best first.
+        """
+        ids, scores, coverage = self.search_ids(query, k)
+        return [(self.slides[i], float(score)) for i, score in zip(ids, scores)]
+
+    def save(self, path: str) -> None:
+        """
+        Writes the index to a directory: the postings concatenated in term order into
+        lexical.npz and the vocabulary into lexical.json. Slides are not saved.
+        """
+        os.makedirs(path, exist_ok=True)
+        terms = list(self.postings)
+        sizes = np.array([len(self.postings[term][0]) for term in terms], dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        docs = np.frombuffer(b"".join(self.postings[term][0].tobytes() for term in terms), dtype=np.int32)
+        tfs = np.frombuffer(b"".join(self.postings[term][1].tobytes() for term in terms), dtype=np.uint16)
+        np.savez(os.path.join(path, "lexical.npz"), offsets=offsets, docs=docs, tfs=tfs, doc_lengths=np.frombuffer(self.doc_lengths, dtype=np.int32))
+        with open(os.path.join(path, "lexical.json"), "w", encoding="utf-8") as f:
+            json.dump({"version": LEXICAL_VERSION, "k1": self.k1, "b": self.b, "terms": terms}, f)
+
+    @classmethod
+    def load(cls, path: str, slides: Optional[List[Slide]] = None) -> "BM25Index":
+        """
+        Reads an index written by save().
+
+        Args:
+            path (str): The directory.
+            slides (List[Slide], optional): The slides of the saved documents, in id order, returned by search().
+
+        Returns:
+            BM25Index: The index.
+        """
+        with open(os.path.join(path, "lexical.json"), "r", encoding="utf-8") as f:
+            params = json.load(f)
+        if params["version"] != LEXICAL_VERSION:
+            raise Exception(f"Unsupported lexical index version {params['version']}")
+        index = cls(k1=params["k1"], b=params["b"])
+        with np.load(os.path.join(path, "lexical.npz")) as data:
+            offsets, docs, tfs = data["offsets"], data["docs"], data["tfs"]
+            for i, term in enumerate(params["terms"]):
+                start, end = offsets[i], offsets[i + 1]
+                index.postings[term] = (array("i", docs[start:end].tobytes()), array("H", tfs[start:end].tobytes()))
+            index.doc_lengths = array("i", data["doc_lengths"].tobytes())
+        index.total_length = sum(index.doc_lengths)
+        if slides is not None:
+            index.slides = slides
+        return index
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+
+def is_confident(scores: np.ndarray, coverage: np.ndarray, min_coverage: float = 1.0, min_margin: float = 1.5) -> bool:
+    """
+    Whether a lexical result is decisive enough to answer without a dense search: the best
+    document contains at least min_coverage of the query terms and scores at least
+    min_margin times the runner-up.
+
+    Args:
+        scores (np.ndarray): The BM25 scores, best first, as returned by BM25Index.search_ids.
+        coverage (np.ndarray): The query term coverage of the same documents.
+        min_coverage (float, optional): The minimum fraction of query terms in the best document. Defaults to 1.0.
+        min_margin (float, optional): The minimum ratio of the best to the second score. Defaults to 1.5.
+
+    Returns:
+        bool: True if the lexical ranking can be used alone.
+    """
+    if len(scores) == 0 or coverage[0] < min_coverage:
+        return False
+    return len(scores) == 1 or scores[0] >= min_margin * scores[1]
+
+
+def reciprocal_rank_fusion(rankings: List[Sequence[Hashable]], k: int = 60, weights: Optional[List[float]] = None) -> List[Tuple[Hashable, float]]:
+    """
+    Merges rankings by reciprocal rank fusion: an item scores sum(weight / (k + rank)) over
+    the rankings it appears in, so no score calibration between retrievers is needed.
+
+    Args:
+        rankings (List[Sequence[Hashable]]): The rankings, each best first.
+        k (int, optional): The rank offset; larger values flatten the contribution of top ranks. Defaults to 60.
+        weights (List[float], optional): One weight per ranking. Defaults to 1 each.
+
+    Returns:
+        List[Tuple[Hashable, float]]: The (item, fused score) pairs, best first.
+    """
+    weights = weights or [1.0] * len(rankings)
+    fused = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, item in enumerate(ranking, start=1):
+            fused[item] = fused.get(item, 0.0) + weight / (k + rank)
+    return sorted(fused.items(), key=lambda pair: -pair[1])
+
+
+def weighted_fusion(results: List[Sequence[Tuple[Hashable, float]]], weights: Optional[List[float]] = None) -> List[Tuple[Hashable, float]]:
+    """
+    Merges scored results by a weighted sum of their min-max normalized scores. An item
+    missing from a result list gets 0 from it.
+
+    Args:
+        results (List[Sequence[Tuple[Hashable, float]]]): The (item, score) lists of each retriever.
+        weights (List[float], optional): One weight per list. Defaults to 1 each.
+
+    Returns:
+        List[Tuple[Hashable, float]]: The (item, fused score) pairs, best first.
+    """
+    weights = weights or [1.0] * len(results)
+    fused = {}
+    for pairs, weight in zip(results, weights):
+        if not pairs:
+            continue
+        scores = [score for item, score in pairs]
+        low, high = min(scores), max(scores)
+        for item, score in pairs:
+            normalized = (score - low) / (high - low) if high > low else 1.0
+            fused[item] = fused.get(item, 0.0) + weight * normalized
+    return sorted(fused.items(), key=lambda pair: -pair[1])
+
+
+def fuse_ids(
+        lexical: Tuple[np.ndarray, np.ndarray],
+        dense: Tuple[np.ndarray, np.ndarray],
+        k: int = 10,
+        fusion: str = "rrf",
+        weights: Optional[List[float]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fuses the (ids, scores) of a lexical and a dense search. Either may be empty, e.g. when
+    the dense search was skipped, and the scores stay on the fusion's scale.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The ids and their fused scores, best first, at most k.
+    """
+    (ids, scores), (dense_ids, dense_scores) = lexical, dense
+    if fusion == "rrf":
+        fused = reciprocal_rank_fusion([ids.tolist(), dense_ids.tolist()], weights=weights)
+    elif fusion == "weighted":
+        fused = weighted_fusion([list(zip(ids.tolist(), scores.tolist())), list(zip(dense_ids.tolist(), dense_scores.tolist()))], weights)
+    else:
+        raise Exception("Fusion", fusion, "not supported.")
+    fused = fused[:k]
+    return np.array([item for item, score in fused], dtype=np.int64), np.array([score for item, score in fused], dtype=np.float32)
+
+
+def hybrid_search_ids(
+        query: str,
+        lexical_index: BM25Index,
+        dense_search_ids: Callable[[str], Tuple[np.ndarray, np.ndarray]],
+        k: int = 10,
+        fusion: str = "rrf",
+        weights: Optional[List[float]] = None,
+        min_margin: Optional[float] = 1.5
+    ) -> Tuple[np.ndarray, np.ndarray, bool]:
+    """
+    Ranks documents by lexical and vector similarity. The dense search, and so the query
+    embedding call, is skipped when the lexical result is confident (see is_confident).
+    Both retrievers must number documents the same way.
+
+    The returned scores are always fused scores (see fuse_ids): when the dense search is
+    skipped they are the lexical ranking's contribution alone, so they can be compared
+    across queries whether or not the query was embedded. A similarity threshold belongs in
+    dense_search_ids, on the cosine scale, not on these scores.
+
+    Args:
+        query (str): The query text.
+        lexical_index (BM25Index): The lexical index.
+        dense_search_ids (Callable[[str], Tuple[np.ndarray, np.ndarray]]): Embeds the query and returns the (ids, scores) of the vector search.
+        k (int, optional): The maximum number of documents to return. Defaults to 10.
+        fusion (str, optional): "rrf" for reciprocal rank fusion or "weighted" for a weighted sum of normalized scores. Defaults to "rrf".
+        weights (List[float], optional): The (lexical, dense) weights of the fusion. Defaults to equal weights.
+        min_margin (float, optional): The score margin that makes a lexical result confident. None always runs the dense search. Defaults to 1.5.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, bool]: The document ids and their fused scores, best first, and whether the dense search ran.
+    """
+    ids, scores, coverage = lexical_index.search_ids(query, k)
+    if min_margin is not None and is_confident(scores, coverage, min_margin=min_margin):
+        dense, embedded = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)), False
+    else:
+        dense, embedded = dense_search_ids(query), True
+    fused_ids, fused_scores = fuse_ids((ids, scores), dense, k, fusion, weights)
+    return fused_ids, fused_scores, embedded
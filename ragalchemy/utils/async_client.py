@@ -0,0 +1,330 @@
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from typing import List, Optional
+
+import aiohttp
+
+from ..embedding.openai import count_tokens
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+
+
+class RetryableError(Exception):
+    """
+    Raised for responses worth retrying: rate limits, server errors and network failures.
+    """
+    def __init__(self, message: str, retry_after: Optional[float] = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    An asyncio token bucket refilled continuously at a per-minute rate.
+    """
+    def __init__(self, per_minute: float, capacity: Optional[float] = None) -> None:
+        """
+        Initializes the TokenBucket object.
+
+        Args:
+            per_minute (float): The refill rate, in tokens per minute.
+            capacity (float, optional): The burst size. Defaults to one minute's worth of tokens.
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1) -> None:
+        """
+        Waits until `amount` tokens are available and takes them. Requests larger than the
+        capacity wait for a full bucket.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        amount = min(amount, self.capacity)
+        # The lock keeps waiters in arrival order, so large requests are not starved.
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+class AsyncOpenAIClient:
+    """
+    An asyncio client for the OpenAI HTTP API (or any OpenAI-compatible server).
+
+    All requests share one pooled aiohttp session, pass through request-per-minute and
+    token-per-minute buckets (sized with count_tokens), are capped by a concurrency limit,
+    and are retried with jittered exponential backoff on 429, 5xx and network errors,
+    honouring Retry-After. The *_sync methods run the same coroutines on a private event
+    loop thread, so blocking callers still reuse connections and share the limits.
+
+    A client must only be used from one event loop: either await its coroutines from your
+    loop, or use the *_sync methods, not both.
+    """
+    def __init__(
+            self,
+            api_key: Optional[str] = None,
+            base_url: str = DEFAULT_BASE_URL,
+            max_concurrency: int = 16,
+            requests_per_minute: float = 3500,
+            tokens_per_minute: float = 90000,
+            max_retries: int = 6,
+            timeout: float = 60.0,
+            backoff_base: float = 0.5,
+            backoff_max: float = 30.0
+        ) -> None:
+        """
+        Initializes the AsyncOpenAIClient object.
+
+        Args:
+            api_key (str, optional): The API key. Defaults to $OPENAI_API_KEY, then openai.api_key.
+            base_url (str, optional): The API root, e.g. "http://localhost:8000/v1" for a local server.
+            max_concurrency (int, optional): The maximum number of requests in flight. Defaults to 16.
+            requests_per_minute (float, optional): The request rate limit. Defaults to 3500.
+            tokens_per_minute (float, optional): The token rate limit. Defaults to 90000.
+            max_retries (int, optional): The number of retries of a failed request. Defaults to 6.
+            timeout (float, optional): The total timeout of one attempt, in seconds; for streamed completions, the longest wait for the next chunk. Defaults to 60.
+            backoff_base (float, optional): The first backoff cap, in seconds; doubled every retry. Defaults to 0.5.
+            backoff_max (float, optional): The largest backoff cap, in seconds. Defaults to 30.
+        """
+        if api_key is None:
+            api_key = os.environ.get("OPENAI_API_KEY")
+        if api_key is None:
+            import openai
+            api_key = openai.api_key
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.retries = 0
+        self._semaphore = None
+        self._session = None
+        self._loop = None
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"Authorization": f"Bearer {self.api_key}"}
+            )
+        return self._session
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        # Full jitter: a random delay up to an exponentially growing cap.
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    @staticmethod
+    async def _retryable_error(response) -> RetryableError:
+        retry_after = response.headers.get("Retry-After")
+        return RetryableError(
+            f"OpenAI API error {response.status}: {await response.text()}",
+            float(retry_after) if retry_after and retry_after.replace(".", "", 1).isdigit() else None
+        )
+
+    async def request(self, path: str, payload: dict, tokens: int = 0) -> dict:
+        """
+        Posts a JSON payload to an API path with rate limiting and retries.
+
+        Every attempt, retries included, goes through the rate limit buckets; the backoff
+        between attempts is spent outside the concurrency limit.
+
+        Args:
+            path (str): The path under base_url, e.g. "/chat/completions".
+            payload (dict): The JSON body.
+            tokens (int, optional): The tokens the request will consume, charged to the token bucket.
+
+        Returns:
+            dict: The decoded JSON response.
+        """
+        session = await self._get_session()
+        for attempt in range(self.max_retries + 1):
+            await self.request_bucket.acquire(1)
+            await self.token_bucket.acquire(tokens)
+            try:
+                async with self._semaphore:
+                    async with session.post(self.base_url + path, json=payload) as response:
+                        if response.status == 429 or response.status >= 500:
+                            raise await self._retryable_error(response)
+                        if response.status >= 400:
+                            raise Exception(f"OpenAI API error {response.status}: {await response.text()}")
+                        return await response.json()
+            except (RetryableError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.max_retries:
+                    raise
+                self.retries += 1
+                await asyncio.sleep(self._backoff(attempt, getattr(e, "retry_after", None)))
+
+    async def chat_completion(self, messages: List[dict], model: str, temperature: float = 0.0, max_tokens: int = 1500, **kwargs) -> dict:
+        """
+        Creates a chat completion.
+
+        Args:
+            messages (List[dict]): The chat messages.
+            model (str): The model name.
+            temperature (float, optional): The sampling temperature. Defaults to 0.0.
+            max_tokens (int, optional): The maximum completion length. Defaults to 1500.
+            **kwargs: Additional request fields.
+
+        Returns:
+            dict: The API response.
+        """
+        tokens = sum(count_tokens(message["content"]) for message in messages) + max_tokens
+        payload = {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens, **kwargs}
+        return await self.request("/chat/completions", payload, tokens)
+
+    async def chat_completion_stream(self, messages: List[dict], model: str, temperature: float = 0.0, max_tokens: int = 1500, **kwargs):
+        """
+        Creates a streamed chat completion and yields the content deltas as they arrive.
+
+        Failures before the first byte of the response are retried like other requests; once
+        tokens have been yielded the stream is not retried. The timeout bounds the wait for
+        each chunk rather than the whole response, so long answers are not cut off.
+
+        Yields:
+            str: The content deltas.
+        """
+        tokens = sum(count_tokens(message["content"]) for message in messages) + max_tokens
+        payload = {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens, "stream": True, **kwargs}
+        session = await self._get_session()
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
+        for attempt in range(self.max_retries + 1):
+            await self.request_bucket.acquire(1)
+            await self.token_bucket.acquire(tokens)
+            # Held until the stream is consumed, since the connection is in use until then.
+            await self._semaphore.acquire()
+            try:
+                response = await session.post(self.base_url + "/chat/completions", json=payload, timeout=timeout)
+                if response.status == 429 or response.status >= 500:
+                    error = await self._retryable_error(response)
+                    response.release()
+                    raise error
+                break
+            except (RetryableError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self._semaphore.release()
+                if attempt == self.max_retries:
+                    raise
+                self.retries += 1
+                await asyncio.sleep(self._backoff(attempt, getattr(e, "retry_after", None)))
+            except BaseException:
+                self._semaphore.release()
+                raise
+        try:
+            if response.status >= 400:
+                raise Exception(f"OpenAI API error {response.status}: {await response.text()}")
+            # Server-sent events: one "data: {json}" line per chunk, ending with "data: [DONE]".
+            async for line in response.content:
+                line = line.strip()
+                if not line.startswith(b"data:"):
+                    continue
+                data = line[len(b"data:"):].strip()
+                if data == b"[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or [{}]
+                delta = choices[0].get("delta", {}).get("content")
+                if delta:
+                    yield delta
+        finally:
+            response.release()
+            self._semaphore.release()
+
+    async def embeddings(self, texts: List[str], model: str = "text-embedding-ada-002") -> List[List[float]]:
+        """
+        Embeds a list of texts with one multi-input request.
+
+        Returns:
+            List[List[float]]: The embeddings, in the same order as the input texts.
+        """
+        tokens = sum(count_tokens(text) for text in texts)
+        response = await self.request("/embeddings", {"model": model, "input": list(texts)}, tokens)
+        data = sorted(response["data"], key=lambda item: item["index"])
+        return [item["embedding"] for item in data]
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    def run_sync(self, coroutine):
+        """
+        Runs a coroutine on the client's private event loop thread and waits for its result.
+        """
+        with self._thread_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="openai-client", daemon=True)
+                self._thread.start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def chat_completion_sync(self, messages: List[dict], model: str, **kwargs) -> dict:
+        return self.run_sync(self.chat_completion(messages, model, **kwargs))
+
+    def iterate_sync(self, async_iterator):
+        """
+        Iterates an async iterator on the client's private event loop thread. Closing the
+        returned generator closes the async iterator, which releases its connection.
+        """
+        try:
+            while True:
+                try:
+                    item = self.run_sync(async_iterator.__anext__())
+                except StopAsyncIteration:
+                    return
+                yield item
+        finally:
+            self.run_sync(async_iterator.aclose())
+
+    def chat_completion_stream_sync(self, messages: List[dict], model: str, **kwargs):
+        return self.iterate_sync(self.chat_completion_stream(messages, model, **kwargs))
+
+    def embeddings_sync(self, texts: List[str], model: str = "text-embedding-ada-002") -> List[List[float]]:
+        return self.run_sync(self.embeddings(texts, model))
+
+    def close_sync(self) -> None:
+        """
+        Closes the session and stops the private event loop thread.
+        """
+        if self._loop is not None:
+            self.run_sync(self.close())
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop = None
+            self._thread = None
+
+
+_default_client = None
+
+def get_default_client() -> AsyncOpenAIClient:
+    """
+    Returns a process-wide AsyncOpenAIClient with the default limits, created on first use.
+    """
+    global _default_client
+    if _default_client is None:
+        _default_client = AsyncOpenAIClient()
+    return _default_client
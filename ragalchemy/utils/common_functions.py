@@ -1,60 +1,92 @@
-from prettytable import PrettyTable
-from pptx.oxml.xmlchemy import OxmlElement
-from numpy import dot
-from numpy.linalg import norm
-
-
-def cosine_similarity(a,b):
-    cos_sim = dot(a, b)/(norm(a)*norm(b))
-    return cos_sim
-
-def format_dataframe_to_prettytables(df):
-    """
-    Converts a pandas DataFrame to a prettytable.
-
-    Args:
-        df (pandas.DataFrame): The DataFrame to convert.
-
-    Returns:
-        str: The prettytable as a string.
-    """
-    table = PrettyTable([''] + list(df.columns))
-    for row in df.itertuples():
-        table.add_row(row)
-    return str(table)
-
-def convert_pptx_table_to_prettytable(table):
-    """
-    Converts a PowerPoint table to a prettytable.
-
-    Args:
-        table (pptx.table.Table): The PowerPoint table to convert.
-
-    Returns:
-        str: The prettytable as a string.
-    """
-    ptable = PrettyTable()
-    for i, row in enumerate(table.rows):
-        cell_list = [cell.text for cell in row.cells]
-        ptable.add_row(cell_list)
-    return str(ptable)
-
-def SubElement(parent, tagname, **kwargs):
-    """
-    Creates a new XML element and appends it to the parent element.
-
-    Args:
-        parent (OxmlElement): The parent element.
-        tagname (str): The tag name of the new element.
-        **kwargs: Additional attributes for the new element.
-
-    Returns:
-        OxmlElement: The new element.
-    """
-    element = OxmlElement(tagname)
-    element.attrib.update(kwargs)
-    parent.append(element)
-    return element
-
-
-
+from ..utils.lazy import LazyModule
+
+numpy = LazyModule("numpy")
+prettytable = LazyModule("prettytable")
+xmlchemy = LazyModule("pptx.oxml.xmlchemy")
+
+
+def cosine_similarity(a,b):
+    cos_sim = numpy.dot(a, b)/(numpy.linalg.norm(a)*numpy.linalg.norm(b))
+    return cos_sim
+
+def format_dataframe_to_prettytables(df):
+    """
+    Converts a pandas DataFrame to a prettytable.
+
+    Args:
+        df (pandas.DataFrame): The DataFrame to convert.
+
+    Returns:
+        str: The prettytable as a string.
+    """
+    table = prettytable.PrettyTable([''] + list(df.columns))
+    for row in df.itertuples():
+        table.add_row(row)
+    return str(table)
+
+def format_table(header, rows):
+    """
+    Renders a table in the same boxed layout as prettytable, without its per-cell overhead.
+
+    Args:
+        header (list): The column names.
+        rows (Iterable[list]): The rows; cells are converted with str().
+
+    Returns:
+        str: The table as a string.
+    """
+    lines = [[str(cell) for cell in header]] + [[str(cell) for cell in row] for row in rows]
+    columns = max(len(line) for line in lines)
+    lines = [line + [""] * (columns - len(line)) for line in lines]
+    widths = [0] * columns
+    for line in lines:
+        for i, cell in enumerate(line):
+            for part in cell.split("\n"):
+                widths[i] = max(widths[i], len(part))
+    border = "+" + "+".join("-" * (width + 2) for width in widths) + "+"
+    out = [border]
+    for n, line in enumerate(lines):
+        cells = [cell.split("\n") for cell in line]
+        height = max(len(parts) for parts in cells)
+        for k in range(height):
+            out.append("| " + " | ".join((parts[k] if k < len(parts) else "").center(width) for parts, width in zip(cells, widths)) + " |")
+        if n == 0:
+            out.append(border)
+    out.append(border)
+    return "\n".join(out)
+
+def convert_pptx_table_to_prettytable(table):
+    """
+    Converts a PowerPoint table to a prettytable.
+
+    Args:
+        table (pptx.table.Table): The PowerPoint table to convert.
+
+    Returns:
+        str: The prettytable as a string.
+    """
+    ptable = prettytable.PrettyTable()
+    for i, row in enumerate(table.rows):
+        cell_list = [cell.text for cell in row.cells]
+        ptable.add_row(cell_list)
+    return str(ptable)
+
+def SubElement(parent, tagname, **kwargs):
+    """
+    Creates a new XML element and appends it to the parent element.
+
+    Args:
+        parent (OxmlElement): The parent element.
+        tagname (str): The tag name of the new element.
+        **kwargs: Additional attributes for the new element.
+
+    Returns:
+        OxmlElement: The new element.
+    """
+    element = xmlchemy.OxmlElement(tagname)
+    element.attrib.update(kwargs)
+    parent.append(element)
+    return element
+
+
+
@@ -0,0 +1,76 @@
+import importlib
+import threading
+from typing import Callable, Optional
+
+
+class LazyModule:
+    """
+    A stand-in for a module that is imported on first attribute access.
+
+    Heavy optional dependencies (pandas, the openai SDK, PIL, prettytable) are bound to a
+    LazyModule at module level, so importing ragalchemy does not pay for them until a code
+    path actually uses one. Attribute reads and writes are forwarded to the real module.
+    """
+    def __init__(self, name: str, on_import: Optional[Callable] = None) -> None:
+        """
+        Initializes the LazyModule object.
+
+        Args:
+            name (str): The module to import, e.g. "pandas" or "PIL.Image".
+            on_import (Callable, optional): Called once with the imported module, to configure it.
+        """
+        self.__dict__["_name"] = name
+        self.__dict__["_on_import"] = on_import
+        self.__dict__["_module"] = None
+        self.__dict__["_lock"] = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    module = importlib.import_module(self._name)
+                    if self._on_import is not None:
+                        self._on_import(module)
+                    self.__dict__["_module"] = module
+        return self._module
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, name: str):
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name: str, value) -> None:
+        setattr(self._load(), name, value)
+
+    def __repr__(self) -> str:
+        return f"<LazyModule {self._name!r} {'loaded' if self.is_loaded else 'not loaded'}>"
+
+
+def prewarm(tokenizer: bool = True, extraction: bool = True, openai: bool = True, chart_extractor = None) -> None:
+    """
+    Loads the lazily imported dependencies up front. Long-lived workers (web servers, queue
+    consumers, ingestion pools) can call it at boot so the first request does not pay for
+    the imports, the tokenizer or the chart model.
+
+    Args:
+        tokenizer (bool, optional): Build the tiktoken encoding used by count_tokens. Defaults to True.
+        extraction (bool, optional): Import the .pptx extraction stack (python-pptx, PIL, prettytable, pandas). Defaults to True.
+        openai (bool, optional): Import the openai SDK. Defaults to True.
+        chart_extractor (ImageChartDataExtractor, optional): Load this chart-from-image model as well.
+    """
+    if tokenizer:
+        from ..embedding.openai import get_encoding
+        get_encoding()
+    if extraction:
+        from ..extractors import pptx, image
+        from . import common_functions
+        pptx.pd._load()
+        image.Image._load()
+        common_functions.prettytable._load()
+    if openai:
+        from ..embedding.openai import openai as openai_module
+        openai_module._load()
+    if chart_extractor is not None:
+        chart_extractor._load()
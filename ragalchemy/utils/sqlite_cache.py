@@ -0,0 +1,163 @@
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class SQLiteCache:
+    """
+    A persistent key/value cache of bytes values backed by a single SQLite file, bounded by
+    entry count and total size with least-recently-used eviction.
+
+    A file-backed cache can be pickled: the copy (e.g. in a worker process) reopens the same
+    file, and SQLite's WAL mode lets the processes share it.
+    """
+    def __init__(self, path: str = ":memory:", max_entries: Optional[int] = None, max_bytes: Optional[int] = None) -> None:
+        """
+        Initializes the SQLiteCache object.
+
+        Args:
+            path (str, optional): The path of the SQLite file. Defaults to an in-memory database.
+            max_entries (int, optional): The maximum number of entries kept. Unbounded if None.
+            max_bytes (int, optional): The maximum total size of the stored values. Unbounded if None.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._connect()
+
+    def _connect(self) -> None:
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        if self.path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, namespace TEXT, value BLOB, size INTEGER, last_access REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_last_access ON cache (last_access)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_namespace ON cache (namespace)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Returns the value stored for a key, or None on a miss.
+        """
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        """
+        Returns the stored values for the keys that are present, and marks them as recently used.
+
+        Args:
+            keys (List[str]): The keys to look up.
+
+        Returns:
+            Dict[str, bytes]: The values found, keyed by key.
+        """
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock:
+            # SQLite limits the number of bound parameters per statement.
+            for start in range(0, len(unique_keys), 500):
+                chunk = unique_keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(f"SELECT key, value FROM cache WHERE key IN ({placeholders})", chunk).fetchall()
+                found.update(rows)
+            if found:
+                now = time.time()
+                self._conn.executemany("UPDATE cache SET last_access = ? WHERE key = ?", [(now, key) for key in found])
+                self._conn.commit()
+            self.hits += sum(1 for key in keys if key in found)
+            self.misses += sum(1 for key in keys if key not in found)
+        return found
+
+    def set(self, key: str, value: bytes, namespace: str = "") -> None:
+        """
+        Stores a value for a key.
+        """
+        self.set_many([(key, value)], namespace)
+
+    def set_many(self, items: Iterable[Tuple[str, bytes]], namespace: str = "") -> None:
+        """
+        Stores several values and evicts the least recently used entries beyond the bounds.
+
+        Args:
+            items (Iterable[Tuple[str, bytes]]): The (key, value) pairs to store.
+            namespace (str, optional): A label used to invalidate related entries together.
+        """
+        now = time.time()
+        rows = [(key, namespace, value, len(value), now) for key, value in items]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)", rows)
+            self._evict()
+            self._conn.commit()
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        """
+        Removes the given keys from the cache.
+        """
+        with self._lock:
+            self._conn.executemany("DELETE FROM cache WHERE key = ?", [(key,) for key in keys])
+            self._conn.commit()
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        """
+        Removes every entry, or only the entries of one namespace.
+        """
+        with self._lock:
+            if namespace is None:
+                self._conn.execute("DELETE FROM cache")
+            else:
+                self._conn.execute("DELETE FROM cache WHERE namespace = ?", (namespace,))
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """
+        Returns the hit/miss counters and the current size of the cache.
+        """
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __getstate__(self) -> dict:
+        if self.path == ":memory:":
+            raise TypeError("An in-memory SQLiteCache cannot be shared with other processes")
+        state = dict(self.__dict__)
+        del state["_conn"], state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._connect()
+
+    def _evict(self) -> None:
+        if self.max_entries is not None:
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+        if self.max_bytes is not None:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+            if total > self.max_bytes:
+                rows = self._conn.execute("SELECT key, size FROM cache ORDER BY last_access ASC").fetchall()
+                evicted = []
+                for key, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    evicted.append((key,))
+                    total -= size
+                self._conn.executemany("DELETE FROM cache WHERE key = ?", evicted)
+
+    def __len__(self) -> int:
+        return self.stats()["entries"]
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM cache WHERE key = ?", (key,)).fetchone() is not None
@@ -1,21 +1,25 @@
-from setuptools import setup, find_packages
-from datetime import datetime
-import random
-
-requires = open("requirements.txt","r").readlines()
-
-setup(
-    name="ragalchemy",
-    package_dir={"": "."},
-    version="1.0",
-    packages=find_packages(),
-    url="",
-    long_description='A python package to extract, summarize and rag on pptx',
-    license="Apache2.0",
-    author="Aman Ulla",
-    author_email="connectamanulla@gmail.com",
-    description="A python package ragalchemy",
-    python_requires=">=3.10",
-    install_requires=requires,
-    include_package_data=True,
+from setuptools import setup, find_packages
+from datetime import datetime
+import random
+
+requires = open("requirements.txt","r").readlines()
+
+setup(
+    name="ragalchemy",
+    package_dir={"": "."},
+    version="1.0",
+    packages=find_packages(),
+    url="",
+    long_description='A python package to extract, summarize and rag on pptx',
+    license="Apache2.0",
+    author="Aman Ulla",
+    author_email="connectamanulla@gmail.com",
+    description="A python package ragalchemy",
+    python_requires=">=3.10",
+    install_requires=requires,
+    extras_require={
+        "sentence-transformers": ["sentence-transformers", "torch"],
+        "onnx": ["onnxruntime", "transformers"],
+    },
+    include_package_data=True,
 )
\ No newline at end of file
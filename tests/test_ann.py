@@ -0,0 +1,66 @@
+import numpy as np
+
+from ragalchemy.retrieval.ann import IVFIndex, recall_at_k
+from ragalchemy.retrieval.index import l2_normalize
+
+
+def clustered_vectors(n, dim=32, n_topics=64, seed=0):
+    rng = np.random.default_rng(seed)
+    topics = rng.standard_normal((n_topics, dim)).astype(np.float32)
+    return l2_normalize(topics[rng.integers(0, n_topics, n)] + 0.5 * rng.standard_normal((n, dim)).astype(np.float32))
+
+
+def test_search_returns_every_stored_vector_with_full_probe():
+    vectors = clustered_vectors(500)
+    index = IVFIndex(nlist=16, nprobe=16)
+    index.add(vectors)
+    assert len(index) == 500
+    assert recall_at_k(index, vectors, vectors[:20], k=5) == 1.0
+
+
+def test_index_retrains_as_it_grows_from_a_small_first_batch():
+    vectors = clustered_vectors(4000)
+    index = IVFIndex(nlist=64, nprobe=4)
+    index.add(vectors[:30])
+    assert index.train_size == 30
+    for start in range(30, len(vectors), 200):
+        index.add(vectors[start:start + 200])
+    assert index.train_size > 1000
+    assert len(index.centroids) == 64
+    frozen = IVFIndex(nlist=64, nprobe=4, retrain_growth=None)
+    frozen.add(vectors[:30])
+    frozen.add(vectors[30:])
+    queries = clustered_vectors(50, seed=1)
+    assert recall_at_k(index, vectors, queries, k=10) > recall_at_k(frozen, vectors, queries, k=10)
+
+
+def test_ids_survive_retraining():
+    vectors = clustered_vectors(300)
+    index = IVFIndex(nlist=8, nprobe=8)
+    index.add(vectors[:10])
+    index.add(vectors[10:])
+    for i in (0, 5, 150, 299):
+        ids, scores = index.search(vectors[i], k=1)
+        assert ids[0] == i
+
+
+def test_train_on_populated_index_keeps_vectors():
+    vectors = clustered_vectors(200)
+    index = IVFIndex(nlist=8, nprobe=8, retrain_growth=None)
+    index.add(vectors)
+    index.train(vectors[:100])
+    assert sum(len(ids) + sum(len(p) for p in pending) for ids, pending in zip(index._ids, index._pending_ids)) == 200
+    ids, _ = index.search(vectors[150], k=1)
+    assert ids[0] == 150
+
+
+def test_save_and_load(tmp_path):
+    vectors = clustered_vectors(100)
+    index = IVFIndex(nlist=8, nprobe=8)
+    index.add(vectors)
+    index.save(str(tmp_path))
+    loaded = IVFIndex.load(str(tmp_path))
+    assert len(loaded) == 100
+    assert loaded.train_size == index.train_size
+    ids, _ = loaded.search(vectors[42], k=1)
+    assert ids[0] == 42
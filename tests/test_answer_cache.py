@@ -0,0 +1,141 @@
+import time
+
+import numpy as np
+import pytest
+from pptx import Presentation
+
+import ragalchemy.agents.cache as cache_module
+import ragalchemy.embedding.openai as embedding_openai
+from ragalchemy.agents.cache import AnswerCache
+from ragalchemy.agents.pptx import PPTQnA
+from ragalchemy.chat_model.backends import ReplayChatBackend
+from ragalchemy.embedding.backends import HashingEmbeddingBackend
+
+
+class WordEncoding:
+    """
+    Counts words as tokens, so that no tiktoken download is needed.
+    """
+    def encode(self, text):
+        return text.split()
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+
+class CountingBackend(HashingEmbeddingBackend):
+    def __init__(self, dim=16):
+        super().__init__(dim)
+        self.calls = 0
+
+    def embed(self, texts):
+        self.calls += 1
+        return super().embed(texts)
+
+
+@pytest.fixture(autouse=True)
+def word_tokens(monkeypatch):
+    monkeypatch.setattr(embedding_openai, "_encoding", WordEncoding())
+
+
+@pytest.fixture
+def deck(tmp_path):
+    presentation = Presentation()
+    for title, text in [("Revenue", "Q3 revenue grew 12 percent"), ("Churn", "Churn fell in the EMEA region")]:
+        slide = presentation.slides.add_slide(presentation.slide_layouts[1])
+        slide.shapes.title.text = title
+        slide.placeholders[1].text = text
+    path = str(tmp_path / "deck.pptx")
+    presentation.save(path)
+    return path
+
+
+def make_qna(deck, answer_cache):
+    return PPTQnA(deck, embedder=CountingBackend(), chat_backend=ReplayChatBackend(default="answer"), answer_cache=answer_cache)
+
+
+def test_semantic_matching_is_off_by_default():
+    cache = AnswerCache()
+    scope = AnswerCache.scope("deck.pptx", "f", "m", "similarity")
+    cache.store(scope, "Q3 revenue?", "12%", np.ones(4, dtype=np.float32))
+    entry, embedding = cache.lookup(scope, "Q4 revenue?", lambda texts: [np.ones(4, dtype=np.float32)])
+    assert entry is None and embedding is None
+    opted_in = AnswerCache(similarity_threshold=0.95)
+    opted_in.store(scope, "Q3 revenue?", "12%", np.ones(4, dtype=np.float32))
+    entry, _ = opted_in.lookup(scope, "Q4 revenue?", lambda texts: [np.ones(4, dtype=np.float32)])
+    assert entry["answer"] == "12%"
+
+
+@pytest.mark.parametrize("method", ["lexical", "hybrid"])
+def test_cache_miss_does_not_embed_the_query_for_lexical_methods(deck, method):
+    qna = make_qna(deck, AnswerCache(similarity_threshold=0.95))
+    calls = qna.embedder.calls
+    qna.run("What was the Q3 revenue growth?", method=method)
+    assert qna.embedder.calls - calls == int(qna.query_embedded)
+
+
+def test_similarity_miss_embeds_the_query_once(deck):
+    qna = make_qna(deck, AnswerCache(similarity_threshold=0.95))
+    calls = qna.embedder.calls
+    qna.run("What was the Q3 revenue growth?", method="similarity")
+    assert qna.embedder.calls - calls == 1
+    assert qna.run("what was the Q3 revenue  growth?", method="similarity") == "answer"
+    assert qna.cache_hit["similarity"] == 1.0
+
+
+def test_fingerprint_is_computed_once_per_extraction(deck, monkeypatch):
+    qna = make_qna(deck, AnswerCache())
+    fingerprint = qna.fingerprint()
+    monkeypatch.setattr(qna, "slides", [])
+    assert qna.fingerprint() == fingerprint
+    qna.run("What was the Q3 revenue growth?", method="lexical")
+    qna.run("Which region had less churn?", method="lexical")
+    assert qna._answer_fingerprint == fingerprint
+
+
+def unit(i, dim=8):
+    vector = np.zeros(dim, dtype=np.float32)
+    vector[i % dim] = 1.0
+    return vector
+
+
+def test_expired_exact_entry_counts_as_a_miss(monkeypatch):
+    scope = AnswerCache.scope("deck.pptx", "f", "m", "similarity")
+    now = time.time()
+    for embedder, counts in [(None, (0, 1, 0)), (lambda texts: [unit(1)], (0, 0, 1))]:
+        cache = AnswerCache(similarity_threshold=0.9, ttl=100)
+        monkeypatch.setattr(cache_module.time, "time", lambda: now)
+        cache.store(scope, "old question", "old", unit(0))
+        monkeypatch.setattr(cache_module.time, "time", lambda: now + 150)
+        cache.store(scope, "fresh question", "fresh", unit(1))
+        entry, _ = cache.lookup(scope, "old question", embedder)
+        assert (entry or {}).get("answer") == ("fresh" if embedder else None)
+        assert (cache.hits, cache.misses, cache.semantic_hits) == counts
+        assert "old question" not in [cache._decode(value)[0]["query"] for _, value in cache._conn.execute("SELECT key, value FROM cache").fetchall()]
+
+
+def test_semantic_lookup_decodes_only_the_match(monkeypatch):
+    cache = AnswerCache(similarity_threshold=0.9)
+    scope = AnswerCache.scope("deck.pptx", "f", "m", "similarity")
+    for i in range(40):
+        cache.store(scope, f"question {i}", f"answer {i}", unit(i, dim=64))
+    assert cache.lookup(scope, "new question", lambda texts: [unit(3, dim=64)])[0]["answer"] == "answer 3"
+    decoded = []
+    decode = cache._decode
+    monkeypatch.setattr(cache, "_decode", lambda value: decoded.append(1) or decode(value))
+    cache.store(scope, "question 40", "answer 40", unit(40, dim=64))
+    assert cache.lookup(scope, "another question", lambda texts: [unit(40, dim=64)])[0]["answer"] == "answer 40"
+    assert len(decoded) == 1
+    cache.invalidate_deck("deck.pptx")
+    assert cache.lookup(scope, "another question", lambda texts: [unit(40, dim=64)])[0] is None
+
+
+def test_chunks_hit_restores_the_cited_chunks(deck):
+    qna = make_qna(deck, AnswerCache())
+    qna.run("What was the Q3 revenue growth?", method="chunks", similarity_score=-1)
+    retrieved = [(chunk.slide_number, chunk.chunk_number, chunk.slide_text) for chunk in qna.retriever]
+    assert retrieved
+    fresh = make_qna(deck, qna.answer_cache)
+    assert fresh.run("What was the Q3 revenue growth?", method="chunks") == "answer"
+    assert fresh.cache_hit is not None
+    assert [(chunk.slide_number, chunk.chunk_number, chunk.slide_text) for chunk in fresh.retriever] == retrieved
@@ -0,0 +1,160 @@
+import asyncio
+import json
+import time
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import ragalchemy.utils.async_client as async_client
+from ragalchemy.utils.async_client import AsyncOpenAIClient, RetryableError
+
+
+@pytest.fixture(autouse=True)
+def word_token_counts(monkeypatch):
+    monkeypatch.setattr(async_client, "count_tokens", lambda text: len(text.split()))
+
+
+def run_with_server(routes, test):
+    """
+    Serves an aiohttp app with the given routes and runs test(client) against it.
+    """
+    async def main():
+        app = web.Application()
+        for path, handler in routes.items():
+            app.router.add_post(path, handler)
+        server = TestServer(app)
+        await server.start_server()
+        client = AsyncOpenAIClient(api_key="test", base_url=str(server.make_url("/v1")), backoff_base=0.01, timeout=1.0)
+        try:
+            return await test(client)
+        finally:
+            await client.close()
+            await server.close()
+    return asyncio.run(main())
+
+
+def rate_limited(failures, retry_after=None):
+    """
+    A handler answering 429 to its first `failures` calls, then a chat completion.
+    """
+    calls = []
+
+    async def handler(request):
+        calls.append(await request.json())
+        if len(calls) <= failures:
+            headers = {"Retry-After": str(retry_after)} if retry_after is not None else {}
+            return web.Response(status=429, text="slow down", headers=headers)
+        return web.json_response({"choices": [{"message": {"content": "ok"}}]})
+    handler.calls = calls
+    return handler
+
+
+def test_request_retries_rate_limits():
+    handler = rate_limited(2)
+
+    async def test(client):
+        response = await client.request("/chat/completions", {"model": "m"}, tokens=10)
+        return response, client.retries
+    response, retries = run_with_server({"/v1/chat/completions": handler}, test)
+    assert response["choices"][0]["message"]["content"] == "ok"
+    assert retries == 2
+    assert len(handler.calls) == 3
+
+
+def test_retries_go_through_the_rate_limit_buckets():
+    handler = rate_limited(2)
+
+    async def test(client):
+        charged = []
+        for bucket in (client.request_bucket, client.token_bucket):
+            acquire = bucket.acquire
+            async def recording_acquire(amount=1, acquire=acquire):
+                charged.append(amount)
+                await acquire(amount)
+            bucket.acquire = recording_acquire
+        await client.request("/chat/completions", {"model": "m"}, tokens=100)
+        return charged
+    # One request and 100 tokens charged per attempt.
+    assert run_with_server({"/v1/chat/completions": handler}, test) == [1, 100] * 3
+
+
+def test_request_gives_up_after_max_retries():
+    async def test(client):
+        client.max_retries = 1
+        with pytest.raises(RetryableError):
+            await client.request("/chat/completions", {"model": "m"})
+        return client.retries
+    assert run_with_server({"/v1/chat/completions": rate_limited(5)}, test) == 1
+
+
+def test_client_errors_are_not_retried():
+    async def handler(request):
+        return web.Response(status=400, text="bad request")
+
+    async def test(client):
+        with pytest.raises(Exception, match="400"):
+            await client.request("/chat/completions", {"model": "m"})
+        return client.retries
+    assert run_with_server({"/v1/chat/completions": handler}, test) == 0
+
+
+def test_backoff_does_not_hold_the_concurrency_limit():
+    handler = rate_limited(1, retry_after=0.5)
+
+    async def test(client):
+        client.max_concurrency = 1
+        first = asyncio.create_task(client.request("/chat/completions", {"model": "m"}))
+        await asyncio.sleep(0.1)
+        start = time.perf_counter()
+        await client.request("/chat/completions", {"model": "m"})
+        second = time.perf_counter() - start
+        await first
+        return second
+    assert run_with_server({"/v1/chat/completions": handler}, test) < 0.3
+
+
+def sse_handler(deltas, delay=0.0, failures=0):
+    calls = []
+
+    async def handler(request):
+        calls.append(1)
+        if len(calls) <= failures:
+            return web.Response(status=503, text="unavailable")
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for delta in deltas:
+            await asyncio.sleep(delay)
+            await response.write(b"data: " + json.dumps({"choices": [{"delta": {"content": delta}}]}).encode() + b"\n\n")
+        await response.write(b"data: [DONE]\n\n")
+        return response
+    return handler
+
+
+def test_stream_yields_deltas_after_retry():
+    async def test(client):
+        deltas = [delta async for delta in client.chat_completion_stream([{"role": "user", "content": "hi"}], "m")]
+        return deltas, client.retries
+    deltas, retries = run_with_server({"/v1/chat/completions": sse_handler(["Hel", "lo"], failures=1)}, test)
+    assert deltas == ["Hel", "lo"]
+    assert retries == 1
+
+
+def test_stream_longer_than_the_timeout_is_not_cut_off():
+    async def test(client):
+        client.timeout = 0.3
+        return [delta async for delta in client.chat_completion_stream([{"role": "user", "content": "hi"}], "m")]
+    assert run_with_server({"/v1/chat/completions": sse_handler(["a"] * 6, delay=0.1)}, test) == ["a"] * 6
+
+
+def test_closed_stream_releases_the_concurrency_limit():
+    async def ok(request):
+        return web.json_response({"ok": True})
+
+    async def test(client):
+        client.max_concurrency = 1
+        stream = client.chat_completion_stream([{"role": "user", "content": "hi"}], "m")
+        assert await stream.__anext__() == "a"
+        await stream.aclose()
+        return await asyncio.wait_for(client.request("/other", {}), 1.0)
+    assert run_with_server({"/v1/chat/completions": sse_handler(["a", "b"]), "/v1/other": ok}, test) == {"ok": True}
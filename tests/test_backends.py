@@ -0,0 +1,99 @@
+import sys
+import types
+
+import numpy as np
+import pytest
+
+import ragalchemy.embedding.backends as backends
+import ragalchemy.embedding.openai as embedding_openai
+from ragalchemy.embedding.backends import HashingEmbeddingBackend, ONNXEmbeddingBackend, SentenceTransformerBackend, get_backend
+
+
+@pytest.fixture(autouse=True)
+def no_loaded_models(monkeypatch):
+    monkeypatch.setattr(backends, "_loaded_models", {})
+
+
+def test_hashing_backend_is_deterministic_and_normalized():
+    backend = HashingEmbeddingBackend(dim=64)
+    embeddings = backend(["Q3 revenue growth", "Q3 revenue growth", "customer churn in EMEA"])
+    assert embeddings.shape == (3, 64) and embeddings.dtype == np.float32
+    np.testing.assert_allclose(np.linalg.norm(embeddings, axis=1), 1.0, rtol=1e-6)
+    np.testing.assert_array_equal(embeddings[0], embeddings[1])
+    assert embeddings[0] @ backend(["revenue growth"])[0] > embeddings[0] @ embeddings[2]
+    assert backend([]).shape == (0, 64)
+
+
+def test_get_backend_specs():
+    assert get_backend("hashing:32").dim == 32
+    assert get_backend("sentence-transformers:my-model").model_name == "my-model"
+    onnx = get_backend("onnx:/models/e5.onnx:e5-tokenizer")
+    assert (onnx.model_path, onnx.tokenizer) == ("/models/e5.onnx", "e5-tokenizer")
+    with pytest.raises(Exception):
+        get_backend("onnx:model.onnx")
+    with pytest.raises(Exception):
+        get_backend("word2vec")
+
+
+def fake_sentence_transformers(monkeypatch):
+    threads, models = [], []
+
+    class SentenceTransformer:
+        def __init__(self, name, device):
+            models.append((name, device, threads[-1] if threads else None))
+
+        def get_sentence_embedding_dimension(self):
+            return 3
+
+        def encode(self, texts, **kwargs):
+            return np.ones((len(texts), 3))
+
+    monkeypatch.setitem(sys.modules, "torch", types.SimpleNamespace(set_num_threads=threads.append))
+    monkeypatch.setitem(sys.modules, "sentence_transformers", types.SimpleNamespace(SentenceTransformer=SentenceTransformer))
+    return models
+
+
+def test_sentence_transformer_models_are_shared_per_settings(monkeypatch):
+    models = fake_sentence_transformers(monkeypatch)
+    embeddings = SentenceTransformerBackend("m", num_threads=2)(["a", "b"])
+    assert embeddings.shape == (2, 3) and embeddings.dtype == np.float32
+    SentenceTransformerBackend("m", num_threads=2)(["c"])
+    SentenceTransformerBackend("m", num_threads=4)(["d"])
+    assert models == [("m", "cpu", 2), ("m", "cpu", 4)]
+
+
+def test_onnx_backend_mean_pools_over_the_attention_mask(monkeypatch):
+    def tokenizer(texts, **kwargs):
+        # The second text has one padding token.
+        return {"input_ids": np.array([[1, 2], [3, 0]]), "attention_mask": np.array([[1, 1], [1, 0]])}
+
+    class Session:
+        def __init__(self, path, options, providers):
+            self.options = options
+
+        def get_inputs(self):
+            return [types.SimpleNamespace(name="input_ids"), types.SimpleNamespace(name="attention_mask")]
+
+        def run(self, outputs, feed):
+            return [np.stack([feed["input_ids"], feed["input_ids"] * 2], axis=-1).astype(np.float32)]
+
+    monkeypatch.setitem(sys.modules, "onnxruntime", types.SimpleNamespace(SessionOptions=types.SimpleNamespace, InferenceSession=Session))
+    monkeypatch.setitem(sys.modules, "transformers", types.SimpleNamespace(AutoTokenizer=types.SimpleNamespace(from_pretrained=lambda name: tokenizer)))
+    backend = ONNXEmbeddingBackend("model.onnx", "tok", num_threads=1, normalize=False)
+    np.testing.assert_allclose(backend(["a b", "c"]), [[1.5, 3.0], [3.0, 6.0]])
+    assert backend.dim == 2
+    assert backend._load()[1].options.intra_op_num_threads == 1
+
+
+def test_token_counts_fall_back_to_an_estimate_offline(monkeypatch):
+    def unavailable(name):
+        raise ConnectionError("no network")
+
+    monkeypatch.setitem(sys.modules, "tiktoken", types.SimpleNamespace(get_encoding=unavailable))
+    monkeypatch.setattr(embedding_openai, "_encoding", None)
+    text = "Q3 revenue grew 12% in EMEA."
+    with pytest.warns(UserWarning, match="estimated"):
+        assert embedding_openai.count_tokens(text) > 0
+    assert isinstance(embedding_openai.get_encoding(), embedding_openai.EstimatedEncoding)
+    assert embedding_openai.truncate_tokens(text, 100) == text
+    assert text.startswith(embedding_openai.truncate_tokens(text, 3))
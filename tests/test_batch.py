@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from ragalchemy.embedding.backends import HashingEmbeddingBackend
+from ragalchemy.embedding.batch import embed_in_batches, make_token_batches
+from ragalchemy.extractors.pptx import PPTExtractor, Slide
+
+
+class CountingBackend(HashingEmbeddingBackend):
+    """
+    A hashing backend that records the size of every request, and fails the requests
+    containing a text marked "bad".
+    """
+    def __init__(self, dim=16):
+        super().__init__(dim)
+        self.requests = []
+
+    def embed(self, texts):
+        self.requests.append(len(texts))
+        if any("bad" in text for text in texts):
+            raise ValueError("bad input")
+        return super().embed(texts)
+
+
+def test_batches_respect_token_budget():
+    assert make_token_batches([10, 20, 30, 40], max_batch_tokens=50) == [[0, 1], [2], [3]]
+
+
+def test_batches_respect_batch_size():
+    assert make_token_batches([1] * 5, max_batch_tokens=100, max_batch_size=2) == [[0, 1], [2, 3], [4]]
+
+
+def test_oversized_text_gets_its_own_batch():
+    assert make_token_batches([5, 500, 5], max_batch_tokens=100) == [[0], [1], [2]]
+
+
+def test_embed_in_batches_keeps_input_order():
+    backend = CountingBackend()
+    texts = [f"slide {i} revenue" for i in range(7)]
+    embeddings = embed_in_batches(texts, backend, token_counts=[10] * 7, max_batch_tokens=30)
+    assert backend.requests == [3, 3, 1]
+    np.testing.assert_allclose(np.array(embeddings), backend.embed(texts), rtol=1e-6)
+
+
+def test_failed_batch_is_retried_text_by_text():
+    backend = CountingBackend()
+    errors = []
+    embeddings = embed_in_batches(["good one", "bad one", "good two"], backend, token_counts=[1, 1, 1], on_error=lambda index, e: errors.append(index))
+    assert embeddings[1] is None
+    assert embeddings[0] is not None and embeddings[2] is not None
+    assert errors == [1]
+    assert backend.requests == [3, 1, 1, 1]
+
+
+@pytest.mark.parametrize("max_batch_tokens, expected", [(100, [4]), (50, [2, 2]), (25, [1, 1, 1, 1])])
+def test_embed_slides_batches_by_tokens(max_batch_tokens, expected):
+    backend = CountingBackend()
+    extractor = PPTExtractor("deck.pptx", embedder=backend)
+    extractor.slides = [Slide(i + 1, f"T{i}", f"Slide Number {i + 1} text", [], [], 25) for i in range(4)]
+    extractor.embed_slides(max_batch_tokens=max_batch_tokens)
+    assert backend.requests == expected
+    assert extractor.embedding_matrix.shape == (4, 16)
+    assert all(slide.embeddings.base is extractor.embedding_matrix for slide in extractor.slides)
+
+
+def test_embed_slides_drops_failed_slides():
+    extractor = PPTExtractor("deck.pptx", embedder=CountingBackend())
+    extractor.slides = [Slide(1, "A", "fine", [], [], 5), Slide(2, "B", "bad", [], [], 5)]
+    extractor.total_tokens = 10
+    extractor.embed_slides()
+    assert [slide.slide_number for slide in extractor.slides] == [1]
+    assert extractor.total_tokens == 5
@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+
+import ragalchemy.chat_model.openai as chat_openai
+import ragalchemy.embedding.openai as embedding_openai
+from ragalchemy.chat_model.backends import ReplayChatBackend
+from ragalchemy.chat_model.openai import ChatOpenAI
+
+
+@pytest.fixture(autouse=True)
+def word_token_counts(monkeypatch):
+    monkeypatch.setattr(embedding_openai, "count_tokens", lambda text: len(text.split()))
+
+
+class FakeStream:
+    """
+    Stands in for the SDK's streaming response: an iterator of chunks that can be closed.
+    """
+    def __init__(self, deltas):
+        self.chunks = iter([{"choices": [{"delta": {"content": delta}}]} for delta in deltas])
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self.chunks)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSDK:
+    def __init__(self, deltas):
+        self.deltas = deltas
+        self.streams = []
+        self.ChatCompletion = self
+
+    def create(self, **kwargs):
+        self.streams.append(FakeStream(self.deltas))
+        return self.streams[-1]
+
+
+class FakeClient:
+    def __init__(self, deltas):
+        self.deltas = deltas
+        self.closed = 0
+
+    async def chat_completion_stream(self, messages, model, **kwargs):
+        try:
+            for delta in self.deltas:
+                await asyncio.sleep(0)
+                yield delta
+        finally:
+            self.closed += 1
+
+
+def test_stream_closes_the_sdk_response_when_closed_early(monkeypatch):
+    sdk = FakeSDK(["a ", "b ", "c"])
+    monkeypatch.setattr(chat_openai, "openai", sdk)
+    chat = ChatOpenAI("gpt-test")
+    stream = chat.stream("question")
+    assert next(stream) == "a "
+    stream.close()
+    assert sdk.streams[0].closed
+    assert chat.last_usage["cancelled"] is True
+    assert chat.last_usage["completion_tokens"] == 1
+
+
+def test_stream_closes_the_sdk_response_when_exhausted(monkeypatch):
+    sdk = FakeSDK(["a ", "b"])
+    monkeypatch.setattr(chat_openai, "openai", sdk)
+    chat = ChatOpenAI("gpt-test")
+    assert "".join(chat.stream("question")) == "a b"
+    assert sdk.streams[0].closed
+    assert chat.last_usage["cancelled"] is False
+
+
+def test_astream_records_usage():
+    client = FakeClient(["one ", "two ", "three"])
+    chat = ChatOpenAI("gpt-test", client=client)
+
+    async def consume():
+        return [delta async for delta in chat.astream("a short question")]
+    assert asyncio.run(consume()) == ["one ", "two ", "three"]
+    usage = chat.last_usage
+    assert usage["completion_tokens"] == 3
+    assert usage["prompt_tokens"] == 3
+    assert usage["time_to_first_token"] is not None
+    assert usage["cancelled"] is False
+    assert client.closed == 1
+
+
+def test_astream_closed_early_is_cancelled():
+    client = FakeClient(["one ", "two ", "three"])
+    chat = ChatOpenAI("gpt-test", client=client)
+
+    async def consume():
+        stream = chat.astream("question")
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first
+    assert asyncio.run(consume()) == "one "
+    assert chat.last_usage["cancelled"] is True
+    assert chat.last_usage["completion_tokens"] == 1
+    assert client.closed == 1
+
+
+def test_replay_astream_records_usage():
+    chat = ReplayChatBackend(default="one two three")("replay")
+
+    async def consume():
+        return [delta async for delta in chat.astream("a short question")]
+    assert asyncio.run(consume()) == ["one", " two", " three"]
+    assert chat.last_usage["completion_tokens"] == 3
+    assert chat.last_usage["time_to_first_token"] is not None
+    assert chat.last_usage["cancelled"] is False
+
+
+def test_replay_astream_closed_early_is_cancelled():
+    chat = ReplayChatBackend(default="one two three")("replay")
+
+    async def consume():
+        stream = chat.astream("question")
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first
+    assert asyncio.run(consume()) == "one"
+    assert chat.last_usage["cancelled"] is True
+    assert chat.last_usage["completion_tokens"] == 1
@@ -0,0 +1,106 @@
+import os
+
+import numpy as np
+
+from ragalchemy.embedding.backends import HashingEmbeddingBackend
+from ragalchemy.extractors.pptx import Slide
+from ragalchemy.retrieval.corpus import SlideCorpus
+from ragalchemy.retrieval.lexical import BM25Index
+
+TOPICS = ["revenue growth", "customer churn", "pricing forecast", "hiring budget"]
+
+
+def deck_slides(deck, embedder, n=3):
+    texts = [f"{TOPICS[(deck + i) % len(TOPICS)]} deck{deck} slide{i}" for i in range(n)]
+    return [Slide(i + 1, f"Slide {i + 1}", text, [], vector, 5) for i, (text, vector) in enumerate(zip(texts, embedder.embed(texts)))]
+
+
+def test_appends_do_not_rewrite_the_lexical_index(tmp_path, monkeypatch):
+    embedder = HashingEmbeddingBackend(16)
+    saves = []
+    save = BM25Index.save
+    monkeypatch.setattr(BM25Index, "save", lambda self, path: (saves.append(len(self)), save(self, path)))
+    corpus = SlideCorpus(str(tmp_path), embedder=embedder)
+    for deck in range(5):
+        corpus.add_slides({"file_path": f"deck{deck}.pptx"}, deck_slides(deck, embedder))
+    assert saves == []
+    assert os.path.getsize(tmp_path / "rows.bin") == 15 * corpus.rows.dtype.itemsize
+    corpus.flush()
+    corpus.flush()
+    assert saves == [15]
+
+
+def test_reopened_corpus_indexes_rows_appended_after_the_flush(tmp_path):
+    embedder = HashingEmbeddingBackend(16)
+    corpus = SlideCorpus(str(tmp_path), embedder=embedder)
+    corpus.add_slides({"file_path": "deck0.pptx"}, deck_slides(0, embedder))
+    corpus.flush()
+    corpus.add_slides({"file_path": "deck1.pptx"}, deck_slides(1, embedder))
+
+    reopened = SlideCorpus(str(tmp_path), embedder=embedder)
+    assert len(reopened) == 6
+    assert reopened.get_slide(4).slide_text == "pricing forecast deck1 slide1"
+    np.testing.assert_allclose(reopened.embeddings[4], corpus.embeddings[4])
+    results, _ = reopened.hybrid_search("deck1 slide1", k=1)
+    assert results[0][0]["file_path"] == "deck1.pptx"
+    assert results[0][1].slide_text == "pricing forecast deck1 slide1"
+
+
+def test_rows_npy_of_earlier_versions_is_converted(tmp_path):
+    embedder = HashingEmbeddingBackend(16)
+    corpus = SlideCorpus(str(tmp_path), embedder=embedder)
+    corpus.add_slides({"file_path": "deck0.pptx"}, deck_slides(0, embedder))
+    np.save(tmp_path / "rows.npy", np.asarray(corpus.rows))
+    os.remove(tmp_path / "rows.bin")
+
+    legacy = SlideCorpus(str(tmp_path), embedder=embedder)
+    assert legacy.get_slide(2).slide_text == "pricing forecast deck0 slide2"
+    legacy.add_slides({"file_path": "deck1.pptx"}, deck_slides(1, embedder))
+    assert not os.path.exists(tmp_path / "rows.npy")
+    reopened = SlideCorpus(str(tmp_path))
+    assert [reopened.get_slide(row).slide_text for row in (2, 3)] == ["pricing forecast deck0 slide2", "customer churn deck1 slide0"]
+
+
+def test_hybrid_search_without_embedder_is_lexical(tmp_path):
+    embedder = HashingEmbeddingBackend(16)
+    corpus = SlideCorpus(str(tmp_path), embedder=embedder)
+    corpus.add_slides({"file_path": "deck0.pptx"}, deck_slides(0, embedder))
+    unembedded = SlideCorpus(str(tmp_path))
+    results, embedded = unembedded.hybrid_search("hiring budget", k=2, min_margin=None)
+    assert not embedded
+    assert results == []
+    results, embedded = unembedded.hybrid_search("churn", k=2, min_margin=None)
+    assert not embedded
+    assert [slide.slide_text for _, slide, _ in results] == ["customer churn deck0 slide1"]
+
+
+def test_reingested_deck_replaces_the_previous_one(tmp_path):
+    embedder = HashingEmbeddingBackend(16)
+    corpus = SlideCorpus(str(tmp_path), embedder=embedder)
+    corpus.add_slides({"file_path": "deck0.pptx"}, deck_slides(0, embedder))
+    corpus.add_slides({"file_path": "deck1.pptx"}, deck_slides(1, embedder))
+    corpus.add_slides({"file_path": "deck0.pptx"}, deck_slides(0, embedder))
+    assert corpus.decks[0]["deleted"] and not corpus.decks[2].get("deleted")
+    assert corpus.deleted_rows().tolist() == [0, 1, 2]
+
+    reopened = SlideCorpus(str(tmp_path), embedder=embedder)
+    query = "revenue growth deck0 slide0"
+    for rows in (
+        [deck["deck_id"] for deck, _, _ in reopened.search(embedder.embed([query])[0], k=9)],
+        [deck["deck_id"] for deck, _, _ in reopened.hybrid_search(query, k=9, min_margin=None)[0]],
+        [deck["deck_id"] for deck, _, _ in SlideCorpus(str(tmp_path)).hybrid_search(query, k=9)[0]],
+    ):
+        assert 0 not in rows
+        assert rows.count(2) == 3
+
+
+def test_skipped_deck_is_recorded_against_the_first_stage(tmp_path):
+    from ragalchemy.pipeline.ingest import IngestionPipeline
+
+    embedder = HashingEmbeddingBackend(16)
+    corpus = SlideCorpus(str(tmp_path / "corpus"), embedder=embedder)
+    corpus.add_slides({"file_path": os.path.abspath("deck0.pptx")}, deck_slides(0, embedder))
+    for options, stage in [({}, "parse"), ({"extract_from_image": True}, "images")]:
+        pipeline = IngestionPipeline(corpus, parse_workers=1, image_workers=1, extractor_options=options)
+        records = pipeline.run(["deck0.pptx"])
+        assert [(record.stage, record.status) for record in records] == [(stage, "skipped")]
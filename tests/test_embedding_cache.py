@@ -0,0 +1,38 @@
+import numpy as np
+
+from ragalchemy.embedding.backends import HashingEmbeddingBackend
+from ragalchemy.embedding.cache import EmbeddingCache
+
+
+class CountingBackend(HashingEmbeddingBackend):
+    def __init__(self, dim=8):
+        super().__init__(dim)
+        self.embedded = []
+
+    def embed(self, texts):
+        self.embedded.extend(texts)
+        return super().embed(texts)
+
+
+def test_hits_are_float32_arrays():
+    cache = EmbeddingCache()
+    backend = CountingBackend()
+    cached = cache.wrap(backend)
+    first = cached(["revenue", "churn"])
+    second = cached(["revenue", " churn "])
+    assert backend.embedded == ["revenue", "churn"]
+    assert all(isinstance(embedding, np.ndarray) and embedding.dtype == np.float32 for embedding in second)
+    np.testing.assert_allclose(np.array(second), np.array(first), rtol=1e-6)
+
+
+def test_invalidate_resolves_the_embedder_model():
+    cache = EmbeddingCache()
+    backend = CountingBackend()
+    cached = cache.wrap(backend)
+    cached(["revenue", "churn"])
+    cache.invalidate(["revenue"], embedder=backend)
+    cached(["revenue", "churn"])
+    assert backend.embedded == ["revenue", "churn", "revenue"]
+    cache.invalidate(embedder=cached)
+    cached(["churn"])
+    assert backend.embedded[-1] == "churn"
@@ -0,0 +1,15 @@
+import pytest
+
+from benchmarks.import_time import BUDGET_MS, DEFAULT_MODULES, LAZY_MODULES, measure
+
+
+@pytest.mark.parametrize("module", DEFAULT_MODULES)
+def test_entry_point_imports_within_budget(module):
+    seconds, loaded = measure(module, repeat=3)
+    assert loaded == []
+    assert seconds * 1000 <= BUDGET_MS
+
+
+def test_common_functions_defer_numpy_and_pptx():
+    _, loaded = measure("ragalchemy.utils.common_functions", repeat=1, lazy=LAZY_MODULES + ["numpy", "pptx"])
+    assert loaded == []
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from ragalchemy.retrieval.lexical import BM25Index, hybrid_search_ids
+
+TEXTS = ["quarterly revenue growth by region", "customer churn and retention", "hiring budget and headcount", "pricing forecast"]
+
+
+def index():
+    lexical = BM25Index()
+    lexical.add_texts(TEXTS)
+    return lexical
+
+
+def dense(calls):
+    def dense_search_ids(text):
+        calls.append(text)
+        return np.array([2, 0]), np.array([0.9, 0.5], dtype=np.float32)
+    return dense_search_ids
+
+
+@pytest.mark.parametrize("fusion", ["rrf", "weighted"])
+def test_scores_are_fused_whether_or_not_the_dense_search_runs(fusion):
+    calls = []
+    ids, scores, embedded = hybrid_search_ids("churn retention", index(), dense(calls), k=3, fusion=fusion)
+    assert not embedded and calls == []
+    assert ids[0] == 1
+    skipped_top = scores[0]
+    ids, scores, embedded = hybrid_search_ids("churn retention", index(), dense(calls), k=3, fusion=fusion, min_margin=None)
+    assert embedded and len(calls) == 1
+    # The lexical-only score is the lexical contribution of the same top document.
+    assert skipped_top == pytest.approx(1 / 61 if fusion == "rrf" else 1.0)
+    assert scores.max() <= (2 / 61 if fusion == "rrf" else 2.0)